@@ -4,7 +4,6 @@ from sqlalchemy import text
 from flask_cors import CORS
 from dotenv import load_dotenv
 from db import init_db, db
-from src.prompt import system_prompt
 import os
 
 # Import route blueprints
@@ -19,6 +18,10 @@ from routes.data import data_bp
 from routes.user import user_bp
 from routes.journal import journal_bp
 from routes.chat_profile import chat_profile_bp
+from routes.jobs import jobs_bp
+from services.jobs import JobQueueFull, job_runner, queue_full_response
+from services.llm_provider import Component, llm_provider
+from utils.cache import cache_stats
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -26,9 +29,6 @@ app = Flask(__name__)
 # Load environment variables from root-level .env
 load_dotenv()
 
-# LLM initialization state
-chat_model = None
-rag_chain = None
 if not os.getenv("OPENAI_API_KEY"):
     print("WARNING: OPENAI_API_KEY is not set. Chat will use fallback responses.")
 
@@ -49,8 +49,29 @@ app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 # Initialize database
 init_db(app)
 import models
-with app.app_context():
-    db.create_all()
+
+def _prepare_database():
+    from migrations import run_migrations
+    from services.chat_search import ensure_search_index
+    from services.data_deletion import resume_pending_deletions
+
+    with app.app_context():
+        db.create_all()
+        run_migrations()
+        ensure_search_index()
+        resume_pending_deletions()
+    return True
+
+
+# Schema setup runs off the import path; requests get 503 until it is done.
+database = Component("db", _prepare_database)
+
+
+def init_database():
+    """Block until the schema is ready (for scripts); raise if setup failed."""
+    if not database.get(wait=None):
+        raise RuntimeError(f"Database setup failed: {database.error}")
+
 
 # Enable CORS
 frontend_origins = [
@@ -77,66 +98,11 @@ CORS(
     },
 )
 
-# Legacy RAG chain setup (optional, if Pinecone is available)
-try:
-    RAG_ENABLED = os.environ.get("RAG_ENABLED", "false").lower() in ("1", "true", "yes")
-    PINECONE_API_KEY = os.environ.get("PINECONE_API_KEY")
-    OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-
-    if OPENAI_API_KEY:
-        try:
-            from langchain_openai import ChatOpenAI
-
-            chat_model = ChatOpenAI(model="gpt-4o")
-        except Exception as exc:
-            print(f"LLM init failed: {exc}")
-            chat_model = None
-    else:
-        print("WARNING: OPENAI_API_KEY is not set. LLM will not initialize.")
-
-    if not RAG_ENABLED:
-        print("RAG disabled (set RAG_ENABLED=true to enable).")
-    elif PINECONE_API_KEY and OPENAI_API_KEY:
-        from src.helper import download_hugging_face_embeddings
-        from langchain_pinecone import PineconeVectorStore
-        from langchain_openai import ChatOpenAI
-        from langchain.chains import create_retrieval_chain
-        from langchain.chains.combine_documents import create_stuff_documents_chain
-        from langchain_core.prompts import ChatPromptTemplate
-
-        os.environ["PINECONE_API_KEY"] = PINECONE_API_KEY
-        os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
-
-        try:
-            embeddings = download_hugging_face_embeddings()
-            index_name = "therapy-chatbot"
-            docsearch = PineconeVectorStore.from_existing_index(
-                index_name=index_name,
-                embedding=embeddings
-            )
-            retriever = docsearch.as_retriever(search_type="similarity", search_kwargs={"k": 3})
-            chatModel = ChatOpenAI(model="gpt-4o")
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", system_prompt),
-                ("human", "{input}"),
-            ])
-            question_answer_chain = create_stuff_documents_chain(chatModel, prompt)
-            rag_chain = create_retrieval_chain(retriever, question_answer_chain)
-            print("RAG chain initialized with Pinecone")
-        except Exception as e:
-            print(f"RAG chain setup failed: {e}.")
-    else:
-        if RAG_ENABLED:
-            print("RAG keys missing. RAG chain will not initialize.")
-except ImportError:
-    print("RAG dependencies not available. Chat will use direct LLM if configured.")
-
-if rag_chain:
-    print("LLM ready: RAG chain enabled.")
-elif chat_model:
-    print("LLM ready: Direct chat model enabled.")
-else:
-    print("LLM not initialized.")
+# LLM and RAG chain are built on background threads (see services/llm_provider.py).
+APP_WARMUP = os.getenv("APP_WARMUP", "true").lower() in ("1", "true", "yes")
+if APP_WARMUP:
+    database.start()
+    llm_provider.warm_up()
 
 
 # Register route blueprints
@@ -151,23 +117,48 @@ app.register_blueprint(data_bp)
 app.register_blueprint(user_bp)
 app.register_blueprint(journal_bp)
 app.register_blueprint(chat_profile_bp)
+app.register_blueprint(jobs_bp)
+
+
+@app.before_request
+def _require_database():
+    if request.endpoint == 'health':
+        return None
+    # Never hold a worker while the schema is built: answer at once.
+    if not database.get(wait=0):
+        response = jsonify({'error': 'Service is starting. Try again shortly.'})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    return None
 
 
 # Health endpoint
 @app.route('/api/health', methods=['GET'])
 @app.route('/api/health/', methods=['GET'])
 def health():
-    """Health check endpoint."""
+    """Health check endpoint.
+
+    ``ready`` is true once every component is ready or disabled by
+    configuration; a failed component keeps it false (see ``components``).
+    """
     try:
         db.session.execute(text('SELECT 1'))
         db_status = 'connected'
     except Exception as e:
         db_status = f'error: {str(e)}'
-    
+
+    components = {'db': database.status(), **llm_provider.status()}
     return jsonify({
         'status': 'ok',
+        'ready': components['db']['state'] == 'ready' and all(
+            component['state'] in ('ready', 'disabled')
+            for component in components.values()
+        ),
         'db': db_status,
-        'rag_available': rag_chain is not None,
+        'components': components,
+        'rag_available': llm_provider.retriever.state == 'ready',
+        'jobs': job_runner.stats(),
+        'caches': cache_stats(),
     }), 200
 
 
@@ -178,24 +169,47 @@ def index():
     return render_template('chat.html')
 
 
+def _legacy_rag_answer(msg):
+    response = llm_provider.rag_chain().invoke({"input": msg})
+    return str(response.get('answer', 'I understood your message. How can I help?'))
+
+
 @app.route('/get', methods=['GET', 'POST'])
 def legacy_chat():
-    """Legacy chat endpoint (backward compatible)."""
+    """Legacy chat endpoint (backward compatible).
+
+    The RAG call runs on the shared job executor: the endpoint answers 202
+    with a ``job_id`` and the client polls ``/get/<job_id>`` for the reply.
+    When the queue is full it answers 503 with Retry-After.
+    """
     msg = request.form.get('msg', '')
     
     if not msg:
         return 'No message provided', 400
     
-    if rag_chain:
+    if llm_provider.rag_chain():
         try:
-            response = rag_chain.invoke({"input": msg})
-            return str(response.get('answer', 'I understood your message. How can I help?'))
-        except Exception as e:
-            print(f"RAG error: {e}")
-            return f"Thank you for your message. (Backend error: {str(e)})"
+            job_id = job_runner.submit('legacy_chat', _legacy_rag_answer, msg)
+        except JobQueueFull as exc:
+            return queue_full_response(exc)
+        return jsonify({'job_id': job_id, 'status_url': f"/get/{job_id}"}), 202
     else:
         return "Thank you for sharing. I'm here to listen and support you. Please use the new chat interface."
 
 
+@app.route('/get/<job_id>', methods=['GET'])
+def legacy_chat_result(job_id):
+    """Poll a legacy chat job: 202 while running, then the reply text."""
+    job = job_runner.get(job_id)
+    if not job or job['kind'] != 'legacy_chat':
+        return 'Unknown message', 404
+    if job['status'] == 'succeeded':
+        return job['result']
+    if job['status'] == 'failed':
+        print(f"RAG error: {job['error']}")
+        return f"Thank you for your message. (Backend error: {job['error']})"
+    return jsonify({'status': job['status'], 'status_url': f"/get/{job_id}"}), 202
+
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8000, debug=True)
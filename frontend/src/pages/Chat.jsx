@@ -16,6 +16,7 @@ export default function Chat({ chatProfile: initialProfile = null }) {
   const navigate = useNavigate();
 
   const [chatSessions, setChatSessions] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [currentSession, setCurrentSession] = useState(null);
   const [messages, setMessages] = useState([]);
   const [input, setInput] = useState('');
@@ -60,14 +61,16 @@ export default function Chat({ chatProfile: initialProfile = null }) {
     try {
       setError('');
       const response = await api.getChatSessions(sessionId);
-      setChatSessions(response.data);
+      const { sessions, next_cursor: cursor } = response.data;
+      setChatSessions(sessions);
+      setNextCursor(cursor);
       const preferredSession = parseInt(searchParams.get('session'), 10);
-      if (response.data.length === 0) {
+      if (sessions.length === 0) {
         createNewSession();
       } else if (preferredSession) {
         openSession(preferredSession);
       } else {
-        openSession(response.data[0].id);
+        openSession(sessions[0].id);
       }
     } catch (err) {
       console.error('Failed to load sessions:', err);
@@ -76,6 +79,18 @@ export default function Chat({ chatProfile: initialProfile = null }) {
     }
   };
 
+  const loadMoreSessions = async () => {
+    if (!nextCursor) return;
+    try {
+      const response = await api.getChatSessions(sessionId, { cursor: nextCursor });
+      setChatSessions((prev) => [...prev, ...response.data.sessions]);
+      setNextCursor(response.data.next_cursor);
+    } catch (err) {
+      console.error('Failed to load more sessions:', err);
+      setError('Unable to load more sessions.');
+    }
+  };
+
   const createNewSession = async () => {
     try {
       const response = await api.createChatSession(sessionId);
@@ -194,6 +209,11 @@ export default function Chat({ chatProfile: initialProfile = null }) {
                 </button>
               </div>
             ))}
+            {nextCursor && (
+              <button onClick={loadMoreSessions} className="btn-load-more">
+                Load more
+              </button>
+            )}
           </div>
 
           {chatSessions.length > 0 && (
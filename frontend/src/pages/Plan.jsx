@@ -66,7 +66,7 @@ export default function Plan() {
   const loadPlanHistory = async () => {
     try {
       const response = await api.getPlanHistory();
-      setPlanHistory(response.data || []);
+      setPlanHistory(response.data?.plans || []);
     } catch (err) {
       console.error('Failed to load plan history:', err);
     }
@@ -42,13 +42,14 @@ export default function Privacy() {
       if (window.confirm('This is your final warning. Type \"DELETE\" to confirm.')) {
         try {
           setLoading(true);
-          await api.deleteAllUserData(sessionId);
+          await api.deleteAllUserDataAndWait(sessionId);
           clearSessionId();
           alert('All your data has been deleted. Your session has been reset.');
           window.location.reload();
         } catch (error) {
+          // Keep the session id so the deletion can be retried or resumed.
           console.error('Failed to delete data:', error);
-          alert('Failed to delete data. Please try again.');
+          alert(`Failed to delete all data: ${error.message}. Please try again.`);
         } finally {
           setLoading(false);
         }
@@ -6,6 +6,7 @@ import './Sessions.css';
 export default function Sessions() {
   const navigate = useNavigate();
   const [sessions, setSessions] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [query, setQuery] = useState('');
   const [selected, setSelected] = useState(null);
   const [titleInput, setTitleInput] = useState('');
@@ -17,7 +18,8 @@ export default function Sessions() {
     setError('');
     try {
       const response = await api.getChatSessions(null, { q: search });
-      setSessions(response.data);
+      setSessions(response.data.sessions);
+      setNextCursor(response.data.next_cursor);
       setSelected(null);
     } catch (err) {
       setError('Unable to load sessions. Please try again.');
@@ -26,6 +28,17 @@ export default function Sessions() {
     }
   };
 
+  const loadMoreSessions = async () => {
+    if (!nextCursor) return;
+    try {
+      const response = await api.getChatSessions(null, { q: query, cursor: nextCursor });
+      setSessions((prev) => [...prev, ...response.data.sessions]);
+      setNextCursor(response.data.next_cursor);
+    } catch (err) {
+      setError('Unable to load more sessions. Please try again.');
+    }
+  };
+
   const openSession = async (sessionId) => {
     setLoading(true);
     setError('');
@@ -115,6 +128,11 @@ export default function Sessions() {
               <p>{session.message_count} messages</p>
             </button>
           ))}
+          {nextCursor && (
+            <button className="sessions-load-more" onClick={loadMoreSessions}>
+              Load more
+            </button>
+          )}
         </div>
 
         <div className="sessions-detail">
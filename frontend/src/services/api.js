@@ -46,12 +46,38 @@ export const healthCheck = async () => {
   }
 };
 
+// Background jobs
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_POLL_TIMEOUT_MS = 120000;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+export const getJob = (jobId) => api.get(`/jobs/${jobId}`);
+
+// Poll a job until it finishes. Resolves to { data: result } like a direct
+// response; rejects when the job fails or takes too long.
+export const waitForJob = async (jobId) => {
+  const deadline = Date.now() + JOB_POLL_TIMEOUT_MS;
+  while (Date.now() < deadline) {
+    const { data: job } = await getJob(jobId);
+    if (job.status === 'succeeded') {
+      return { data: job.result };
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Job failed');
+    }
+    await sleep(JOB_POLL_INTERVAL_MS);
+  }
+  throw new Error('Timed out waiting for job');
+};
+
 // Chat
 export const createChatSession = (sessionId) =>
   api.post('/chat/session', { session_id: sessionId });
 
+// Returns one page: { sessions, next_cursor }. Pass params.cursor for the next.
 export const getChatSessions = (sessionId, params = {}) => {
-  const query = { ...params };
+  const query = { limit: 20, ...params };
   if (sessionId) {
     query.session_id = sessionId;
   }
@@ -72,14 +98,16 @@ export const renameChatSession = (chatSessionId, title) =>
 export const exportChatSession = (chatSessionId, format = 'json') =>
   api.get(`/chat/session/${chatSessionId}/export`, { params: { format } });
 
-export const sendChatMessage = (sessionId, chatSessionId, message, language = 'en') =>
-  api.post('/chat/message', {
+export const sendChatMessage = async (sessionId, chatSessionId, message, language = 'en') => {
+  const response = await api.post('/chat/message/async', {
     session_id: sessionId,
     chat_session_id: chatSessionId,
     role: 'user',
     message,
     language,
   });
+  return waitForJob(response.data.job_id);
+};
 
 export const deleteChatSession = (chatSessionId, sessionId) =>
   api.delete(`/chat/session/${chatSessionId}`, { params: { session_id: sessionId } });
@@ -124,7 +152,9 @@ export const generateTherapyPlan = (sessionId) =>
 export const getLatestTherapyPlan = (sessionId) =>
   api.get('/plan', { params: { session_id: sessionId } });
 
-export const getPlanHistory = () => api.get('/plan/history');
+export const getPlanHistory = (limit = 20) => api.get('/plan/history', { params: { limit } });
+
+export const getTherapyPlan = (planId) => api.get(`/plan/${planId}`);
 
 export const updatePlanCompletion = (planId, dayIndex, completed) =>
   api.put('/plan/complete', { plan_id: planId, day_index: dayIndex, completed });
@@ -148,12 +178,14 @@ export const completeExercise = (slug, sessionId) =>
 
 export const getExerciseProgress = () => api.get('/exercises/progress');
 
-export const getGuidedExerciseStep = (slug, stepIndex, mode = 'scripted') =>
-  api.post('/exercises/guided', {
-    slug,
-    step_index: stepIndex,
-    mode,
-  });
+export const getGuidedExerciseStep = async (slug, stepIndex, mode = 'scripted') => {
+  const payload = { slug, step_index: stepIndex, mode };
+  if (mode !== 'ai') {
+    return api.post('/exercises/guided', payload);
+  }
+  const response = await api.post('/exercises/guided/async', payload);
+  return waitForJob(response.data.job_id);
+};
 
 // Journal
 export const createJournalEntry = (payload) => api.post('/journal/entries', payload);
@@ -189,4 +221,29 @@ export const exportUserData = (sessionId) =>
 export const deleteAllUserData = (sessionId) =>
   api.delete('/data', { params: { session_id: sessionId } });
 
+export const getDataDeletion = (jobId, sessionId) =>
+  api.get(`/data/deletions/${jobId}`, { params: { session_id: sessionId } });
+
+const DELETION_POLL_TIMEOUT_MS = 600000;
+
+// Start deleting all data and poll until the job succeeds or fails.
+// Resolves to the finished job; rejects if it failed or is still running
+// after the timeout.
+export const deleteAllUserDataAndWait = async (sessionId) => {
+  const { data } = await deleteAllUserData(sessionId);
+  const deadline = Date.now() + DELETION_POLL_TIMEOUT_MS;
+  let job = data.job;
+  while (job.status !== 'succeeded') {
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Data deletion failed');
+    }
+    if (Date.now() > deadline) {
+      throw new Error('Data deletion is still in progress');
+    }
+    await sleep(JOB_POLL_INTERVAL_MS);
+    ({ data: job } = await getDataDeletion(job.id, sessionId));
+  }
+  return job;
+};
+
 export default api;
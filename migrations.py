@@ -0,0 +1,130 @@
+"""Versioned schema migrations.
+
+``db.create_all()`` only creates missing tables; it never adds indexes or
+columns to tables that already exist. Each migration here runs once per
+database, in version order, and is recorded in ``schema_migrations``.
+Migrations must be idempotent (``IF NOT EXISTS`` and column checks), because
+several workers may start at the same time.
+"""
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateIndex
+
+from db import db
+from services.mood_tags import backfill_tag_rows
+from services.plan_completion import backfill_completion_masks, backfill_plan_themes
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    """Register ``func(conn)`` as schema migration ``version``."""
+
+    def decorator(func):
+        MIGRATIONS.append((version, description, func))
+        return func
+
+    return decorator
+
+
+def _create_indexes(conn, *index_names):
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in index_names:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+@migration(1, "Composite indexes for hot queries")
+def _hot_query_indexes(conn):
+    _create_indexes(
+        conn,
+        "ix_chat_messages_session_created",
+        "ix_chat_messages_session_id",
+        "ix_chat_sessions_user_created",
+        "ix_chat_sessions_user_activity",
+        "ix_mood_entries_user_date",
+        "ix_therapy_plan_user_created",
+        "ix_exercise_completions_user_completed",
+    )
+
+
+@migration(2, "Backfill mood_entry_tags from mood_entries.tags_json")
+def _mood_entry_tags(conn):
+    _create_indexes(conn, "ix_mood_entry_tags_user_tag_date")
+    backfill_tag_rows(conn)
+
+
+@migration(3, "Move plan day completion into therapy_plan.completed_days_mask")
+def _plan_completion_mask(conn):
+    if not has_column(conn, "therapy_plan", "completed_days_mask"):
+        conn.execute(text(
+            "ALTER TABLE therapy_plan ADD COLUMN completed_days_mask INTEGER NOT NULL DEFAULT 0"
+        ))
+    backfill_completion_masks(conn)
+
+
+@migration(4, "Copy plan themes into therapy_plan.theme for history listings")
+def _plan_theme(conn):
+    if not has_column(conn, "therapy_plan", "theme"):
+        conn.execute(text("ALTER TABLE therapy_plan ADD COLUMN theme VARCHAR(255)"))
+    backfill_plan_themes(conn)
+
+
+
+@migration(5, "Move mood rollup daily totals into mood_rollup_buckets")
+def _mood_rollup_buckets(conn):
+    # Rollups without bucket rows are rebuilt on the next check-in.
+    if has_column(conn, "mood_rollups", "daily_json"):
+        conn.execute(text("DELETE FROM mood_rollups"))
+
+
+
+@migration(6, "Move exercise per-slug counts into exercise_slug_counts")
+def _exercise_slug_counts(conn):
+    # Progress rows without slug count rows are rebuilt on the next completion.
+    if has_column(conn, "exercise_progress", "slug_counts_json"):
+        conn.execute(text("DELETE FROM exercise_daily_counts"))
+        conn.execute(text("DELETE FROM exercise_progress"))
+
+
+def _ensure_version_table(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, description VARCHAR(255), applied_at TIMESTAMP)"
+    ))
+
+
+def applied_versions():
+    with db.engine.begin() as conn:
+        _ensure_version_table(conn)
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def has_column(conn, table, column):
+    return any(col["name"] == column for col in inspect(conn).get_columns(table))
+
+
+def run_migrations():
+    """Apply pending migrations; return the versions applied by this call."""
+    done = applied_versions()
+    applied = []
+    for version, description, func in sorted(MIGRATIONS, key=lambda item: item[0]):
+        if version in done:
+            continue
+        try:
+            with db.engine.begin() as conn:
+                func(conn)
+                conn.execute(
+                    text(
+                        "INSERT INTO schema_migrations (version, description, applied_at) "
+                        "VALUES (:version, :description, :applied_at)"
+                    ),
+                    {"version": version, "description": description, "applied_at": datetime.utcnow()},
+                )
+        except IntegrityError:
+            # Another worker recorded this version first.
+            continue
+        applied.append(version)
+    return applied
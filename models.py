@@ -72,6 +72,14 @@ class MoodEntry(db.Model):
     entry_date = db.Column(db.Date, default=date.today)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index("ix_mood_entries_user_date", "user_id", "entry_date"),
+    )
+
+    tag_rows = db.relationship(
+        "MoodEntryTag", backref="entry", lazy=True, cascade="all, delete-orphan"
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -83,6 +91,67 @@ class MoodEntry(db.Model):
         }
 
 
+class MoodEntryTag(db.Model):
+    """One row per (mood entry, tag); indexed copy of ``MoodEntry.tags_json``.
+
+    ``user_id`` and ``entry_date`` are copied from the entry so tag filters
+    are answered from the (user_id, tag, entry_date) index alone.
+    """
+    __tablename__ = "mood_entry_tags"
+
+    id = db.Column(db.Integer, primary_key=True)
+    mood_entry_id = db.Column(
+        db.Integer, db.ForeignKey("mood_entries.id"), nullable=False, index=True
+    )
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"))
+    tag = db.Column(db.String(255), nullable=False)
+    entry_date = db.Column(db.Date)
+
+    __table_args__ = (
+        db.UniqueConstraint("mood_entry_id", "tag", name="uq_mood_entry_tags_entry_tag"),
+        db.Index("ix_mood_entry_tags_user_tag_date", "user_id", "tag", "entry_date"),
+    )
+
+
+class MoodRollup(db.Model):
+    """Per-user running mood aggregates, updated with every check-in.
+
+    ``streak_days`` counts consecutive days ending at ``streak_last_date``.
+    Recent per-day and per-week totals live in ``MoodRollupBucket``.
+    """
+    __tablename__ = "mood_rollups"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), unique=True, index=True, nullable=False)
+    entry_count = db.Column(db.Integer, default=0, nullable=False)
+    score_sum = db.Column(db.Integer, default=0, nullable=False)
+    min_score = db.Column(db.Integer)
+    max_score = db.Column(db.Integer)
+    streak_days = db.Column(db.Integer, default=0, nullable=False)
+    streak_last_date = db.Column(db.Date)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class MoodRollupBucket(db.Model):
+    """Check-in count and score sum for one user and one day or ISO week.
+
+    ``period`` is ``"day"`` or ``"week"``; a week bucket starts on Monday.
+    Counters are updated in SQL (``count = count + 1``) so concurrent
+    check-ins never lose an update.
+    """
+    __tablename__ = "mood_rollup_buckets"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "period", "bucket_start", name="uq_mood_rollup_buckets_key"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    period = db.Column(db.String(5), nullable=False)
+    bucket_start = db.Column(db.Date, nullable=False)
+    entry_count = db.Column(db.Integer, default=0, nullable=False)
+    score_sum = db.Column(db.Integer, default=0, nullable=False)
+
+
 class ChatSession(db.Model):
     """Chat session container."""
     __tablename__ = "chat_sessions"
@@ -96,20 +165,45 @@ class ChatSession(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_message_at = db.Column(db.DateTime)
 
+    __table_args__ = (
+        db.Index("ix_chat_sessions_user_created", "user_id", "created_at"),
+        db.Index(
+            "ix_chat_sessions_user_activity",
+            user_id,
+            db.func.coalesce(last_message_at, created_at),
+            id,
+        ),
+    )
+
     messages = db.relationship(
         "ChatMessage", backref="session", lazy=True, cascade="all, delete-orphan"
     )
+    summary = db.relationship(
+        "ChatSessionSummary",
+        backref="session",
+        uselist=False,
+        lazy=True,
+        cascade="all, delete-orphan",
+    )
 
-    def to_dict(self):
-        return {
+    def to_dict(self, message_count=None, last_message_preview=None):
+        """Serialize the session.
+
+        Listing endpoints pass precomputed ``message_count`` and
+        ``last_message_preview`` so ``messages`` is not lazy-loaded.
+        """
+        data = {
             "id": self.id,
             "title": self.title,
             "tags": json.loads(self.tags_json) if self.tags_json else [],
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "last_message_at": self.last_message_at.isoformat() if self.last_message_at else None,
-            "message_count": len(self.messages),
+            "message_count": len(self.messages) if message_count is None else message_count,
         }
+        if last_message_preview is not None:
+            data["last_message_preview"] = last_message_preview
+        return data
 
 
 class ChatMessage(db.Model):
@@ -126,6 +220,11 @@ class ChatMessage(db.Model):
     safety_flags_json = db.Column(db.Text, default="[]")
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index("ix_chat_messages_session_created", "chat_session_id", "created_at"),
+        db.Index("ix_chat_messages_session_id", "chat_session_id", "id"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -137,6 +236,20 @@ class ChatMessage(db.Model):
         }
 
 
+class ChatSessionSummary(db.Model):
+    """Rolling summary of chat turns that no longer fit the prompt budget."""
+    __tablename__ = "chat_session_summaries"
+
+    id = db.Column(db.Integer, primary_key=True)
+    chat_session_id = db.Column(
+        db.Integer, db.ForeignKey("chat_sessions.id"), unique=True, index=True, nullable=False
+    )
+    summary = db.Column(db.Text, default="")
+    summary_tokens = db.Column(db.Integer, default=0)
+    summarized_through_id = db.Column(db.Integer, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class TherapyProfile(db.Model):
     """User's therapy intake profile."""
     __tablename__ = "therapy_profile"
@@ -178,14 +291,26 @@ class TherapyPlan(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), index=True)
     session_id = db.Column(db.String(255), index=True)
     plan_json = db.Column(db.Text, nullable=False)
+    # Copied out of plan_json so history listings never load the body.
+    theme = db.Column(db.String(255))
     completed_items_json = db.Column(db.Text, default="[]")
+    # Bit i set means weekly_plan[i] is done; toggled without touching plan_json.
+    completed_days_mask = db.Column(db.Integer, nullable=False, default=0, server_default="0")
     version = db.Column(db.Integer, default=1)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index("ix_therapy_plan_user_created", "user_id", "created_at"),
+    )
+
     def to_dict(self):
+        plan = json.loads(self.plan_json) if self.plan_json else {}
+        mask = self.completed_days_mask or 0
+        for index, item in enumerate(plan.get("weekly_plan", [])):
+            item["completed"] = bool(mask >> index & 1)
         return {
             "id": self.id,
-            "plan": json.loads(self.plan_json) if self.plan_json else {},
+            "plan": plan,
             "completed_items": json.loads(self.completed_items_json or "[]"),
             "version": self.version,
             "created_at": self.created_at.isoformat(),
@@ -227,6 +352,10 @@ class ExerciseCompletion(db.Model):
     completion_date = db.Column(db.Date, default=date.today)
     completed_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index("ix_exercise_completions_user_completed", "user_id", "completed_at"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -238,6 +367,74 @@ class ExerciseCompletion(db.Model):
         }
 
 
+class ExerciseProgress(db.Model):
+    """Per-user exercise rollup, updated with every completion.
+
+    ``current_streak`` counts consecutive completion days ending at
+    ``streak_last_date``. Per-slug and per-day totals live in
+    ``ExerciseSlugCount`` and ``ExerciseDailyCount``.
+    """
+    __tablename__ = "exercise_progress"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), unique=True, index=True, nullable=False)
+    total_completions = db.Column(db.Integer, default=0, nullable=False)
+    current_streak = db.Column(db.Integer, default=0, nullable=False)
+    longest_streak = db.Column(db.Integer, default=0, nullable=False)
+    streak_last_date = db.Column(db.Date)
+    last_completed_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ExerciseDailyCount(db.Model):
+    """Completions per user per day."""
+    __tablename__ = "exercise_daily_counts"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    count = db.Column(db.Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "day", name="uq_exercise_daily_counts_user_day"),
+    )
+
+
+class ExerciseSlugCount(db.Model):
+    """Completions per user per exercise slug."""
+    __tablename__ = "exercise_slug_counts"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    slug = db.Column(db.String(100), nullable=False)
+    count = db.Column(db.Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "slug", name="uq_exercise_slug_counts_user_slug"),
+    )
+
+
+class GuidedStepResponse(db.Model):
+    """Cached AI-guided exercise step, shared by all users."""
+    __tablename__ = "guided_step_responses"
+
+    id = db.Column(db.Integer, primary_key=True)
+    slug = db.Column(db.String(100), nullable=False)
+    step_index = db.Column(db.Integer, nullable=False)
+    language = db.Column(db.String(10), nullable=False)
+    prompt_version = db.Column(db.Integer, nullable=False)
+    response_json = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "slug", "step_index", "language", "prompt_version",
+            name="uq_guided_step_responses_key",
+        ),
+    )
+
+
 class JournalEntry(db.Model):
     """Private journal entries per user."""
     __tablename__ = "journal_entries"
@@ -263,3 +460,54 @@ class JournalEntry(db.Model):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+class BackgroundJob(db.Model):
+    """State and result of a job queued on the shared executor.
+
+    Stored in the database so a poll can be answered by any worker process,
+    not only the one running the job.
+    """
+    __tablename__ = "background_jobs"
+
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    owner_id = db.Column(db.Integer, index=True)
+    status = db.Column(db.String(20), default="queued", nullable=False)
+    result_json = db.Column(db.Text)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime, index=True)
+
+
+class DataDeletionJob(db.Model):
+    """Progress of a background "delete all my data" request.
+
+    Each step deletes one table in committed batches and records its count
+    here, so a job interrupted by a restart resumes at ``current_step``.
+    """
+    __tablename__ = "data_deletion_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), index=True)
+    session_id = db.Column(db.String(255), index=True)
+    status = db.Column(db.String(20), default="pending", nullable=False, index=True)
+    current_step = db.Column(db.String(50))
+    counts_json = db.Column(db.Text, default="{}")
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "current_step": self.current_step,
+            "deleted": json.loads(self.counts_json or "{}"),
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -2,37 +2,35 @@
 import json
 import logging
 import os
-from datetime import datetime, timedelta
+import re
+import time
+from datetime import datetime
 
-from flask import Blueprint, request, jsonify, g
-from sqlalchemy import or_
+from flask import Blueprint, Response, request, jsonify, g, stream_with_context
+from sqlalchemy import and_, func, or_
 from db import db
-from models import ChatSession, ChatMessage, ChatProfile
+from models import ChatSession, ChatMessage
 from services.auth import require_auth, get_request_session_id
+from services.chat_context import build_history_context
+from services.chat_search import like_pattern, matching_session_ids, search_messages
+from services.jobs import JobQueueFull, job_runner, mark_deprecated, queue_full_response
+from services.llm_provider import llm_provider
+from services.profile_context import get_profile_prompt_prefix
+from services.rate_limit import rate_limiter
 from services.safety_filter import (
     check_safety,
     get_crisis_response,
     get_medium_support_response,
 )
 from src.prompt import system_prompt
-from langchain_core.messages import HumanMessage, SystemMessage
+from utils.pagination import decode_cursor, encode_cursor
 
 chat_bp = Blueprint("chat", __name__, url_prefix="/api/chat")
-rate_limit_store = {}
 logger = logging.getLogger(__name__)
 
-
-def _check_rate_limit(user_id, max_per_minute=20):
-    now = datetime.utcnow()
-    cutoff = now - timedelta(minutes=1)
-    entries = rate_limit_store.get(user_id, [])
-    entries = [ts for ts in entries if ts > cutoff]
-    if len(entries) >= max_per_minute:
-        rate_limit_store[user_id] = entries
-        return False
-    entries.append(now)
-    rate_limit_store[user_id] = entries
-    return True
+SESSION_PAGE_SIZE = 20
+MAX_SESSION_PAGE_SIZE = 100
+SESSION_PREVIEW_CHARS = 80
 
 
 def _make_title_from_message(content):
@@ -40,41 +38,91 @@ def _make_title_from_message(content):
     return trimmed[:60] if trimmed else "New Chat"
 
 
-def _build_profile_context(user_id):
-    profile = ChatProfile.query.filter_by(user_id=user_id).first()
-    if not profile or not profile.onboarding_completed:
-        return ""
-    display_name = profile.display_name or ""
-    tone = profile.tone or ""
-    goal = profile.goal or ""
-    focus_area = profile.focus_area or ""
-    response_length = profile.response_length or ""
-    boundaries = profile.boundaries or ""
+def _build_prompt(user_id, chat_session_id, message, language):
+    """Return (prompt_body, history_text) for an LLM turn."""
+    prompt_prefix = get_profile_prompt_prefix(user_id, language)
+    history_text = build_history_context(chat_session_id)
+    prompt_body = (
+        f"{prompt_prefix}\n"
+        f"System: {system_prompt}\n"
+        f"Conversation history:\n{history_text}\n"
+        f"User: {message}\n"
+        "Assistant:"
+    )
+    return prompt_body, history_text
+
+
+def _build_chat_messages(history_text, message):
+    # Imported here so loading this blueprint does not pull in langchain.
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    return [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=f"{history_text}\nUser: {message}"),
+    ]
+
+
+def _fallback_response(language):
     return (
-        "User preferred tone: "
-        f"{tone}. Goal: {goal}. Focus: {focus_area}. "
-        f"Response length: {response_length}. "
-        f"Boundaries: {boundaries}. "
-        f"Address them as {display_name} if provided."
+        "Thank you for sharing. I'm here to listen and support you. "
+        f"(Language: {language}) What aspect would you like to explore further?"
     )
 
 
-def _fetch_recent_history(chat_session_id, limit=20):
-    messages = (
-        ChatMessage.query.filter_by(chat_session_id=chat_session_id)
-        .order_by(ChatMessage.created_at.desc())
-        .limit(limit)
-        .all()
+def _llm_unavailable_reason():
+    """Return an error string when no LLM can serve the turn, else None."""
+    if not os.getenv("OPENAI_API_KEY"):
+        logger.error("OPENAI_API_KEY missing. Cannot call LLM.")
+        return "OPENAI_API_KEY missing"
+    if not llm_provider.rag_chain() and not llm_provider.chat_model():
+        return "LLM not initialized"
+    return None
+
+
+def _stream_llm_tokens(prompt_body, history_text, message):
+    """Yield response text chunks from the RAG chain or direct chat model."""
+    rag_chain = llm_provider.rag_chain()
+    chat_model = None if rag_chain else llm_provider.chat_model()
+
+    if rag_chain:
+        for chunk in rag_chain.stream({"input": prompt_body}):
+            answer = chunk.get("answer") if isinstance(chunk, dict) else None
+            if answer:
+                yield answer
+    elif chat_model:
+        for chunk in chat_model.stream(_build_chat_messages(history_text, message)):
+            content = getattr(chunk, "content", None)
+            if content:
+                yield content
+    else:
+        raise RuntimeError("LLM not initialized")
+
+
+def _split_template_response(text):
+    """Split a canned response into sentence-sized chunks for streaming."""
+    return re.findall(r"[^.!?]+[.!?]*\s*", text) or [text]
+
+
+def _save_assistant_reply(chat_session, message, bot_response, language, safety_check):
+    bot_message = ChatMessage(
+        chat_session_id=chat_session.id,
+        role="assistant",
+        content=bot_response,
+        language=language,
+        safety_flags_json=json.dumps(safety_check.get("reasons", [])),
     )
-    return list(reversed(messages))
+    db.session.add(bot_message)
+
+    if chat_session.title in ("Untitled Chat", "New Chat") and message:
+        chat_session.title = _make_title_from_message(message)
+
+    chat_session.last_message_at = datetime.utcnow()
+    db.session.commit()
+    return bot_message
 
 
-def _format_history(messages):
-    lines = []
-    for msg in messages:
-        role = msg.role or "user"
-        lines.append(f"{role}: {msg.content}")
-    return "\n".join(lines)
+def _ndjson(event):
+    return json.dumps(event) + "\n"
 
 
 @chat_bp.route("/session", methods=["POST"])
@@ -92,27 +140,123 @@ def create_chat_session():
     return jsonify(new_session.to_dict()), 201
 
 
+def _session_message_stats(session_ids):
+    """Return {session_id: (message_count, last_message_preview)} in one query."""
+    if not session_ids:
+        return {}
+    per_session = (
+        db.session.query(
+            ChatMessage.chat_session_id.label("chat_session_id"),
+            func.count(ChatMessage.id).label("message_count"),
+            func.max(ChatMessage.id).label("last_message_id"),
+        )
+        .filter(ChatMessage.chat_session_id.in_(session_ids))
+        .group_by(ChatMessage.chat_session_id)
+        .subquery()
+    )
+    rows = (
+        db.session.query(
+            per_session.c.chat_session_id,
+            per_session.c.message_count,
+            func.substr(ChatMessage.content, 1, SESSION_PREVIEW_CHARS),
+        )
+        .join(ChatMessage, ChatMessage.id == per_session.c.last_message_id)
+        .all()
+    )
+    return {row[0]: (row[1], row[2]) for row in rows}
+
+
 @chat_bp.route("/sessions", methods=["GET"])
 @require_auth
 def get_chat_sessions():
-    """Get all chat sessions for a user (with optional search)."""
+    """Get chat sessions for a user (with optional search).
+
+    Without ``limit``/``cursor`` this returns the full list, newest first.
+    With them it returns ``{"sessions": [...], "next_cursor": ...}`` ordered
+    by last activity, using keyset pagination. Either way message counts and
+    previews come from a single aggregate query.
+    """
     query = request.args.get("q", "").strip()
+    paginated = "limit" in request.args or "cursor" in request.args
 
     sessions_query = ChatSession.query.filter_by(user_id=g.current_user.id)
     if query:
-        sessions_query = (
-            sessions_query.join(ChatMessage, isouter=True)
-            .filter(
-                or_(
-                    ChatSession.title.ilike(f"%{query}%"),
-                    ChatMessage.content.ilike(f"%{query}%"),
-                )
+        sessions_query = sessions_query.filter(
+            or_(
+                ChatSession.title.ilike(like_pattern(query), escape="\\"),
+                ChatSession.id.in_(matching_session_ids(g.current_user.id, query)),
+            )
+        )
+
+    if not paginated:
+        sessions = sessions_query.order_by(ChatSession.created_at.desc()).all()
+        stats = _session_message_stats([s.id for s in sessions])
+        return jsonify([
+            s.to_dict(*stats.get(s.id, (0, "")))
+            for s in sessions
+        ]), 200
+
+    try:
+        limit = int(request.args.get("limit", SESSION_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    limit = max(1, min(limit, MAX_SESSION_PAGE_SIZE))
+
+    activity = func.coalesce(ChatSession.last_message_at, ChatSession.created_at)
+    cursor = request.args.get("cursor")
+    if cursor:
+        decoded = decode_cursor(cursor)
+        if not decoded:
+            return jsonify({"error": "Invalid cursor"}), 400
+        cursor_activity, cursor_id = decoded
+        sessions_query = sessions_query.filter(
+            or_(
+                activity < cursor_activity,
+                and_(activity == cursor_activity, ChatSession.id < cursor_id),
             )
-            .distinct()
         )
 
-    sessions = sessions_query.order_by(ChatSession.created_at.desc()).all()
-    return jsonify([s.to_dict() for s in sessions]), 200
+    sessions = (
+        sessions_query.order_by(activity.desc(), ChatSession.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(sessions) > limit
+    sessions = sessions[:limit]
+    stats = _session_message_stats([s.id for s in sessions])
+
+    next_cursor = None
+    if has_more:
+        last = sessions[-1]
+        next_cursor = encode_cursor(last.last_message_at or last.created_at, last.id)
+
+    return jsonify({
+        "sessions": [s.to_dict(*stats.get(s.id, (0, ""))) for s in sessions],
+        "next_cursor": next_cursor,
+    }), 200
+
+
+@chat_bp.route("/search", methods=["GET"])
+@require_auth
+def search_chat_messages():
+    """Full-text search over the user's messages, best matches first."""
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "q required"}), 400
+    try:
+        limit = int(request.args.get("limit", SESSION_PAGE_SIZE))
+        offset = int(request.args.get("offset", 0))
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+    limit = max(1, min(limit, MAX_SESSION_PAGE_SIZE))
+    offset = max(0, offset)
+
+    results = search_messages(g.current_user.id, query, limit=limit + 1, offset=offset)
+    has_more = len(results) > limit
+    return jsonify({
+        "results": results[:limit],
+        "next_offset": offset + limit if has_more else None,
+    }), 200
 
 
 @chat_bp.route("/session/<int:chat_session_id>", methods=["GET"])
@@ -195,10 +339,76 @@ def export_chat_session(chat_session_id):
     return jsonify(payload), 200
 
 
-@chat_bp.route("/message", methods=["POST"])
-@require_auth
-def create_chat_message():
-    """Save a user/assistant message and return bot response."""
+def _generate_bot_response(user_id, chat_session_id, message, language, safety_check):
+    """Return (bot_response, used_fallback, fallback_reason) for one turn."""
+    if safety_check["risk_level"] == "high":
+        return get_crisis_response(), False, ""
+    if safety_check["risk_level"] == "medium":
+        return get_medium_support_response(), False, ""
+
+    try:
+        rag_chain = llm_provider.rag_chain()
+        chat_model = None if rag_chain else llm_provider.chat_model()
+
+        prompt_body, history_text = _build_prompt(
+            user_id, chat_session_id, message, language
+        )
+        logger.info("LLM prompt: %s", prompt_body)
+
+        logger.info(
+            "LLM state: rag_chain=%s chat_model=%s",
+            bool(rag_chain),
+            bool(chat_model),
+        )
+
+        if rag_chain:
+            response = rag_chain.invoke({"input": prompt_body})
+            bot_response = response.get(
+                "answer", "I understood your message. How can I help further?"
+            )
+        elif chat_model:
+            messages = _build_chat_messages(history_text, message)
+            logger.info("LLM messages: %s", [m.content for m in messages])
+            response = chat_model.invoke(messages)
+            bot_response = getattr(response, "content", None) or str(response)
+        else:
+            raise RuntimeError("LLM not initialized")
+        return bot_response, False, ""
+    except Exception as exc:
+        logger.exception("LLM error, using fallback: %s", exc)
+        return _fallback_response(language), True, str(exc)
+
+
+def _chat_turn_payload(user_message_id, bot_response, safety_check, used_fallback, fallback_reason):
+    return {
+        "message_id": user_message_id,
+        "bot_response": bot_response,
+        "crisis_mode": safety_check["risk_level"] == "high",
+        "safety_check": safety_check,
+        "used_fallback": used_fallback,
+        "reason": fallback_reason if used_fallback else "",
+    }
+
+
+def _run_chat_turn_job(user_id, chat_session_id, user_message_id, message, language, safety_check):
+    """Background job body: call the LLM and save the assistant reply."""
+    chat_session = ChatSession.query.filter_by(id=chat_session_id, user_id=user_id).first()
+    if not chat_session:
+        raise RuntimeError("Chat session not found")
+    bot_response, used_fallback, fallback_reason = _generate_bot_response(
+        user_id, chat_session_id, message, language, safety_check
+    )
+    _save_assistant_reply(chat_session, message, bot_response, language, safety_check)
+    return _chat_turn_payload(
+        user_message_id, bot_response, safety_check, used_fallback, fallback_reason
+    )
+
+
+def _parse_message_request():
+    """Validate a chat message request.
+
+    Returns (context, None) on success or (None, error_response).
+    """
     data = request.get_json() or {}
     chat_session_id = data.get("chat_session_id")
     message = data.get("message")
@@ -212,18 +422,48 @@ def create_chat_message():
     )
 
     if not message:
-        return jsonify({"error": "Missing message"}), 400
+        return None, (jsonify({"error": "Missing message"}), 400)
     if not chat_session_id:
-        return jsonify({"error": "chat_session_id required"}), 400
+        return None, (jsonify({"error": "chat_session_id required"}), 400)
 
-    if not _check_rate_limit(g.current_user.id):
-        return jsonify({"error": "Rate limit exceeded. Slow down."}), 429
+    if not rate_limiter.hit("chat", g.current_user.id, limit=20, period_seconds=60):
+        return None, (jsonify({"error": "Rate limit exceeded. Slow down."}), 429)
 
     chat_session = ChatSession.query.filter_by(
         id=chat_session_id, user_id=g.current_user.id
     ).first()
     if not chat_session:
-        return jsonify({"error": "Chat session not found"}), 404
+        return None, (jsonify({"error": "Chat session not found"}), 404)
+
+    return {
+        "chat_session": chat_session,
+        "message": message,
+        "language": language,
+    }, None
+
+
+def _llm_unavailable_response(reason):
+    return (
+        jsonify({"error": reason, "used_fallback": True, "reason": reason}),
+        500,
+    )
+
+
+@chat_bp.route("/message", methods=["POST"])
+@require_auth
+def create_chat_message():
+    """Save a user/assistant message and return bot response.
+
+    Deprecated: blocks a worker for the whole LLM call. Use
+    ``/message/async`` (the web app does) or ``/message/stream``.
+    """
+    context, error_response = _parse_message_request()
+    if error_response:
+        return error_response
+    chat_session = context["chat_session"]
+    chat_session_id = chat_session.id
+    message = context["message"]
+    language = context["language"]
 
     safety_check = check_safety(message)
     crisis_mode = safety_check["risk_level"] == "high"
@@ -237,111 +477,217 @@ def create_chat_message():
     )
     db.session.add(user_message)
 
-    used_fallback = False
-    fallback_reason = ""
+    if safety_check["risk_level"] == "low":
+        unavailable = _llm_unavailable_reason()
+        if unavailable:
+            return _llm_unavailable_response(unavailable)
 
-    if crisis_mode:
-        bot_response = get_crisis_response()
-    elif safety_check["risk_level"] == "medium":
-        bot_response = get_medium_support_response()
-    else:
+    bot_response, used_fallback, fallback_reason = _generate_bot_response(
+        g.current_user.id, chat_session_id, message, language, safety_check
+    )
+    _save_assistant_reply(chat_session, message, bot_response, language, safety_check)
+
+    response = jsonify(
+        _chat_turn_payload(
+            user_message.id, bot_response, safety_check, used_fallback, fallback_reason
+        )
+    )
+    response.status_code = 201
+    return mark_deprecated(response, "/api/chat/message/async")
+
+
+@chat_bp.route("/message/async", methods=["POST"])
+@require_auth
+def submit_chat_message():
+    """Save the user message and queue the bot response as a background job.
+
+    Returns 202 with a ``job_id`` to poll at ``/api/jobs/<job_id>``; the job
+    result has the same shape as ``POST /message``. Crisis and medium-risk
+    replies need no LLM call and are recorded as already-finished jobs, so
+    they are never rejected by a full queue.
+    """
+    context, error_response = _parse_message_request()
+    if error_response:
+        return error_response
+    chat_session = context["chat_session"]
+    message = context["message"]
+    language = context["language"]
+    user_id = g.current_user.id
+
+    safety_check = check_safety(message)
+    needs_llm = safety_check["risk_level"] == "low"
+    if needs_llm:
+        unavailable = _llm_unavailable_reason()
+        if unavailable:
+            return _llm_unavailable_response(unavailable)
+
+    user_message = ChatMessage(
+        chat_session_id=chat_session.id,
+        role="user",
+        content=message,
+        language=language,
+        safety_flags_json=json.dumps(safety_check.get("reasons", [])),
+    )
+    db.session.add(user_message)
+
+    if needs_llm:
+        # Commit first so the job sees the user message in the history.
+        db.session.commit()
         try:
-            from app import rag_chain, chat_model
-
-            if not os.getenv("OPENAI_API_KEY"):
-                logger.error("OPENAI_API_KEY missing. Cannot call LLM.")
-                return (
-                    jsonify(
-                        {
-                            "error": "OPENAI_API_KEY missing",
-                            "used_fallback": True,
-                            "reason": "OPENAI_API_KEY missing",
-                        }
-                    ),
-                    500,
-                )
-
-            profile_context = _build_profile_context(g.current_user.id)
-            history = _fetch_recent_history(chat_session_id)
-            history_text = _format_history(history)
-            prompt_prefix = f"[Language: {language}]"
-            if profile_context:
-                prompt_prefix = f"{prompt_prefix} [Chat Profile: {profile_context}]"
-            prompt_body = (
-                f"{prompt_prefix}\n"
-                f"System: {system_prompt}\n"
-                f"Conversation history:\n{history_text}\n"
-                f"User: {message}\n"
-                "Assistant:"
+            job_id = job_runner.submit(
+                "chat_message",
+                _run_chat_turn_job,
+                user_id,
+                chat_session.id,
+                user_message.id,
+                message,
+                language,
+                safety_check,
+                owner_id=user_id,
             )
-            logger.info("LLM prompt: %s", prompt_body)
+        except JobQueueFull as exc:
+            db.session.delete(user_message)
+            db.session.commit()
+            return queue_full_response(exc)
+    else:
+        bot_response, _, _ = _generate_bot_response(
+            user_id, chat_session.id, message, language, safety_check
+        )
+        _save_assistant_reply(chat_session, message, bot_response, language, safety_check)
+        job_id = job_runner.record_result(
+            "chat_message",
+            _chat_turn_payload(user_message.id, bot_response, safety_check, False, ""),
+            owner_id=user_id,
+        )
 
-            logger.info(
-                "LLM state: rag_chain=%s chat_model=%s",
-                bool(rag_chain),
-                bool(chat_model),
-            )
+    return (
+        jsonify(
+            {
+                "job_id": job_id,
+                "status_url": f"/api/jobs/{job_id}",
+                "message_id": user_message.id,
+                "crisis_mode": safety_check["risk_level"] == "high",
+                "safety_check": safety_check,
+            }
+        ),
+        202,
+    )
 
-            if rag_chain:
-                response = rag_chain.invoke({"input": prompt_body})
-                bot_response = response.get(
-                    "answer", "I understood your message. How can I help further?"
-                )
-            elif chat_model:
-                messages = [
-                    SystemMessage(content=system_prompt),
-                    HumanMessage(content=f"{history_text}\nUser: {message}"),
-                ]
-                logger.info("LLM messages: %s", [m.content for m in messages])
-                response = chat_model.invoke(messages)
-                bot_response = getattr(response, "content", None) or str(response)
-            else:
-                return (
-                    jsonify(
-                        {
-                            "error": "LLM not initialized",
-                            "used_fallback": True,
-                            "reason": "LLM not initialized",
-                        }
-                    ),
-                    500,
-                )
-        except Exception as exc:
-            logger.exception("LLM error, using fallback: %s", exc)
-            used_fallback = True
-            fallback_reason = str(exc)
-            bot_response = (
-                "Thank you for sharing. I'm here to listen and support you. "
-                f"(Language: {language}) What aspect would you like to explore further?"
-            )
 
-    bot_message = ChatMessage(
-        chat_session_id=chat_session_id,
-        role="assistant",
-        content=bot_response,
+@chat_bp.route("/message/stream", methods=["POST"])
+@require_auth
+def stream_chat_message():
+    """Stream the bot response as newline-delimited JSON events.
+
+    Events, in order: ``start`` (safety result and user message id), one or
+    more ``token`` chunks, then ``done`` with the saved assistant message and
+    timings. Crisis and medium-risk template responses use the same contract.
+    """
+    started_at = time.perf_counter()
+    context, error_response = _parse_message_request()
+    if error_response:
+        return error_response
+    chat_session = context["chat_session"]
+    message = context["message"]
+    language = context["language"]
+    user_id = g.current_user.id
+
+    safety_check = check_safety(message)
+    risk_level = safety_check["risk_level"]
+    crisis_mode = risk_level == "high"
+
+    if risk_level == "low":
+        unavailable = _llm_unavailable_reason()
+        if unavailable:
+            return _llm_unavailable_response(unavailable)
+
+    user_message = ChatMessage(
+        chat_session_id=chat_session.id,
+        role="user",
+        content=message,
         language=language,
         safety_flags_json=json.dumps(safety_check.get("reasons", [])),
     )
-    db.session.add(bot_message)
+    db.session.add(user_message)
+    # Commit before streaming so no write transaction stays open while the
+    # model is generating.
+    db.session.commit()
 
-    if chat_session.title in ("Untitled Chat", "New Chat") and message:
-        chat_session.title = _make_title_from_message(message)
+    def generate():
+        first_token_ms = None
+        chunks = []
+        used_fallback = False
+        fallback_reason = ""
 
-    chat_session.last_message_at = datetime.utcnow()
-    db.session.commit()
+        yield _ndjson(
+            {
+                "type": "start",
+                "message_id": user_message.id,
+                "crisis_mode": crisis_mode,
+                "safety_check": safety_check,
+            }
+        )
 
-    return (
-        jsonify(
+        if crisis_mode:
+            source = _split_template_response(get_crisis_response())
+        elif risk_level == "medium":
+            source = _split_template_response(get_medium_support_response())
+        else:
+            prompt_body, history_text = _build_prompt(
+                user_id, chat_session.id, message, language
+            )
+            logger.info("LLM prompt: %s", prompt_body)
+            source = _stream_llm_tokens(prompt_body, history_text, message)
+
+        try:
+            for chunk in source:
+                if first_token_ms is None:
+                    first_token_ms = (time.perf_counter() - started_at) * 1000
+                chunks.append(chunk)
+                yield _ndjson({"type": "token", "content": chunk})
+        except Exception as exc:
+            logger.exception("LLM stream error, using fallback: %s", exc)
+            used_fallback = True
+            fallback_reason = str(exc)
+            if not chunks:
+                fallback = _fallback_response(language)
+                first_token_ms = (time.perf_counter() - started_at) * 1000
+                chunks.append(fallback)
+                yield _ndjson({"type": "token", "content": fallback})
+
+        bot_response = "".join(chunks)
+        bot_message = _save_assistant_reply(
+            chat_session, message, bot_response, language, safety_check
+        )
+        total_ms = (time.perf_counter() - started_at) * 1000
+        logger.info(
+            "Chat stream finished: session_id=%s first_token_ms=%.1f total_ms=%.1f",
+            chat_session.id,
+            first_token_ms or 0.0,
+            total_ms,
+        )
+
+        yield _ndjson(
             {
+                "type": "done",
                 "message_id": user_message.id,
+                "bot_message_id": bot_message.id,
                 "bot_response": bot_response,
                 "crisis_mode": crisis_mode,
-                "safety_check": safety_check,
                 "used_fallback": used_fallback,
                 "reason": fallback_reason if used_fallback else "",
+                "timing": {
+                    "first_token_ms": round(first_token_ms or 0.0, 1),
+                    "total_ms": round(total_ms, 1),
+                },
             }
-        ),
-        201,
+        )
+
+    return Response(
+        stream_with_context(generate()),
+        status=200,
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
@@ -1,28 +1,12 @@
 """Contact form routes."""
-from datetime import datetime, timedelta
-
 from flask import Blueprint, request, jsonify, g
 from db import db
 from models import ContactMessage
 from services.auth import get_current_user, get_request_session_id
+from services.rate_limit import rate_limiter
 
 contact_bp = Blueprint("contact", __name__, url_prefix="/api")
 
-rate_limit_store = {}
-
-
-def _check_rate_limit(rate_key, max_per_hour=5):
-    now = datetime.utcnow()
-    cutoff = now - timedelta(hours=1)
-    entries = rate_limit_store.get(rate_key, [])
-    entries = [ts for ts in entries if ts > cutoff]
-    if len(entries) >= max_per_hour:
-        rate_limit_store[rate_key] = entries
-        return False
-    entries.append(now)
-    rate_limit_store[rate_key] = entries
-    return True
-
 
 @contact_bp.route("/contact", methods=["POST"])
 def create_contact_message():
@@ -43,7 +27,7 @@ def create_contact_message():
         return jsonify({"error": "email, category, and message required"}), 400
 
     rate_key = str(user.id) if user else session_id or request.remote_addr
-    if not _check_rate_limit(rate_key, max_per_hour=5):
+    if not rate_limiter.hit("contact", rate_key, limit=5, period_seconds=3600):
         return jsonify({"error": "Rate limit exceeded."}), 429
 
     contact = ContactMessage(
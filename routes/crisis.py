@@ -1,18 +1,25 @@
 """Crisis resources routes."""
 from flask import Blueprint, request, jsonify
-from services.crisis_resources import get_crisis_resources
+from services.crisis_resources import CRISIS_RESOURCES, get_crisis_resources
+from utils.http_cache import StaticJSON
 
 crisis_bp = Blueprint('crisis', __name__, url_prefix='/api')
 
+# One pre-encoded response per known country code.
+_CRISIS_RESPONSES = {
+    country: StaticJSON(get_crisis_resources(country)) for country in CRISIS_RESOURCES
+}
+# Unknown codes get the International list, labelled as such, so one cached
+# response (and ETag) serves them all.
+_FALLBACK_RESPONSE = _CRISIS_RESPONSES['International']
+
 
 @crisis_bp.route('/crisis-resources', methods=['GET'])
 def fetch_crisis_resources():
     """Get crisis resources for a specific country."""
     country = request.args.get('country', 'US')
-    
-    resources = get_crisis_resources(country)
-    
-    return jsonify(resources), 200
+
+    return _CRISIS_RESPONSES.get(country, _FALLBACK_RESPONSE).respond()
 
 
 @crisis_bp.route('/geo-country', methods=['GET'])
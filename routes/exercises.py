@@ -1,30 +1,45 @@
 """Exercises routes."""
 from flask import Blueprint, request, jsonify, g
+from sqlalchemy import and_, or_
 from db import db
 from models import ExerciseCompletion
 from services.auth import require_auth, get_request_session_id
-from services.exercises_data import get_all_exercises, get_exercise_by_slug
+from services.exercise_progress import progress_summary, record_completion
+from services.jobs import JobQueueFull, job_runner, mark_deprecated, queue_full_response
+from services.llm_provider import llm_provider
+from services.exercises_data import EXERCISES, get_all_exercises, get_exercise_by_slug
+from services.guided_step_cache import guided_step_cache
+from utils.http_cache import StaticJSON
+from utils.pagination import decode_cursor, encode_cursor
 
 exercises_bp = Blueprint('exercises', __name__, url_prefix='/api/exercises')
 
+PROGRESS_PAGE_SIZE = 50
+MAX_PROGRESS_PAGE_SIZE = 200
+
+
+# The catalog is static: encode it once and serve bytes with ETags.
+_EXERCISE_LIST = StaticJSON(get_all_exercises())
+_EXERCISE_DETAILS = {
+    exercise['slug']: StaticJSON(exercise) for exercise in EXERCISES
+}
+
 
 @exercises_bp.route('', methods=['GET'])
 def fetch_all_exercises():
     """Get all exercises (summary)."""
-    exercises = get_all_exercises()
-    
-    return jsonify(exercises), 200
+    return _EXERCISE_LIST.respond()
 
 
 @exercises_bp.route('/<slug>', methods=['GET'])
 def fetch_exercise_detail(slug):
     """Get full exercise details by slug."""
-    exercise = get_exercise_by_slug(slug)
-    
+    exercise = _EXERCISE_DETAILS.get(slug)
+
     if not exercise:
         return jsonify({'error': 'Exercise not found'}), 404
-    
-    return jsonify(exercise), 200
+
+    return exercise.respond()
 
 
 @exercises_bp.route('/complete', methods=['POST'])
@@ -42,6 +57,7 @@ def complete_exercise():
         exercise_slug=slug,
     )
     db.session.add(completion)
+    record_completion(completion)
     db.session.commit()
 
     return jsonify(completion.to_dict()), 201
@@ -50,53 +66,203 @@ def complete_exercise():
 @exercises_bp.route('/progress', methods=['GET'])
 @require_auth
 def get_exercise_progress():
-    """Get exercise completion history."""
-    completions = ExerciseCompletion.query.filter_by(user_id=g.current_user.id).all()
-    return jsonify([c.to_dict() for c in completions]), 200
+    """Get exercise completion history.
 
+    Without ``limit``/``cursor`` the full list is returned (legacy shape);
+    with them, newest-first pages of ``{completions, next_cursor}``.
+    """
+    query = ExerciseCompletion.query.filter_by(user_id=g.current_user.id)
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        return jsonify([c.to_dict() for c in query.all()]), 200
 
-@exercises_bp.route('/guided', methods=['POST'])
+    try:
+        limit = int(request.args.get('limit', PROGRESS_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    limit = max(1, min(limit, MAX_PROGRESS_PAGE_SIZE))
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        decoded = decode_cursor(cursor)
+        if not decoded:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        cursor_completed_at, cursor_id = decoded
+        query = query.filter(
+            or_(
+                ExerciseCompletion.completed_at < cursor_completed_at,
+                and_(
+                    ExerciseCompletion.completed_at == cursor_completed_at,
+                    ExerciseCompletion.id < cursor_id,
+                ),
+            )
+        )
+
+    completions = (
+        query.order_by(ExerciseCompletion.completed_at.desc(), ExerciseCompletion.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(completions) > limit
+    completions = completions[:limit]
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(completions[-1].completed_at, completions[-1].id)
+
+    return jsonify({
+        'completions': [c.to_dict() for c in completions],
+        'next_cursor': next_cursor,
+    }), 200
+
+
+@exercises_bp.route('/progress/summary', methods=['GET'])
 @require_auth
-def guided_exercise_step():
-    """Return a guided exercise step (scripted or AI-guided)."""
+def get_exercise_progress_summary():
+    """Completions per slug, per-day counts, streaks and last completion."""
+    try:
+        days = int(request.args.get('days', 30))
+    except ValueError:
+        return jsonify({'error': 'days must be an integer'}), 400
+    if not 1 <= days <= 366:
+        return jsonify({'error': 'days must be between 1 and 366'}), 400
+
+    return jsonify(progress_summary(g.current_user.id, days)), 200
+
+
+def _parse_guided_request():
+    """Validate a guided step request.
+
+    Returns (context, None) on success or (None, error_response).
+    """
     data = request.get_json() or {}
     slug = data.get('slug')
     step_index = data.get('step_index', 0)
     if step_index < 0:
-        return jsonify({'error': 'Invalid step_index'}), 400
+        return None, (jsonify({'error': 'Invalid step_index'}), 400)
     mode = data.get('mode', 'scripted')
 
     exercise = get_exercise_by_slug(slug)
     if not exercise:
-        return jsonify({'error': 'Exercise not found'}), 404
+        return None, (jsonify({'error': 'Exercise not found'}), 404)
+
+    return {
+        'exercise': exercise,
+        'step_index': step_index,
+        'mode': mode,
+        'language': g.current_user.preferred_language or "en",
+    }, None
 
-    steps = exercise.get('steps', [])
-    if mode == 'ai':
-        language = g.current_user.preferred_language or "en"
-        try:
-            from app import rag_chain
-            prompt = (
-                "You are guiding a short wellness exercise. "
-                "Return JSON with keys: title, text, timer_seconds. "
-                f"Exercise: {exercise['title']}. Step index: {step_index}. "
-                f"Respond in language: {language}."
-            )
-            response = rag_chain.invoke({"input": prompt})
-            text = response.get('answer', '')
-            return jsonify({
-                'title': f"Step {step_index + 1}",
-                'text': text,
-                'timer_seconds': None,
-            }), 200
-        except Exception:
-            pass
 
+def _scripted_step(exercise, step_index):
+    steps = exercise.get('steps', [])
     step = steps[step_index] if step_index < len(steps) else None
     if not step:
-        return jsonify({'error': 'Step not found'}), 404
-
-    return jsonify({
+        return None
+    return {
         'title': f"Step {step.get('number')}",
         'text': step.get('instruction'),
         'timer_seconds': None,
-    }), 200
+    }
+
+
+def _ai_step(exercise, step_index, language):
+    """AI step from the shared cache; returns None if the LLM is unavailable."""
+    if step_index >= len(exercise.get('steps', [])):
+        # Keep the cache key space bounded by the real steps.
+        return _generate_ai_step(exercise, step_index, language)
+    return guided_step_cache.get_or_generate(
+        exercise['slug'],
+        step_index,
+        language,
+        lambda: _generate_ai_step(exercise, step_index, language),
+    )
+
+
+def _generate_ai_step(exercise, step_index, language):
+    """Ask the RAG chain for a step; returns None if the LLM is unavailable."""
+    try:
+        rag_chain = llm_provider.rag_chain()
+        # Bump GUIDED_STEP_PROMPT_VERSION when changing this prompt.
+        prompt = (
+            "You are guiding a short wellness exercise. "
+            "Return JSON with keys: title, text, timer_seconds. "
+            f"Exercise: {exercise['title']}. Step index: {step_index}. "
+            f"Respond in language: {language}."
+        )
+        response = rag_chain.invoke({"input": prompt})
+        text = response.get('answer', '')
+        return {
+            'title': f"Step {step_index + 1}",
+            'text': text,
+            'timer_seconds': None,
+        }
+    except Exception:
+        return None
+
+
+def _run_guided_step_job(exercise, step_index, language):
+    """Background job body: AI step with scripted fallback."""
+    step = _ai_step(exercise, step_index, language) or _scripted_step(exercise, step_index)
+    if not step:
+        raise LookupError('Step not found')
+    return step
+
+
+@exercises_bp.route('/guided', methods=['POST'])
+@require_auth
+def guided_exercise_step():
+    """Return a guided exercise step (scripted or AI-guided).
+
+    Deprecated for AI steps: an uncached step blocks a worker on the LLM.
+    Use ``/guided/async`` (the web app does).
+    """
+    context, error_response = _parse_guided_request()
+    if error_response:
+        return error_response
+    exercise = context['exercise']
+    step_index = context['step_index']
+
+    if context['mode'] == 'ai':
+        step = _ai_step(exercise, step_index, context['language'])
+        if step:
+            return mark_deprecated(jsonify(step), '/api/exercises/guided/async')
+
+    step = _scripted_step(exercise, step_index)
+    if not step:
+        return jsonify({'error': 'Step not found'}), 404
+
+    return jsonify(step), 200
+
+
+@exercises_bp.route('/guided/async', methods=['POST'])
+@require_auth
+def submit_guided_exercise_step():
+    """Queue an AI-guided step as a background job (poll /api/jobs/<job_id>).
+
+    Scripted steps need no LLM call and are recorded as finished jobs.
+    """
+    context, error_response = _parse_guided_request()
+    if error_response:
+        return error_response
+    exercise = context['exercise']
+    step_index = context['step_index']
+    user_id = g.current_user.id
+
+    if context['mode'] == 'ai':
+        try:
+            job_id = job_runner.submit(
+                'guided_step',
+                _run_guided_step_job,
+                exercise,
+                step_index,
+                context['language'],
+                owner_id=user_id,
+            )
+        except JobQueueFull as exc:
+            return queue_full_response(exc)
+    else:
+        step = _scripted_step(exercise, step_index)
+        if not step:
+            return jsonify({'error': 'Step not found'}), 404
+        job_id = job_runner.record_result('guided_step', step, owner_id=user_id)
+
+    return jsonify({'job_id': job_id, 'status_url': f"/api/jobs/{job_id}"}), 202
@@ -0,0 +1,17 @@
+"""Background job polling routes."""
+from flask import Blueprint, jsonify, g
+
+from services.auth import require_auth
+from services.jobs import job_runner, job_to_dict
+
+jobs_bp = Blueprint("jobs", __name__, url_prefix="/api/jobs")
+
+
+@jobs_bp.route("/<job_id>", methods=["GET"])
+@require_auth
+def get_job(job_id):
+    """Poll a background job submitted by the current user."""
+    job = job_runner.get(job_id, owner_id=g.current_user.id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job_to_dict(job)), 200
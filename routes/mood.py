@@ -1,14 +1,19 @@
 """Mood tracking routes."""
 from datetime import datetime, timedelta, date
-import json
 
 from flask import Blueprint, request, jsonify, g
+from sqlalchemy import case, func, select
 from db import db
-from models import MoodEntry
+from models import MoodEntry, MoodEntryTag
 from services.auth import require_auth, get_request_session_id
+from services.mood_analytics import DEFAULT_EWMA_SPAN, mood_analytics
+from services.mood_rollup import drop_rollup, record_check_in, rollup_summary, trend_from_averages
+from services.mood_tags import delete_entry_tags, set_entry_tags
 
 mood_bp = Blueprint('mood', __name__, url_prefix='/api/mood')
 
+MAX_ANALYTICS_DAYS = 3660
+
 
 def _parse_date(value):
     if not value:
@@ -29,61 +34,80 @@ def _parse_tags(args):
     return tags
 
 
-def _filter_entries_by_tags(entries, tags):
-    if not tags:
-        return entries
-    filtered = []
-    for entry in entries:
-        entry_tags = json.loads(entry.tags_json or "[]")
-        if any(tag in entry_tags for tag in tags):
-            filtered.append(entry)
-    return filtered
+def _entry_filters(user_id, start_date=None, end_date=None, tags=None):
+    """WHERE clauses for a user's entries; tag matching uses mood_entry_tags."""
+    filters = [MoodEntry.user_id == user_id]
+    if start_date:
+        filters.append(MoodEntry.entry_date >= start_date)
+    if end_date:
+        filters.append(MoodEntry.entry_date <= end_date)
+    if tags:
+        tagged = select(MoodEntryTag.mood_entry_id).where(
+            MoodEntryTag.user_id == user_id, MoodEntryTag.tag.in_(tags)
+        )
+        if start_date:
+            tagged = tagged.where(MoodEntryTag.entry_date >= start_date)
+        if end_date:
+            tagged = tagged.where(MoodEntryTag.entry_date <= end_date)
+        filters.append(MoodEntry.id.in_(tagged))
+    return filters
 
 
-def _calculate_streak(entries):
+def _calculate_streak(filters):
+    """Consecutive days up to today with an entry; reads only the streak's dates."""
     streak = 0
-    if not entries:
-        return streak
-    dates = {entry.entry_date for entry in entries if entry.entry_date}
     day = date.today()
-    while day in dates:
+    dates = db.session.execute(
+        select(MoodEntry.entry_date)
+        .where(*filters, MoodEntry.entry_date <= day)
+        .distinct()
+        .order_by(MoodEntry.entry_date.desc())
+        .execution_options(yield_per=100)
+    ).scalars()
+    for entry_date in dates:
+        if entry_date != day:
+            break
         streak += 1
         day = day - timedelta(days=1)
     return streak
 
 
-def _calculate_trend(entries, window_days=7):
-    if not entries:
-        return {"direction": "flat", "delta": 0, "window_days": window_days}
+def _as_float(value):
+    return float(value) if value is not None else None
+
+
+def _calculate_stats(filters, window_days=7):
+    """count/average/min/max, streak and week-over-week trend, all in SQL."""
     today = date.today()
     current_start = today - timedelta(days=window_days - 1)
     previous_start = current_start - timedelta(days=window_days)
     previous_end = current_start - timedelta(days=1)
 
-    current_scores = [
-        entry.mood_score
-        for entry in entries
-        if entry.entry_date and current_start <= entry.entry_date <= today
-    ]
-    previous_scores = [
-        entry.mood_score
-        for entry in entries
-        if entry.entry_date and previous_start <= entry.entry_date <= previous_end
-    ]
-
-    if not current_scores or not previous_scores:
-        return {"direction": "flat", "delta": 0, "window_days": window_days}
-
-    current_avg = sum(current_scores) / len(current_scores)
-    previous_avg = sum(previous_scores) / len(previous_scores)
-    delta = current_avg - previous_avg
-    if delta > 0.25:
-        direction = "up"
-    elif delta < -0.25:
-        direction = "down"
-    else:
-        direction = "flat"
-    return {"direction": direction, "delta": round(delta, 2), "window_days": window_days}
+    count, avg_mood, min_mood, max_mood, current_avg, previous_avg = db.session.execute(
+        select(
+            func.count(MoodEntry.id),
+            func.avg(MoodEntry.mood_score),
+            func.min(MoodEntry.mood_score),
+            func.max(MoodEntry.mood_score),
+            func.avg(case(
+                (MoodEntry.entry_date.between(current_start, today), MoodEntry.mood_score)
+            )),
+            func.avg(case(
+                (MoodEntry.entry_date.between(previous_start, previous_end), MoodEntry.mood_score)
+            )),
+        ).where(*filters)
+    ).one()
+
+    trend = trend_from_averages(current_avg, previous_avg, window_days)
+
+    return {
+        'count': count,
+        'average_mood': _as_float(avg_mood),
+        'min_mood': min_mood,
+        'max_mood': max_mood,
+        'streak_days': _calculate_streak(filters) if count else 0,
+        'trend': trend,
+    }
 
 
 @mood_bp.route('', methods=['POST'])
@@ -106,9 +130,9 @@ def create_mood_entry():
         user_id=g.current_user.id, entry_date=today
     ).first()
 
+    previous_score = entry.mood_score if entry else None
     if entry:
         entry.mood_score = mood_score
-        entry.tags_json = json.dumps(tags)
         entry.note = note[:500] if note else None
         status_code = 200
     else:
@@ -116,12 +140,13 @@ def create_mood_entry():
             user_id=g.current_user.id,
             session_id=get_request_session_id(),
             mood_score=mood_score,
-            tags_json=json.dumps(tags),
             note=note[:500] if note else None,
             entry_date=today,
         )
         db.session.add(entry)
         status_code = 201
+    set_entry_tags(entry, tags)
+    record_check_in(entry, previous_score)
 
     db.session.commit()
     return jsonify(entry.to_dict()), status_code
@@ -143,44 +168,24 @@ def get_mood_entries():
     end_date = _parse_date(request.args.get('end_date'))
     tags = _parse_tags(request.args)
 
-    query = MoodEntry.query.filter_by(user_id=g.current_user.id)
-
     if range_filter == '7d':
         cutoff = date.today() - timedelta(days=6)
-        query = query.filter(MoodEntry.entry_date >= cutoff)
+        start_date = max(start_date, cutoff) if start_date else cutoff
     elif range_filter == '30d':
         cutoff = date.today() - timedelta(days=29)
-        query = query.filter(MoodEntry.entry_date >= cutoff)
+        start_date = max(start_date, cutoff) if start_date else cutoff
 
-    if start_date:
-        query = query.filter(MoodEntry.entry_date >= start_date)
-    if end_date:
-        query = query.filter(MoodEntry.entry_date <= end_date)
-
-    entries = query.order_by(MoodEntry.entry_date.asc(), MoodEntry.created_at.asc()).all()
-    entries = _filter_entries_by_tags(entries, tags)
-
-    if entries:
-        scores = [entry.mood_score for entry in entries]
-        avg_mood = sum(scores) / len(scores)
-        min_mood = min(scores)
-        max_mood = max(scores)
-    else:
-        avg_mood = min_mood = max_mood = None
-
-    streak = _calculate_streak(entries)
-    trend = _calculate_trend(entries)
+    filters = _entry_filters(g.current_user.id, start_date, end_date, tags)
+    unfiltered = not (start_date or end_date or tags)
+    entries = (
+        MoodEntry.query.filter(*filters)
+        .order_by(MoodEntry.entry_date.asc(), MoodEntry.created_at.asc())
+        .all()
+    )
 
     return jsonify({
         'entries': [entry.to_dict() for entry in entries],
-        'stats': {
-            'count': len(entries),
-            'average_mood': avg_mood,
-            'min_mood': min_mood,
-            'max_mood': max_mood,
-            'streak_days': streak,
-            'trend': trend,
-        },
+        'stats': rollup_summary(g.current_user.id) if unfiltered else _calculate_stats(filters),
     }), 200
 
 
@@ -192,41 +197,36 @@ def get_mood_summary():
     end_date = _parse_date(request.args.get('end_date'))
     tags = _parse_tags(request.args)
 
-    query = MoodEntry.query.filter_by(user_id=g.current_user.id)
-    if start_date:
-        query = query.filter(MoodEntry.entry_date >= start_date)
-    if end_date:
-        query = query.filter(MoodEntry.entry_date <= end_date)
-
-    entries = query.order_by(MoodEntry.entry_date.asc()).all()
-    entries = _filter_entries_by_tags(entries, tags)
+    if not (start_date or end_date or tags):
+        return jsonify(rollup_summary(g.current_user.id)), 200
+    filters = _entry_filters(g.current_user.id, start_date, end_date, tags)
+    return jsonify(_calculate_stats(filters)), 200
 
-    if entries:
-        scores = [entry.mood_score for entry in entries]
-        avg_mood = sum(scores) / len(scores)
-        min_mood = min(scores)
-        max_mood = max(scores)
-    else:
-        avg_mood = min_mood = max_mood = None
 
-    streak = _calculate_streak(entries)
-    trend = _calculate_trend(entries)
+@mood_bp.route('/analytics', methods=['GET'])
+@require_auth
+def get_mood_analytics():
+    """Rolling means, EWMA trend, weekday seasonality, tag deltas and volatility."""
+    try:
+        series_days = int(request.args.get('days', 90))
+        ewma_span = int(request.args.get('ewma_span', DEFAULT_EWMA_SPAN))
+    except ValueError:
+        return jsonify({'error': 'days and ewma_span must be integers'}), 400
+    if not 1 <= series_days <= MAX_ANALYTICS_DAYS:
+        return jsonify({'error': f'days must be between 1 and {MAX_ANALYTICS_DAYS}'}), 400
+    if not 2 <= ewma_span <= 365:
+        return jsonify({'error': 'ewma_span must be between 2 and 365'}), 400
 
-    return jsonify({
-        'count': len(entries),
-        'average_mood': avg_mood,
-        'min_mood': min_mood,
-        'max_mood': max_mood,
-        'streak_days': streak,
-        'trend': trend,
-    }), 200
+    return jsonify(mood_analytics(g.current_user.id, series_days, ewma_span)), 200
 
 
 @mood_bp.route('', methods=['DELETE'])
 @require_auth
 def delete_mood_entries():
     """Delete all mood entries for a user."""
+    delete_entry_tags(MoodEntry.user_id == g.current_user.id)
     MoodEntry.query.filter_by(user_id=g.current_user.id).delete()
+    drop_rollup(g.current_user.id)
     db.session.commit()
-    
+
     return jsonify({'message': 'All mood entries deleted'}), 200
@@ -1,29 +1,20 @@
 """Therapy plan routes."""
 import json
-from datetime import datetime, timedelta
 
 from flask import Blueprint, request, jsonify, g
+from sqlalchemy import and_, or_
 from db import db
 from models import TherapyProfile, TherapyPlan
 from services.auth import require_auth, get_request_session_id
+from services.plan_completion import PLAN_DAY_COUNT, completion_percent, set_day_completed
 from services.plan_generator import generate_weekly_plan
+from services.rate_limit import rate_limiter
+from utils.pagination import decode_cursor, encode_cursor
 
 plan_bp = Blueprint("plan", __name__, url_prefix="/api")
 
-rate_limit_store = {}
-
-
-def _check_rate_limit(user_id, max_per_hour=3):
-    now = datetime.utcnow()
-    cutoff = now - timedelta(hours=1)
-    entries = rate_limit_store.get(user_id, [])
-    entries = [ts for ts in entries if ts > cutoff]
-    if len(entries) >= max_per_hour:
-        rate_limit_store[user_id] = entries
-        return False
-    entries.append(now)
-    rate_limit_store[user_id] = entries
-    return True
+HISTORY_PAGE_SIZE = 20
+MAX_HISTORY_PAGE_SIZE = 100
 
 
 @plan_bp.route("/profile", methods=["GET"])
@@ -83,7 +74,7 @@ def upsert_profile():
 @require_auth
 def generate_plan():
     """Generate a new therapy plan based on profile."""
-    if not _check_rate_limit(g.current_user.id):
+    if not rate_limiter.hit("plan_generate", g.current_user.id, limit=3, period_seconds=3600):
         return jsonify({"error": "Rate limit exceeded. Try again later."}), 429
 
     profile = TherapyProfile.query.filter_by(user_id=g.current_user.id).first()
@@ -98,15 +89,12 @@ def generate_plan():
         }
     )
 
-    # Add completion fields
-    for item in plan_data.get("weekly_plan", []):
-        item["completed"] = False
-
     existing_count = TherapyPlan.query.filter_by(user_id=g.current_user.id).count()
     plan = TherapyPlan(
         user_id=g.current_user.id,
         session_id=get_request_session_id(),
         plan_json=json.dumps(plan_data),
+        theme=(plan_data.get("theme") or "")[:255] or None,
         completed_items_json=json.dumps([]),
         version=existing_count + 1,
     )
@@ -129,16 +117,82 @@ def get_latest_plan():
     return jsonify(plan.to_dict()), 200
 
 
+@plan_bp.route("/plan/<int:plan_id>", methods=["GET"])
+@require_auth
+def get_plan(plan_id):
+    """Get one full plan by id."""
+    plan = TherapyPlan.query.filter_by(id=plan_id, user_id=g.current_user.id).first()
+    if not plan:
+        return jsonify({"error": "Plan not found"}), 404
+    return jsonify(plan.to_dict()), 200
+
+
 @plan_bp.route("/plan/history", methods=["GET"])
 @require_auth
 def get_plan_history():
-    """Get plan history for user."""
-    plans = (
-        TherapyPlan.query.filter_by(user_id=g.current_user.id)
-        .order_by(TherapyPlan.created_at.desc())
+    """Get plan history for user.
+
+    Without ``limit``/``cursor`` every full plan is returned (legacy shape);
+    with them, newest-first pages of plan metadata ``{plans, next_cursor}``
+    read from narrow columns only. Fetch a body with ``GET /plan/<id>``.
+    """
+    if "limit" not in request.args and "cursor" not in request.args:
+        plans = (
+            TherapyPlan.query.filter_by(user_id=g.current_user.id)
+            .order_by(TherapyPlan.created_at.desc())
+            .all()
+        )
+        return jsonify([p.to_dict() for p in plans]), 200
+
+    try:
+        limit = int(request.args.get("limit", HISTORY_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    limit = max(1, min(limit, MAX_HISTORY_PAGE_SIZE))
+
+    query = db.session.query(
+        TherapyPlan.id,
+        TherapyPlan.version,
+        TherapyPlan.theme,
+        TherapyPlan.created_at,
+        TherapyPlan.completed_days_mask,
+    ).filter(TherapyPlan.user_id == g.current_user.id)
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        decoded = decode_cursor(cursor)
+        if not decoded:
+            return jsonify({"error": "Invalid cursor"}), 400
+        cursor_created_at, cursor_id = decoded
+        query = query.filter(
+            or_(
+                TherapyPlan.created_at < cursor_created_at,
+                and_(TherapyPlan.created_at == cursor_created_at, TherapyPlan.id < cursor_id),
+            )
+        )
+
+    rows = (
+        query.order_by(TherapyPlan.created_at.desc(), TherapyPlan.id.desc())
+        .limit(limit + 1)
         .all()
     )
-    return jsonify([p.to_dict() for p in plans]), 200
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+
+    return jsonify({
+        "plans": [
+            {
+                "id": row.id,
+                "version": row.version,
+                "theme": row.theme,
+                "created_at": row.created_at.isoformat(),
+                "completion_percent": completion_percent(row.completed_days_mask),
+            }
+            for row in rows
+        ],
+        "next_cursor": next_cursor,
+    }), 200
 
 
 @plan_bp.route("/plan/complete", methods=["PUT"])
@@ -153,19 +207,17 @@ def update_plan_completion():
     if plan_id is None or day_index is None:
         return jsonify({"error": "plan_id and day_index required"}), 400
 
-    plan = TherapyPlan.query.filter_by(
-        id=plan_id, user_id=g.current_user.id
-    ).first()
-    if not plan:
-        return jsonify({"error": "Plan not found"}), 404
-
-    plan_data = json.loads(plan.plan_json or "{}")
-    weekly_plan = plan_data.get("weekly_plan", [])
-    if day_index < 0 or day_index >= len(weekly_plan):
+    if (
+        not isinstance(day_index, int)
+        or isinstance(day_index, bool)
+        or not 0 <= day_index < PLAN_DAY_COUNT
+    ):
         return jsonify({"error": "Invalid day_index"}), 400
 
-    weekly_plan[day_index]["completed"] = bool(completed)
-    plan.plan_json = json.dumps(plan_data)
+    # One integer UPDATE; plan_json is never rewritten.
+    if not set_day_completed(plan_id, g.current_user.id, day_index, bool(completed)):
+        return jsonify({"error": "Plan not found"}), 404
     db.session.commit()
 
+    plan = db.session.get(TherapyPlan, plan_id)
     return jsonify(plan.to_dict()), 200
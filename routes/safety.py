@@ -1,14 +1,31 @@
 """Safety check routes."""
 from flask import Blueprint, request, jsonify
-from services.safety_filter import check_safety
+from services.safety_filter import check_safety, check_safety_batch
 
 safety_bp = Blueprint('safety', __name__, url_prefix='/api/safety')
 
+MAX_BATCH_SIZE = 100
+
 
 @safety_bp.route('/check', methods=['POST'])
 def check_text_safety():
-    """Check if text contains crisis or self-harm indicators."""
-    data = request.get_json()
+    """Check if text contains crisis or self-harm indicators.
+
+    Accepts either ``{"text": "..."}`` or ``{"texts": ["...", ...]}``; the
+    batch form returns ``{"results": [...]}`` in input order.
+    """
+    data = request.get_json() or {}
+
+    if 'texts' in data:
+        texts = data.get('texts')
+        if not isinstance(texts, list) or not texts:
+            return jsonify({'error': 'texts must be a non-empty list'}), 400
+        if len(texts) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'texts may contain at most {MAX_BATCH_SIZE} items'}), 400
+        if not all(isinstance(text, str) for text in texts):
+            return jsonify({'error': 'texts must contain only strings'}), 400
+        return jsonify({'results': check_safety_batch(texts)}), 200
+
     text = data.get('text', '')
     
     if not text:
@@ -13,6 +13,9 @@ from models import (
     ExerciseCompletion,
 )
 from services.auth import require_auth, get_request_session_id
+from services.exercise_progress import drop_progress
+from services.mood_rollup import drop_rollup
+from services.mood_tags import attach_entry_tags
 
 user_bp = Blueprint("user", __name__, url_prefix="/api/user")
 
@@ -55,6 +58,7 @@ def attach_session():
     if not session_id:
         return jsonify({"error": "session_id required"}), 400
 
+    attach_entry_tags(session_id, g.current_user.id)
     MoodEntry.query.filter_by(session_id=session_id, user_id=None).update(
         {"user_id": g.current_user.id}
     )
@@ -73,6 +77,9 @@ def attach_session():
     ExerciseCompletion.query.filter_by(session_id=session_id, user_id=None).update(
         {"user_id": g.current_user.id}
     )
+    # Attached rows can fall anywhere in history; rebuild rollups on next read.
+    drop_rollup(g.current_user.id)
+    drop_progress(g.current_user.id)
 
     db.session.commit()
     return jsonify({"message": "Session data attached."}), 200
@@ -0,0 +1,96 @@
+"""Benchmark per-request auth overhead of ``get_current_user``.
+
+Firebase verification is replaced by a local verifier that burns a fixed
+amount of CPU (``--verify-ms``), standing in for signature checks. The
+script reports mean latency, verifier calls and DB writes per request, with
+and without the token/user caches.
+
+Usage: python scripts/bench_auth.py [--requests N] [--verify-ms MS]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from flask import Flask  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from db import db  # noqa: E402
+import models  # noqa: E402,F401
+from services import auth  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--verify-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    db_path = Path(tempfile.mkdtemp()) / "bench_auth.db"
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+    db.init_app(app)
+
+    counters = {"verify": 0, "writes": 0, "commits": 0}
+
+    def fake_verify(token):
+        counters["verify"] += 1
+        deadline = time.perf_counter() + args.verify_ms / 1000
+        while time.perf_counter() < deadline:
+            pass
+        return {
+            "uid": "bench-user",
+            "email": "bench@example.com",
+            "name": "Bench User",
+            "exp": time.time() + 3600,
+        }
+
+    auth._verify_id_token = fake_verify
+
+    with app.app_context():
+        db.create_all()
+
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def count_writes(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().split(" ", 1)[0].upper() in ("INSERT", "UPDATE", "DELETE"):
+                counters["writes"] += 1
+
+        @event.listens_for(db.engine, "commit")
+        def count_commits(conn):
+            counters["commits"] += 1
+
+    headers = {"Authorization": "Bearer bench-token"}
+
+    def run(cached):
+        auth.clear_auth_caches()
+        counters.update(verify=0, writes=0, commits=0)
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            if not cached:
+                auth.clear_auth_caches()
+            with app.test_request_context("/api/mood", headers=headers):
+                assert auth.get_current_user() is not None
+                db.session.remove()
+        elapsed = time.perf_counter() - started
+        print(
+            f"{'cached' if cached else 'uncached':9}: "
+            f"{elapsed / args.requests * 1e6:8.1f} us/request, "
+            f"{counters['verify'] / args.requests:.3f} verifications/request, "
+            f"{counters['writes']} DB writes, {counters['commits']} commits"
+        )
+
+    # First request creates the user row; exclude it from both runs.
+    with app.test_request_context("/", headers=headers):
+        auth.get_current_user()
+        db.session.remove()
+
+    run(cached=False)
+    run(cached=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""Compare embedding backends: encode throughput and retrieval parity.
+
+Encodes a corpus with the PyTorch (``huggingface``) backend and with each
+ONNX export found in ``EMBEDDING_ONNX_PATH`` (fp32 ``model.onnx`` and int8
+``model_int8.onnx``). For each ONNX variant it reports:
+
+- throughput in texts/s and single-query latency;
+- cosine similarity to the reference vectors of the same texts;
+- recall@k: the overlap of its top-k with the reference top-k.
+
+The corpus is the chunked PDFs under ``--data`` when any exist, otherwise
+synthetic sentences. Exits non-zero when any variant's recall is below
+``--min-recall``.
+
+Usage: python scripts/bench_embeddings.py [--data DIR] [--limit N] [--queries N] [-k K]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.helper import download_hugging_face_embeddings  # noqa: E402
+from src.onnx_embeddings import EMBEDDING_ONNX_PATH, OnnxMiniLMEmbeddings  # noqa: E402
+
+WORDS = (
+    "anxiety sleep breathing worry stress panic calm grounding thoughts mood "
+    "therapy exercise journal family work support feelings body tension focus "
+    "avoidance habits routine evening morning reframe notice gently practice"
+).split()
+
+
+def load_corpus(data_dir, limit):
+    pdfs = sorted(Path(data_dir).glob("**/*.pdf")) if os.path.isdir(data_dir) else []
+    if pdfs:
+        from src.ingest import split_pdf
+
+        texts = [text for pdf in pdfs for text, _ in split_pdf(str(pdf))]
+        return texts[:limit]
+    rng = random.Random(3)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 90))).capitalize() + "."
+        for _ in range(limit)
+    ]
+
+
+def timed_encode(embeddings, texts, queries):
+    started = time.perf_counter()
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    elapsed = time.perf_counter() - started
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        embeddings.embed_query(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+    query_vectors = np.asarray([embeddings.embed_query(q) for q in queries], dtype=np.float32)
+    return vectors, query_vectors, len(texts) / elapsed, statistics.median(latencies)
+
+
+def top_k(corpus, queries, k):
+    return np.argsort(-(queries @ corpus.T), axis=1)[:, :k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data", default="data/")
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    args = parser.parse_args()
+
+    texts = load_corpus(args.data, args.limit)
+    rng = random.Random(5)
+    queries = [" ".join(text.split()[:12]) for text in rng.sample(texts, min(args.queries, len(texts)))]
+    print(f"{len(texts)} texts, {len(queries)} queries")
+
+    reference = download_hugging_face_embeddings("huggingface", cached=False)
+    ref_docs, ref_queries, rate, latency = timed_encode(reference, texts, queries)
+    ref_docs /= np.linalg.norm(ref_docs, axis=1, keepdims=True)
+    ref_queries /= np.linalg.norm(ref_queries, axis=1, keepdims=True)
+    ref_top = top_k(ref_docs, ref_queries, args.k)
+    print(f"{'huggingface':16}: {rate:8.1f} texts/s  query p50 {latency:6.2f} ms")
+
+    failed = False
+    for filename in ("model.onnx", "model_int8.onnx"):
+        if not os.path.exists(os.path.join(EMBEDDING_ONNX_PATH, filename)):
+            print(f"{filename}: not found in {EMBEDDING_ONNX_PATH}; run scripts/export_onnx_embeddings.py")
+            continue
+        embeddings = OnnxMiniLMEmbeddings(filename=filename)
+        docs, query_vectors, rate, latency = timed_encode(embeddings, texts, queries)
+        cosine = np.sum(docs * ref_docs, axis=1)
+        candidate_top = top_k(docs, query_vectors, args.k)
+        recall = statistics.mean(
+            len(set(a) & set(b)) / args.k for a, b in zip(candidate_top, ref_top)
+        )
+        print(
+            f"{filename:16}: {rate:8.1f} texts/s  query p50 {latency:6.2f} ms  "
+            f"cosine mean {cosine.mean():.4f} min {cosine.min():.4f}  "
+            f"recall@{args.k} {recall:.3f}"
+        )
+        failed = failed or recall < args.min_recall
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Guard worker boot time: measure how long ``import app`` takes.
+
+Imports the module in fresh interpreters (``APP_WARMUP=false``, so nothing
+is built in the background) and reports the median wall time and the
+slowest imports from ``python -X importtime``. Fails when the median
+exceeds ``--budget-ms`` or when a heavy module (langchain, torch,
+sentence-transformers, pinecone, onnxruntime) is imported at module load;
+those belong in the lazy warm-up in ``services/llm_provider.py``.
+
+Usage: python scripts/bench_import_time.py [--module app] [--runs N] [--budget-ms MS]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = (
+    "langchain",
+    "langchain_core",
+    "langchain_openai",
+    "langchain_pinecone",
+    "langchain_community",
+    "langchain_huggingface",
+    "sentence_transformers",
+    "torch",
+    "pinecone",
+    "onnxruntime",
+)
+PROBE = (
+    "import json, sys, time\n"
+    "started = time.perf_counter()\n"
+    "import {module}\n"
+    "elapsed = time.perf_counter() - started\n"
+    "heavy = sorted(m for m in {heavy!r} if m in sys.modules)\n"
+    "print(json.dumps({{'seconds': elapsed, 'heavy': heavy}}))\n"
+)
+
+
+def _env():
+    env = dict(os.environ, APP_WARMUP="false", PYTHONDONTWRITEBYTECODE="1")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    return env
+
+
+def probe(module):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(module, count):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)", line)
+        if match:
+            rows.append((int(match.group(1)), match.group(2)))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2000)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    samples, heavy = [], set()
+    for _ in range(args.runs):
+        result = probe(args.module)
+        samples.append(result["seconds"] * 1000)
+        heavy.update(result["heavy"])
+
+    print(f"import {args.module}: median {statistics.median(samples):.0f} ms, "
+          f"max {max(samples):.0f} ms over {args.runs} runs")
+    print("slowest imports (cumulative):")
+    for micros, name in slowest_imports(args.module, args.top):
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if heavy:
+        print(f"FAIL: heavy modules imported at load time: {', '.join(sorted(heavy))}")
+        failed = True
+    median = statistics.median(samples)
+    if median > args.budget_ms:
+        print(f"FAIL: median {median:.0f} ms exceeds budget {args.budget_ms:g} ms")
+        failed = True
+    if not failed:
+        print(f"OK: within {args.budget_ms:g} ms and no heavy imports")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Benchmark /api/mood/analytics on long daily histories.
+
+Seeds one user with ``--years`` of daily check-ins (with tags) in a
+throwaway SQLite database, then times the load from the database and the
+NumPy computation separately. For reference it also times a pure-Python
+version of just the rolling 7/30-day means. Exits non-zero when the p95 of
+load + compute exceeds ``--budget-ms``.
+
+Usage: python scripts/bench_mood_analytics.py [--years N] [--runs N] [--budget-ms MS]
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from flask import Flask  # noqa: E402
+
+from db import db  # noqa: E402
+from models import MoodEntry, MoodEntryTag, User  # noqa: E402
+from services.mood_analytics import compute_analytics, load_history  # noqa: E402
+
+TAGS = ["work", "sleep", "family", "exercise", "social", "stress", "calm", "health"]
+
+
+def seed(user_id, years):
+    random.seed(42)
+    today = date.today()
+    days = int(years * 365.25)
+    entries = []
+    for offset in range(days, 0, -1):
+        if random.random() < 0.1:
+            continue  # skipped check-in
+        day = today - timedelta(days=offset)
+        score = max(1, min(10, round(6 + 1.5 * (day.weekday() >= 5) + random.gauss(0, 2))))
+        entries.append({"user_id": user_id, "mood_score": score, "entry_date": day})
+    db.session.execute(MoodEntry.__table__.insert(), entries)
+    rows = db.session.execute(
+        db.select(MoodEntry.id, MoodEntry.entry_date).where(MoodEntry.user_id == user_id)
+    ).all()
+    tag_rows = [
+        {"mood_entry_id": entry_id, "user_id": user_id, "tag": tag, "entry_date": day}
+        for entry_id, day in rows
+        for tag in random.sample(TAGS, k=random.randint(0, 3))
+    ]
+    db.session.execute(MoodEntryTag.__table__.insert(), tag_rows)
+    db.session.commit()
+    return len(entries), len(tag_rows)
+
+
+def python_rolling_means(user_id):
+    entries = MoodEntry.query.filter_by(user_id=user_id).all()
+    by_day = {}
+    for entry in entries:
+        by_day.setdefault(entry.entry_date, []).append(entry.mood_score)
+    day, last = min(by_day), date.today()
+    result = []
+    while day <= last:
+        row = []
+        for window in (7, 30):
+            scores = [
+                score
+                for offset in range(window)
+                for score in by_day.get(day - timedelta(days=offset), [])
+            ]
+            row.append(sum(scores) / len(scores) if scores else None)
+        result.append(row)
+        day += timedelta(days=1)
+    return result
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=float, default=12)
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--budget-ms", type=float, default=100)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    db_path = Path(tempfile.mkdtemp()) / "bench_mood.db"
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        user = User(firebase_uid="bench-user")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        entries, tags = seed(user_id, args.years)
+        print(f"{entries} entries, {tags} tag rows over {args.years:g} years")
+
+        load_ms, compute_ms, total_ms = [], [], []
+        for _ in range(args.runs):
+            db.session.remove()
+            started = time.perf_counter()
+            history = load_history(user_id)
+            loaded = time.perf_counter()
+            compute_analytics(*history, series_days=365)
+            finished = time.perf_counter()
+            load_ms.append((loaded - started) * 1000)
+            compute_ms.append((finished - loaded) * 1000)
+            total_ms.append((finished - started) * 1000)
+
+        db.session.remove()
+        started = time.perf_counter()
+        python_rolling_means(user_id)
+        python_ms = (time.perf_counter() - started) * 1000
+
+    for name, samples in (("load", load_ms), ("compute", compute_ms), ("total", total_ms)):
+        print(
+            f"{name:8}: p50 {statistics.median(samples):7.2f} ms  "
+            f"p95 {percentile(samples, 0.95):7.2f} ms"
+        )
+    print(f"python rolling 7/30-day means only: {python_ms:.2f} ms")
+
+    p95 = percentile(total_ms, 0.95)
+    if p95 > args.budget_ms:
+        print(f"FAIL: p95 {p95:.2f} ms exceeds budget {args.budget_ms:g} ms")
+        return 1
+    print(f"OK: p95 {p95:.2f} ms within budget {args.budget_ms:g} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
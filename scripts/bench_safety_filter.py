@@ -0,0 +1,95 @@
+"""Microbenchmark: per-keyword regex scan vs. the precompiled safety matcher.
+
+Usage: python scripts/bench_safety_filter.py [--repeat N] [--words N]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from services.safety_filter import CRISIS_KEYWORDS, check_safety  # noqa: E402
+
+FILLER_WORDS = (
+    "today i felt tired and a bit anxious about work but talking helps "
+    "my friend called me and we went for a walk in the park after lunch"
+).split()
+
+
+def legacy_check_safety(text):
+    """The original implementation: one regex compile and scan per keyword."""
+    text_lower = text.lower()
+    detected_keywords = []
+
+    for keyword in CRISIS_KEYWORDS["self_harm"]:
+        if re.search(r"\b" + re.escape(keyword) + r"\b", text_lower):
+            detected_keywords.append(keyword)
+
+    if not detected_keywords:
+        for keyword in CRISIS_KEYWORDS["crisis"]:
+            if re.search(r"\b" + re.escape(keyword) + r"\b", text_lower):
+                detected_keywords.append(keyword)
+
+    if detected_keywords and any(
+        kw in CRISIS_KEYWORDS["self_harm"] for kw in detected_keywords
+    ):
+        risk_level = "high"
+    elif detected_keywords:
+        risk_level = "medium"
+    else:
+        risk_level = "low"
+
+    return {"risk_level": risk_level, "reasons": detected_keywords}
+
+
+def make_corpus(count, words, seed=7):
+    rng = random.Random(seed)
+    keywords = CRISIS_KEYWORDS["self_harm"] + CRISIS_KEYWORDS["crisis"]
+    corpus = []
+    for i in range(count):
+        tokens = [rng.choice(FILLER_WORDS) for _ in range(words)]
+        # A third of texts are clean, the rest carry one to three keywords.
+        for _ in range(i % 3 and rng.randint(1, 3)):
+            tokens.insert(rng.randrange(len(tokens)), rng.choice(keywords).upper())
+        corpus.append(" ".join(tokens))
+    return corpus
+
+
+def bench(func, corpus, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in corpus:
+            func(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=200)
+    parser.add_argument("--words", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.texts, args.words)
+    mismatches = [t for t in corpus if legacy_check_safety(t) != check_safety(t)]
+    if mismatches:
+        print(f"FAIL: {len(mismatches)} texts differ between implementations")
+        return 1
+
+    legacy = bench(legacy_check_safety, corpus, args.repeat)
+    current = bench(check_safety, corpus, args.repeat)
+    total_mb = sum(len(t) for t in corpus) / 1e6
+    print(f"{args.texts} texts x ~{args.words} words ({total_mb:.1f} MB), best of {args.repeat}")
+    print(f"legacy   : {legacy * 1000:8.1f} ms  ({total_mb / legacy:6.1f} MB/s)")
+    print(f"compiled : {current * 1000:8.1f} ms  ({total_mb / current:6.1f} MB/s)")
+    print(f"speedup  : {legacy / current:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Benchmark the local vector store offline (no model, no network).
+
+Builds flat and IVF indexes over ``--count`` synthetic, clustered 384-d
+vectors, saves them to a temporary directory and reloads them memory-mapped,
+then reports load time, query latency (p50/p95) and IVF recall@k against
+exact flat search.
+
+Usage: python scripts/bench_vector_store.py [--count N] [--queries N] [--nprobe N]
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from langchain_core.documents import Document  # noqa: E402
+
+from src.vector_store import LocalVectorStore  # noqa: E402
+
+DIM = 384
+
+
+class QueryEmbeddings:
+    """Maps a query string to a pre-generated vector (``"q<index>"``)."""
+
+    def __init__(self, queries):
+        self.queries = queries
+
+    def embed_query(self, text):
+        return self.queries[int(text[1:])]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+def synthetic(count, queries, clusters=200, seed=7):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, DIM)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=count + queries)
+    points = centers[labels] + 0.6 * rng.normal(size=(count + queries, DIM)).astype(np.float32)
+    return points[:count], points[count:]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("-k", type=int, default=3)
+    args = parser.parse_args()
+
+    vectors, queries = synthetic(args.count, args.queries)
+    embeddings = QueryEmbeddings(queries)
+    documents = [Document(page_content=f"chunk {i}", metadata={"row": i}) for i in range(args.count)]
+    ids = [str(i) for i in range(args.count)]
+    root = Path(tempfile.mkdtemp())
+
+    results = {}
+    for index_type in ("flat", "ivf"):
+        started = time.perf_counter()
+        store = LocalVectorStore(embeddings)
+        store.add_vectors(vectors, documents, ids)
+        if index_type == "ivf":
+            store.build_ivf()
+        store.save(root / index_type)
+        build_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        store = LocalVectorStore.load(embeddings, root / index_type, nprobe=args.nprobe)
+        load_ms = (time.perf_counter() - started) * 1000
+
+        latencies, hits = [], []
+        for q in range(args.queries):
+            started = time.perf_counter()
+            found = store.similarity_search(f"q{q}", k=args.k)
+            latencies.append((time.perf_counter() - started) * 1000)
+            hits.append({doc.metadata["row"] for doc in found})
+        results[index_type] = hits
+        print(
+            f"{index_type:4}: build {build_s:6.2f} s  load {load_ms:7.2f} ms  "
+            f"query p50 {statistics.median(latencies):6.2f} ms  "
+            f"p95 {percentile(latencies, 0.95):6.2f} ms"
+        )
+
+    recall = statistics.mean(
+        len(ivf & flat) / len(flat) for ivf, flat in zip(results["ivf"], results["flat"])
+    )
+    print(f"ivf recall@{args.k} vs flat (nprobe={args.nprobe}): {recall:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
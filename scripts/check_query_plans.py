@@ -0,0 +1,201 @@
+"""Query-plan regression check for the hot queries used by the blueprints.
+
+Builds the schema (create_all + migrations + search index), runs EXPLAIN on
+each hot query and exits non-zero if any plan falls back to a full table
+scan. It uses ``DATABASE_URL`` when set (SQLite or Postgres); otherwise a
+throwaway SQLite file.
+
+* SQLite: ``EXPLAIN QUERY PLAN``; a ``SCAN <table>`` step on a real table fails.
+* Postgres: ``EXPLAIN`` with ``enable_seqscan = off``; a ``Seq Scan`` fails
+  (with seqscans disabled, the planner only picks one if no index applies).
+
+Usage: python scripts/check_query_plans.py [-v]
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from flask import Flask  # noqa: E402
+from sqlalchemy import and_, func, or_, select, text  # noqa: E402
+
+from db import db, init_db  # noqa: E402
+from migrations import run_migrations  # noqa: E402
+from models import (  # noqa: E402
+    ChatMessage,
+    ChatProfile,
+    ChatSession,
+    ChatSessionSummary,
+    ExerciseCompletion,
+    ExerciseDailyCount,
+    ExerciseSlugCount,
+    MoodEntry,
+    MoodEntryTag,
+    TherapyPlan,
+    TherapyProfile,
+    User,
+)
+from services.chat_search import ensure_search_index  # noqa: E402
+
+
+def hot_queries():
+    """(name, statement) pairs mirroring the queries issued by the routes."""
+    now = datetime.utcnow()
+    today = date.today()
+    activity = func.coalesce(ChatSession.last_message_at, ChatSession.created_at)
+    per_session = (
+        select(
+            ChatMessage.chat_session_id,
+            func.count(ChatMessage.id).label("message_count"),
+            func.max(ChatMessage.id).label("last_message_id"),
+        )
+        .where(ChatMessage.chat_session_id.in_([1, 2, 3]))
+        .group_by(ChatMessage.chat_session_id)
+        .subquery()
+    )
+    return [
+        ("auth: user by firebase uid",
+         select(User).where(User.firebase_uid == "uid")),
+        ("chat: profile prefix",
+         select(ChatProfile).where(ChatProfile.user_id == 1)),
+        ("chat: session ownership check",
+         select(ChatSession).where(ChatSession.id == 1, ChatSession.user_id == 1)),
+        ("chat: rolling summary row",
+         select(ChatSessionSummary).where(ChatSessionSummary.chat_session_id == 1)),
+        ("chat: unsummarized history",
+         select(ChatMessage)
+         .where(ChatMessage.chat_session_id == 1, ChatMessage.id > 0)
+         .order_by(ChatMessage.id.desc())
+         .limit(60)),
+        ("chat: session detail messages",
+         select(ChatMessage)
+         .where(ChatMessage.chat_session_id == 1)
+         .order_by(ChatMessage.created_at.asc())),
+        ("chat: session list (legacy order)",
+         select(ChatSession)
+         .where(ChatSession.user_id == 1)
+         .order_by(ChatSession.created_at.desc())),
+        ("chat: session list (keyset page)",
+         select(ChatSession)
+         .where(
+             ChatSession.user_id == 1,
+             or_(activity < now, and_(activity == now, ChatSession.id < 10)),
+         )
+         .order_by(activity.desc(), ChatSession.id.desc())
+         .limit(21)),
+        ("chat: session list message stats",
+         select(per_session.c.chat_session_id, per_session.c.message_count, ChatMessage.content)
+         .join(ChatMessage, ChatMessage.id == per_session.c.last_message_id)),
+        ("mood: today's entry",
+         select(MoodEntry).where(MoodEntry.user_id == 1, MoodEntry.entry_date == today)),
+        ("mood: range query",
+         select(MoodEntry)
+         .where(MoodEntry.user_id == 1, MoodEntry.entry_date >= today)
+         .order_by(MoodEntry.entry_date.asc())),
+        ("mood: tag filter",
+         select(MoodEntry.mood_score)
+         .where(
+             MoodEntry.user_id == 1,
+             MoodEntry.id.in_(
+                 select(MoodEntryTag.mood_entry_id).where(
+                     MoodEntryTag.user_id == 1,
+                     MoodEntryTag.tag.in_(["calm", "work"]),
+                     MoodEntryTag.entry_date >= today,
+                 )
+             ),
+         )),
+        ("plan: therapy profile",
+         select(TherapyProfile).where(TherapyProfile.user_id == 1)),
+        ("plan: latest plan",
+         select(TherapyPlan)
+         .where(TherapyPlan.user_id == 1)
+         .order_by(TherapyPlan.created_at.desc())
+         .limit(1)),
+        ("plan: history page",
+         select(TherapyPlan.id, TherapyPlan.version, TherapyPlan.theme, TherapyPlan.created_at)
+         .where(TherapyPlan.user_id == 1)
+         .order_by(TherapyPlan.created_at.desc(), TherapyPlan.id.desc())
+         .limit(21)),
+        ("exercises: progress history",
+         select(ExerciseCompletion)
+         .where(ExerciseCompletion.user_id == 1)
+         .order_by(ExerciseCompletion.completed_at.desc())),
+        ("exercises: daily counts",
+         select(ExerciseDailyCount)
+         .where(ExerciseDailyCount.user_id == 1, ExerciseDailyCount.day > today)
+         .order_by(ExerciseDailyCount.day.asc())),
+        ("exercises: slug counts",
+         select(ExerciseSlugCount.slug, ExerciseSlugCount.count)
+         .where(ExerciseSlugCount.user_id == 1)),
+    ]
+
+
+def _compile(statement, dialect):
+    compiled = statement.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    if compiled.positional:
+        return str(compiled), tuple(compiled.params[name] for name in compiled.positiontup)
+    return str(compiled), compiled.params
+
+
+def explain_sqlite(conn, sql, params, table_names):
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params).all()
+    plan = [row[-1] for row in rows]
+    scans = []
+    for step in plan:
+        match = re.match(r"SCAN (\w+)", step)
+        if match and match.group(1) in table_names and "VIRTUAL TABLE" not in step:
+            scans.append(step)
+    return plan, scans
+
+
+def explain_postgres(conn, sql, params, table_names):
+    conn.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {sql}", params)]
+    scans = [step for step in plan if "Seq Scan on" in step]
+    return plan, scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    if not os.getenv("DATABASE_URL"):
+        db_path = Path(tempfile.mkdtemp()) / "query_plans.db"
+        app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path.as_posix()}"
+        os.environ["DATABASE_URL"] = app.config["SQLALCHEMY_DATABASE_URI"]
+    init_db(app)
+
+    failures = 0
+    with app.app_context():
+        db.create_all()
+        run_migrations()
+        ensure_search_index()
+
+        dialect = db.engine.dialect
+        table_names = set(db.metadata.tables)
+        explain = explain_postgres if dialect.name == "postgresql" else explain_sqlite
+
+        for name, statement in hot_queries():
+            sql, params = _compile(statement, dialect)
+            with db.engine.begin() as conn:
+                plan, scans = explain(conn, sql, params, table_names)
+            status = "FAIL" if scans else "ok"
+            failures += bool(scans)
+            print(f"[{status:4}] {name}")
+            if scans or args.verbose:
+                for step in plan:
+                    print(f"         {step}")
+
+    print(f"\n{failures} of {len(hot_queries())} hot queries fall back to a full scan.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
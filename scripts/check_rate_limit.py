@@ -0,0 +1,145 @@
+"""Check the rate-limit backends against the same scenarios.
+
+Runs the memory, SQLite (throwaway file) and Redis backends through:
+
+- a burst: exactly ``limit`` of ``2 * limit`` hits in one window are allowed;
+- the sliding window: half a window later the previous window's weight is
+  half, and two windows later a key starts fresh;
+- concurrency: many threads hitting one key allow exactly ``limit``.
+
+The Redis backend runs against ``FakeRedis``, an in-process stand-in for the
+commands it uses, or against a real server with ``--redis-url``. Exits
+non-zero on any failed check.
+
+Usage: python scripts/check_rate_limit.py [--redis-url URL]
+"""
+import argparse
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from services.rate_limit import MemoryBackend, RedisBackend, SQLiteBackend  # noqa: E402
+
+LIMIT = 10
+PERIOD = 60
+
+
+class FakeRedis:
+    """Thread-safe subset of redis-py: ``incr``/``decr``/``get``/``expire``/``pipeline``."""
+
+    def __init__(self):
+        self._lock = threading.RLock()  # re-entered by pipelines
+        self._data = {}
+        self.expiries = {}
+
+    def incr(self, key):
+        with self._lock:
+            self._data[key] = self._data.get(key, 0) + 1
+            return self._data[key]
+
+    def decr(self, key):
+        with self._lock:
+            self._data[key] = self._data.get(key, 0) - 1
+            return self._data[key]
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+        return None if value is None else str(value).encode()
+
+    def expire(self, key, seconds):
+        with self._lock:
+            self.expiries[key] = seconds
+        return True
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    # redis-py pipelines are transactional (MULTI/EXEC) by default.
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.commands.append((name, args))
+            return self
+        return queue
+
+    def execute(self):
+        with self.client._lock:
+            return [getattr(self.client, name)(*args) for name, args in self.commands]
+
+
+def check(name, condition, detail=""):
+    print(f"[{'ok' if condition else 'FAIL':4}] {name}{': ' + detail if detail else ''}")
+    return 0 if condition else 1
+
+
+def run_scenarios(label, make_backend):
+    failures = 0
+    start = 1_000_000 * PERIOD  # aligned to a window boundary
+
+    backend = make_backend()
+    allowed = sum(backend.hit("burst", LIMIT, PERIOD, start + i * 0.01) for i in range(2 * LIMIT))
+    failures += check(f"{label}: burst", allowed == LIMIT, f"{allowed} of {2 * LIMIT} allowed")
+
+    # Previous window full, half-way through the next: weight 0.5 leaves LIMIT/2.
+    allowed = sum(backend.hit("burst", LIMIT, PERIOD, start + 1.5 * PERIOD) for _ in range(LIMIT))
+    failures += check(f"{label}: sliding window", allowed == LIMIT // 2, f"{allowed} allowed")
+
+    allowed = sum(backend.hit("burst", LIMIT, PERIOD, start + 3 * PERIOD) for _ in range(LIMIT))
+    failures += check(f"{label}: idle reset", allowed == LIMIT, f"{allowed} allowed")
+
+    backend = make_backend()
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(
+            lambda i: backend.hit("shared", LIMIT, PERIOD, start + 0.5), range(200)
+        ))
+    failures += check(f"{label}: concurrent", sum(results) == LIMIT, f"{sum(results)} of 200 allowed")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--redis-url", help="run the Redis checks against this server instead")
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp())
+    counter = iter(range(1_000_000))
+
+    def sqlite_backend():
+        return SQLiteBackend(str(tmp / f"rate_limits_{next(counter)}.db"))
+
+    if args.redis_url:
+        import redis
+
+        client = redis.Redis.from_url(args.redis_url)
+
+        def redis_backend():
+            return RedisBackend(client, prefix=f"rl-check-{next(counter)}")
+    else:
+        def redis_backend():
+            return RedisBackend(FakeRedis())
+
+    failures = 0
+    failures += run_scenarios("memory", MemoryBackend)
+    failures += run_scenarios("sqlite", sqlite_backend)
+    failures += run_scenarios("redis", redis_backend)
+
+    fake = FakeRedis()
+    RedisBackend(fake).hit("ttl", LIMIT, PERIOD, 0)
+    failures += check("redis: keys expire", set(fake.expiries.values()) == {2 * PERIOD})
+
+    print(f"\n{failures} failed checks")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Check that chat history context stays within its token budget.
+
+Builds random sessions (short turns, long pastes, one oversized message,
+backlogs longer than ``MAX_UNSUMMARIZED_MESSAGES``) in a throwaway SQLite
+database and calls ``build_history_context`` after every message, with both
+token counters: tiktoken and the ~4 chars/token estimate used when tiktoken
+or its encoding file is unavailable. Exits non-zero if any context exceeds
+the budget or the summary exceeds ``CHAT_SUMMARY_TOKEN_BUDGET``.
+
+Usage: python scripts/check_token_budget.py [--sessions N] [--budget TOKENS]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from flask import Flask  # noqa: E402
+
+import services.chat_context as chat_context  # noqa: E402
+from db import db, init_db  # noqa: E402
+from models import ChatMessage, ChatSession, ChatSessionSummary, User  # noqa: E402
+
+WORDS = (
+    "I feel anxious about work and my sleep has been poor lately. "
+    "We talked about breathing, journaling and noticing thoughts. "
+    "Sometimes it helps; sometimes the worry comes back at night!"
+).split()
+
+
+def random_message(rng):
+    size = rng.choice([5, 20, 60, 300]) if rng.random() > 0.02 else 4000
+    return " ".join(rng.choice(WORDS) for _ in range(size))
+
+
+def run(tokenizer, sessions, messages, budget, seed):
+    chat_context.CHAT_TOKENIZER = tokenizer
+    chat_context._get_encoding.cache_clear()
+    chat_context.count_tokens.cache_clear()
+    if tokenizer == "tiktoken" and chat_context._get_encoding() is None:
+        print("tiktoken: encoding unavailable, skipped")
+        return 0
+
+    rng = random.Random(seed)
+    user = User(firebase_uid=f"budget-{tokenizer}", email=f"{tokenizer}@example.com")
+    db.session.add(user)
+    db.session.commit()
+    failures, worst = 0, 0
+    for _ in range(sessions):
+        chat_session = ChatSession(user_id=user.id)
+        db.session.add(chat_session)
+        db.session.commit()
+        count = rng.choice([3, messages, 2 * chat_context.MAX_UNSUMMARIZED_MESSAGES + 7])
+        # Write a backlog first sometimes, as for sessions older than the summary.
+        backlog = count // 2 if rng.random() < 0.5 else 0
+        for index in range(count):
+            db.session.add(ChatMessage(
+                chat_session_id=chat_session.id,
+                role="user" if index % 2 == 0 else "assistant",
+                content=random_message(rng),
+            ))
+            if index < backlog:
+                continue
+            db.session.flush()
+            context = chat_context.build_history_context(chat_session.id, token_budget=budget)
+            db.session.commit()
+            used = chat_context.count_tokens(context)
+            worst = max(worst, used)
+            summary = ChatSessionSummary.query.filter_by(chat_session_id=chat_session.id).first()
+            over_summary = summary and summary.summary_tokens > chat_context.SUMMARY_TOKEN_BUDGET
+            if used > budget or over_summary:
+                failures += 1
+                print(f"FAIL {tokenizer}: session {chat_session.id} used {used} of {budget}")
+    print(f"{tokenizer}: worst context {worst} of {budget} tokens, {failures} over budget")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--messages", type=int, default=40)
+    parser.add_argument("--budget", type=int, default=chat_context.CONTEXT_TOKEN_BUDGET)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    db_path = Path(tempfile.mkdtemp()) / "token_budget.db"
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path.as_posix()}"
+    # init_db prefers DATABASE_URL; never write test sessions to a real database.
+    os.environ["DATABASE_URL"] = app.config["SQLALCHEMY_DATABASE_URI"]
+    init_db(app)
+    with app.app_context():
+        db.create_all()
+        failures = sum(
+            run(tokenizer, args.sessions, args.messages, args.budget, args.seed)
+            for tokenizer in ("tiktoken", "estimate")
+        )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
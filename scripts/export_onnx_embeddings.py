@@ -0,0 +1,79 @@
+"""Export all-MiniLM-L6-v2 to ONNX, plus an int8-quantized copy.
+
+Needs torch and transformers at export time only; serving with
+``EMBEDDING_BACKEND=onnx`` needs just onnxruntime and tokenizers. Writes
+``model.onnx``, ``model_int8.onnx`` (dynamic int8 weights) and
+``tokenizer.json`` to ``--out`` (default ``EMBEDDING_ONNX_PATH``).
+
+Usage: python scripts/export_onnx_embeddings.py [--out DIR] [--no-quantize]
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.onnx_embeddings import EMBEDDING_ONNX_PATH  # noqa: E402
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+OPSET = 14
+
+
+def export(out_dir):
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    model = AutoModel.from_pretrained(MODEL_NAME).eval()
+    tokenizer.backend_tokenizer.save(str(out_dir / "tokenizer.json"))
+
+    sample = tokenizer(["an example sentence"], return_tensors="pt")
+    inputs = (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"])
+    dynamic = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            inputs,
+            str(out_dir / "model.onnx"),
+            input_names=["input_ids", "attention_mask", "token_type_ids"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": dynamic,
+                "attention_mask": dynamic,
+                "token_type_ids": dynamic,
+                "last_hidden_state": dynamic,
+            },
+            opset_version=OPSET,
+            do_constant_folding=True,
+        )
+
+
+def quantize(out_dir):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(
+        str(out_dir / "model.onnx"),
+        str(out_dir / "model_int8.onnx"),
+        weight_type=QuantType.QInt8,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--out", default=EMBEDDING_ONNX_PATH)
+    parser.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args()
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    export(out_dir)
+    if not args.no_quantize:
+        quantize(out_dir)
+    for name in sorted(os.listdir(out_dir)):
+        print(f"{out_dir / name}: {os.path.getsize(out_dir / name) / 1e6:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
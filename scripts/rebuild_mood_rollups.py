@@ -0,0 +1,43 @@
+"""Rebuild per-user mood rollups from existing mood entries.
+
+Usage: python scripts/rebuild_mood_rollups.py [--user-id ID]
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+os.environ.setdefault("APP_WARMUP", "false")  # no LLM warm-up for a DB script
+
+from app import app, init_database  # noqa: E402
+from db import db  # noqa: E402
+from models import MoodEntry  # noqa: E402
+from services.mood_rollup import rebuild_rollup  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", type=int, help="rebuild one user only")
+    args = parser.parse_args()
+
+    init_database()
+    with app.app_context():
+        if args.user_id is not None:
+            user_ids = [args.user_id]
+        else:
+            user_ids = [
+                row[0]
+                for row in db.session.query(MoodEntry.user_id)
+                .filter(MoodEntry.user_id.isnot(None))
+                .distinct()
+            ]
+        for user_id in user_ids:
+            rebuild_rollup(user_id)
+            db.session.commit()
+    print(f"Rebuilt mood rollups for {len(user_ids)} user(s).")
+
+
+if __name__ == "__main__":
+    main()
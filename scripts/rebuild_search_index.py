@@ -0,0 +1,22 @@
+"""Rebuild the chat full-text search index from existing messages."""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+os.environ.setdefault("APP_WARMUP", "false")  # no LLM warm-up for a DB script
+
+from app import app, init_database  # noqa: E402
+from services.chat_search import rebuild_search_index  # noqa: E402
+
+
+def main():
+    init_database()
+    with app.app_context():
+        backend = rebuild_search_index()
+    print(f"Search index rebuilt ({backend}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,9 @@
 import os
 from pathlib import Path
 
-from app import app
-from db import db
+os.environ.setdefault("APP_WARMUP", "false")  # don't touch the DB before the backup
+
+from app import init_database
 
 
 def main():
@@ -15,8 +16,7 @@ def main():
         db_path.replace(backup_path)
         print(f"Backed up existing DB to {backup_path}")
 
-    with app.app_context():
-        db.create_all()
+    init_database()
 
     print("Database initialized.")
 
@@ -1,19 +1,30 @@
 """Firebase authentication helpers and decorators."""
+import hashlib
 import json
 import os
+import time
 from functools import wraps
 
 import firebase_admin
 from firebase_admin import auth as firebase_auth
 from firebase_admin import credentials
 from flask import g, jsonify, request
+from sqlalchemy import event, inspect
 
 from db import db
 from models import User
+from utils.cache import LRUCache
 
 
 FIREBASE_ENV_KEY = "FIREBASE_ADMIN_JSON"
 AUTH_BYPASS_ENV_KEY = "AUTH_BYPASS"
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "4096"))
+
+# sha256(token) -> decoded claims, kept until the token's ``exp``.
+_verified_tokens = LRUCache(maxsize=AUTH_TOKEN_CACHE_SIZE, name="auth_verified_tokens")
+# firebase uid -> (user id, email, display name) as last stored in the DB.
+_known_users = LRUCache(maxsize=AUTH_USER_CACHE_SIZE, name="auth_known_users")
 
 
 def _auth_bypass_enabled():
@@ -39,6 +50,71 @@ def _verify_id_token(token):
     return firebase_auth.verify_id_token(token)
 
 
+def _verify_id_token_cached(token):
+    """Verify ``token``, reusing earlier verifications until the token expires."""
+    cache_key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    decoded = _verified_tokens.get(cache_key)
+    if decoded is not None:
+        return decoded
+    decoded = _verify_id_token(token)
+    ttl = decoded.get("exp", 0) - time.time()
+    if ttl > 0:
+        _verified_tokens.set(cache_key, decoded, ttl=ttl)
+    return decoded
+
+
+def clear_auth_caches():
+    _verified_tokens.clear()
+    _known_users.clear()
+
+
+def _remember_user(user):
+    _known_users.set(user.firebase_uid, (user.id, user.email, user.display_name))
+
+
+@event.listens_for(User, "after_update")
+def _forget_changed_user(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.email.history.has_changes() or state.attrs.display_name.history.has_changes():
+        _known_users.delete(target.firebase_uid)
+
+
+def _lookup_user(firebase_uid, email, name):
+    """Return the User for ``firebase_uid``, writing only when claims changed."""
+    known = _known_users.get(firebase_uid)
+    if known:
+        user_id, known_email, known_name = known
+        if (not email or email == known_email) and (not name or name == known_name):
+            user = db.session.get(User, user_id)
+            if user and user.firebase_uid == firebase_uid:
+                return user
+        _known_users.delete(firebase_uid)
+
+    user = User.query.filter_by(firebase_uid=firebase_uid).first()
+    if user:
+        changed = False
+        if email and user.email != email:
+            user.email = email
+            changed = True
+        if name and user.display_name != name:
+            user.display_name = name
+            changed = True
+        if changed:
+            db.session.commit()
+        _remember_user(user)
+        return user
+
+    user = User(
+        firebase_uid=firebase_uid,
+        email=email,
+        display_name=name,
+    )
+    db.session.add(user)
+    db.session.commit()
+    _remember_user(user)
+    return user
+
+
 def get_current_user():
     if _auth_bypass_enabled():
         user = User.query.filter_by(firebase_uid="dev-user").first()
@@ -60,7 +136,7 @@ def get_current_user():
     if not token:
         return None
     try:
-        decoded = _verify_id_token(token)
+        decoded = _verify_id_token_cached(token)
     except Exception:
         return None
 
@@ -71,23 +147,7 @@ def get_current_user():
     if not firebase_uid:
         return None
 
-    user = User.query.filter_by(firebase_uid=firebase_uid).first()
-    if user:
-        if email and user.email != email:
-            user.email = email
-        if name and user.display_name != name:
-            user.display_name = name
-        db.session.commit()
-        return user
-
-    user = User(
-        firebase_uid=firebase_uid,
-        email=email,
-        display_name=name,
-    )
-    db.session.add(user)
-    db.session.commit()
-    return user
+    return _lookup_user(firebase_uid, email, name)
 
 
 def require_auth(func):
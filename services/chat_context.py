@@ -0,0 +1,205 @@
+"""Token-budgeted conversation context for LLM prompts.
+
+Recent turns are kept verbatim while they fit the budget. Older turns are
+folded, one line each, into a per-session rolling summary
+(``ChatSessionSummary``). Each turn then reads the summary row and only the
+messages newer than it.
+
+The summary is extractive, not written by a model: each folded message
+contributes its first sentence, token-capped, and the oldest lines are
+dropped once the summary exceeds ``CHAT_SUMMARY_TOKEN_BUDGET``. That keeps a
+turn to one LLM call, at the cost of losing detail beyond first sentences.
+
+Tokens are counted with tiktoken's ``o200k_base``. tiktoken fetches that
+encoding file on first use and caches it (set ``TIKTOKEN_CACHE_DIR`` to a
+directory filled at build time for offline hosts). If it cannot be loaded,
+or ``CHAT_TOKENIZER=estimate``, counts fall back to ~4 characters per token.
+"""
+import logging
+import os
+import re
+from functools import lru_cache
+
+from models import ChatMessage, ChatSessionSummary
+from utils.sql import insert_ignore
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "1500"))
+SUMMARY_TOKEN_BUDGET = int(os.getenv("CHAT_SUMMARY_TOKEN_BUDGET", "400"))
+SUMMARY_LINE_TOKENS = int(os.getenv("CHAT_SUMMARY_LINE_TOKENS", "40"))
+CHAT_TOKENIZER = os.getenv("CHAT_TOKENIZER", "tiktoken").lower()
+MAX_UNSUMMARIZED_MESSAGES = 60
+FOLD_BATCH_SIZE = 500
+TOKENIZER_ENCODING = "o200k_base"
+SUMMARY_HEADER = "Summary of earlier conversation:"
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Return the tiktoken encoding, or None to use the estimate."""
+    if CHAT_TOKENIZER == "estimate":
+        return None
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(TOKENIZER_ENCODING)
+    except Exception as exc:
+        logger.warning("tiktoken unavailable (%s); estimating 4 chars/token", exc)
+        return None
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text):
+    """Count tokens with tiktoken, falling back to a ~4 chars/token estimate."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+
+def truncate_to_tokens(text, max_tokens):
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _get_encoding()
+    if encoding is None:
+        # Leave room for the ellipsis within the estimate.
+        return text[: max(0, (max_tokens - 1) * 4)].rstrip() + "…"
+    return encoding.decode(encoding.encode(text)[:max(0, max_tokens - 1)]).rstrip() + "…"
+
+
+def _format_message(msg):
+    role = msg.role or "user"
+    return f"{role}: {msg.content}"
+
+
+def _summary_line(msg):
+    """One summary line for ``msg``: its first sentence, token-capped."""
+    content = " ".join((msg.content or "").split())
+    first_sentence = re.split(r"(?<=[.!?])\s", content, maxsplit=1)[0]
+    return f"{msg.role or 'user'}: {truncate_to_tokens(first_sentence, SUMMARY_LINE_TOKENS)}"
+
+
+def _fold_into_summary(summary_row, messages):
+    """Append lines for ``messages`` and trim the oldest to the summary budget."""
+    lines = [line for line in (summary_row.summary or "").split("\n") if line]
+    lines.extend(_summary_line(msg) for msg in messages)
+    tokens = sum(count_tokens(line) for line in lines)
+    while lines and tokens > SUMMARY_TOKEN_BUDGET:
+        tokens -= count_tokens(lines.pop(0))
+    # Newlines add tokens too; trim on the joined text's exact count.
+    summary = "\n".join(lines)
+    while lines and count_tokens(summary) > SUMMARY_TOKEN_BUDGET:
+        lines.pop(0)
+        summary = "\n".join(lines)
+    summary_row.summary = summary
+    summary_row.summary_tokens = count_tokens(summary)
+    summary_row.summarized_through_id = messages[-1].id
+
+
+def _get_summary_row(chat_session_id, create=False):
+    """The session's summary row; with ``create``, insert it if missing.
+
+    Concurrent turns may both try to create it, so creation is an insert
+    that ignores conflicts followed by a re-select.
+    """
+    summary_row = ChatSessionSummary.query.filter_by(chat_session_id=chat_session_id).first()
+    if summary_row is None and create:
+        insert_ignore(
+            ChatSessionSummary,
+            ["chat_session_id"],
+            chat_session_id=chat_session_id,
+            summary="",
+            summary_tokens=0,
+            summarized_through_id=0,
+        )
+        summary_row = ChatSessionSummary.query.filter_by(chat_session_id=chat_session_id).first()
+    return summary_row
+
+
+def _fold_backlog(summary_row, chat_session_id, before_id):
+    """Fold every unsummarized message older than ``before_id``, in batches.
+
+    Only needed when more than ``MAX_UNSUMMARIZED_MESSAGES`` are unsummarized
+    (sessions older than the summary table, or very chatty ones).
+    """
+    while True:
+        batch = (
+            ChatMessage.query.filter(
+                ChatMessage.chat_session_id == chat_session_id,
+                ChatMessage.id > (summary_row.summarized_through_id or 0),
+                ChatMessage.id < before_id,
+            )
+            .order_by(ChatMessage.id.asc())
+            .limit(FOLD_BATCH_SIZE)
+            .all()
+        )
+        if not batch:
+            return
+        _fold_into_summary(summary_row, batch)
+
+
+def _take_verbatim(newest_first, remaining):
+    """Newest-first texts that fit ``remaining`` tokens, and how many fit.
+
+    The newest message is truncated if it alone is over budget.
+    """
+    texts = []
+    for msg in newest_first:
+        text = _format_message(msg)
+        cost = count_tokens(text) + 1  # joining newline
+        if cost > remaining:
+            if texts:
+                break
+            text = truncate_to_tokens(text, max(remaining - 1, 1))
+            cost = remaining
+        texts.append(text)
+        remaining -= cost
+    return texts
+
+
+def _summary_cost(tokens):
+    return count_tokens(SUMMARY_HEADER) + 1 + tokens + 1 if tokens else 0
+
+
+def build_history_context(chat_session_id, token_budget=CONTEXT_TOKEN_BUDGET):
+    """Return the conversation history text for a prompt, within ``token_budget``.
+
+    Newest messages are kept verbatim, the newest one truncated if it alone
+    is over budget; all older unsummarized messages are folded into the
+    session summary, which is saved with the turn. When anything is folded
+    the summary may grow to ``SUMMARY_TOKEN_BUDGET``, so that much is
+    reserved before choosing the verbatim messages.
+    """
+    summary_row = _get_summary_row(chat_session_id)
+    summarized_through_id = summary_row.summarized_through_id if summary_row else 0
+
+    newest_first = (
+        ChatMessage.query.filter(
+            ChatMessage.chat_session_id == chat_session_id,
+            ChatMessage.id > summarized_through_id,
+        )
+        .order_by(ChatMessage.id.desc())
+        .limit(MAX_UNSUMMARIZED_MESSAGES)
+        .all()
+    )
+    if len(newest_first) == MAX_UNSUMMARIZED_MESSAGES:
+        summary_row = summary_row or _get_summary_row(chat_session_id, create=True)
+        _fold_backlog(summary_row, chat_session_id, newest_first[-1].id)
+
+    summary_tokens = summary_row.summary_tokens if summary_row else 0
+    verbatim = _take_verbatim(newest_first, token_budget - _summary_cost(summary_tokens))
+    if len(verbatim) < len(newest_first):
+        verbatim = _take_verbatim(
+            newest_first, token_budget - _summary_cost(SUMMARY_TOKEN_BUDGET)
+        )
+        summary_row = summary_row or _get_summary_row(chat_session_id, create=True)
+        _fold_into_summary(summary_row, list(reversed(newest_first[len(verbatim):])))
+
+    sections = []
+    if summary_row and summary_row.summary:
+        sections.append(f"{SUMMARY_HEADER}\n{summary_row.summary}")
+    sections.append("\n".join(reversed(verbatim)))
+    return "\n".join(sections)
@@ -0,0 +1,287 @@
+"""Full-text search over chat history.
+
+The index is picked per database backend:
+
+* SQLite: an FTS5 external-content table over ``chat_messages``, kept in sync
+  by triggers on insert/update/delete. Every row also indexes an owner token
+  (``u<user_id>``), so per-user queries intersect posting lists instead of
+  filtering after the match.
+* Postgres: a GIN index on ``to_tsvector('simple', content)``, maintained by
+  Postgres itself.
+* Anything else (or SQLite built without FTS5): a ``LIKE`` scan.
+
+Snippets are HTML-escaped; the only markup in them is the ``<mark>`` around
+matches. The database highlights with private-use sentinel characters, which
+are swapped for tags after escaping, so message content never becomes markup.
+"""
+import html
+import re
+
+from sqlalchemy import text
+
+from db import db
+
+FTS_TABLE = "chat_messages_fts"
+FTS_SOURCE_VIEW = "chat_messages_fts_source"
+PG_INDEX = "ix_chat_messages_content_fts"
+SNIPPET_TOKENS = 12
+SNIPPET_CHARS = 160
+_MARK_START, _MARK_END = "\ue000", "\ue001"
+
+_OWNER_EXPR = "'u' || COALESCE(user_id, 0)"
+
+_SQLITE_SCHEMA = [
+    f"""
+    CREATE VIEW IF NOT EXISTS {FTS_SOURCE_VIEW} AS
+    SELECT m.id AS id, m.content AS content, 'u' || COALESCE(s.user_id, 0) AS owner
+    FROM chat_messages m LEFT JOIN chat_sessions s ON s.id = m.chat_session_id
+    """,
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        content, owner,
+        content='{FTS_SOURCE_VIEW}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON chat_messages BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, content, owner) VALUES (
+            new.id, new.content,
+            (SELECT {_OWNER_EXPR} FROM chat_sessions WHERE id = new.chat_session_id));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON chat_messages BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content, owner) VALUES (
+            'delete', old.id, old.content,
+            (SELECT {_OWNER_EXPR} FROM chat_sessions WHERE id = old.chat_session_id));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF content ON chat_messages BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content, owner) VALUES (
+            'delete', old.id, old.content,
+            (SELECT {_OWNER_EXPR} FROM chat_sessions WHERE id = old.chat_session_id));
+        INSERT INTO {FTS_TABLE}(rowid, content, owner) VALUES (
+            new.id, new.content,
+            (SELECT {_OWNER_EXPR} FROM chat_sessions WHERE id = new.chat_session_id));
+    END
+    """,
+    # Anonymous sessions get a user_id when attached; re-key their messages.
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_owner AFTER UPDATE OF user_id ON chat_sessions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content, owner)
+            SELECT 'delete', id, content, 'u' || COALESCE(old.user_id, 0)
+            FROM chat_messages WHERE chat_session_id = old.id;
+        INSERT INTO {FTS_TABLE}(rowid, content, owner)
+            SELECT id, content, 'u' || COALESCE(new.user_id, 0)
+            FROM chat_messages WHERE chat_session_id = new.id;
+    END
+    """,
+]
+
+_SQLITE_TEARDOWN = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_owner",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+    f"DROP VIEW IF EXISTS {FTS_SOURCE_VIEW}",
+]
+
+_backend = None
+
+
+def search_backend():
+    """Return 'sqlite_fts5', 'postgres' or 'like' for the bound engine."""
+    global _backend
+    if _backend is None:
+        dialect = db.engine.dialect.name
+        if dialect == "postgresql":
+            _backend = "postgres"
+        elif dialect == "sqlite" and _sqlite_has_fts5():
+            _backend = "sqlite_fts5"
+        else:
+            _backend = "like"
+    return _backend
+
+
+def _sqlite_has_fts5():
+    try:
+        with db.engine.connect() as conn:
+            conn.execute(text("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)"))
+            conn.execute(text("DROP TABLE IF EXISTS temp.fts5_probe"))
+        return True
+    except Exception:
+        return False
+
+
+def ensure_search_index():
+    """Create the search index if missing (idempotent; call after create_all)."""
+    backend = search_backend()
+    if backend == "sqlite_fts5":
+        with db.engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": FTS_TABLE}
+            ).first()
+            for statement in _SQLITE_SCHEMA:
+                conn.execute(text(statement))
+            if not exists:
+                conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    elif backend == "postgres":
+        with db.engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON chat_messages "
+                "USING GIN (to_tsvector('simple', content))"
+            ))
+    return backend
+
+
+def rebuild_search_index():
+    """Drop and rebuild the index from ``chat_messages``."""
+    backend = search_backend()
+    if backend == "sqlite_fts5":
+        with db.engine.begin() as conn:
+            for statement in _SQLITE_TEARDOWN:
+                conn.execute(text(statement))
+        ensure_search_index()
+    elif backend == "postgres":
+        ensure_search_index()
+        with db.engine.begin() as conn:
+            conn.execute(text(f"REINDEX INDEX {PG_INDEX}"))
+    return backend
+
+
+def _terms(query):
+    return re.findall(r"\w+", query.lower())
+
+
+def _fts5_match(user_id, terms):
+    phrases = " AND ".join(f'content : "{term}"*' for term in terms)
+    return f"owner : u{user_id} AND {phrases}"
+
+
+def like_pattern(query):
+    """``%query%`` with LIKE wildcards escaped (use with ``ESCAPE '\\'``)."""
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_messages(user_id, query, limit=20, offset=0):
+    """Return ranked message hits for ``user_id`` with snippets."""
+    terms = _terms(query)
+    if not terms:
+        return []
+    backend = search_backend()
+    params = {"user_id": user_id, "limit": limit, "offset": offset}
+
+    if backend == "sqlite_fts5":
+        params.update(match=_fts5_match(user_id, terms), mark_start=_MARK_START, mark_end=_MARK_END)
+        sql = f"""
+            SELECT m.id, m.chat_session_id, s.title, m.role, m.created_at,
+                   snippet({FTS_TABLE}, 0, :mark_start, :mark_end, '…', {SNIPPET_TOKENS}) AS snippet,
+                   bm25({FTS_TABLE}) AS rank
+            FROM {FTS_TABLE}
+            JOIN chat_messages m ON m.id = {FTS_TABLE}.rowid
+            JOIN chat_sessions s ON s.id = m.chat_session_id
+            WHERE {FTS_TABLE} MATCH :match AND s.user_id = :user_id
+            ORDER BY rank, m.id DESC
+            LIMIT :limit OFFSET :offset
+        """
+    elif backend == "postgres":
+        params["tsquery"] = " & ".join(f"{term}:*" for term in terms)
+        params["headline_options"] = (
+            f"StartSel={_MARK_START}, StopSel={_MARK_END}, MaxWords={SNIPPET_TOKENS}, MinWords=3"
+        )
+        sql = f"""
+            SELECT m.id, m.chat_session_id, s.title, m.role, m.created_at,
+                   ts_headline('simple', m.content, q, :headline_options) AS snippet,
+                   -ts_rank(to_tsvector('simple', m.content), q) AS rank
+            FROM chat_messages m
+            JOIN chat_sessions s ON s.id = m.chat_session_id,
+                 to_tsquery('simple', :tsquery) AS q
+            WHERE s.user_id = :user_id AND to_tsvector('simple', m.content) @@ q
+            ORDER BY rank, m.id DESC
+            LIMIT :limit OFFSET :offset
+        """
+    else:
+        params["pattern"] = like_pattern(query)
+        sql = f"""
+            SELECT m.id, m.chat_session_id, s.title, m.role, m.created_at,
+                   substr(m.content, 1, {SNIPPET_CHARS}) AS snippet, 0 AS rank
+            FROM chat_messages m
+            JOIN chat_sessions s ON s.id = m.chat_session_id
+            WHERE s.user_id = :user_id AND m.content LIKE :pattern ESCAPE '\\'
+            ORDER BY m.id DESC
+            LIMIT :limit OFFSET :offset
+        """
+
+    rows = db.session.execute(text(sql), params).all()
+    literal = None if backend in ("sqlite_fts5", "postgres") else query
+    return [
+        {
+            "message_id": row[0],
+            "chat_session_id": row[1],
+            "session_title": row[2],
+            "role": row[3],
+            "created_at": _iso(row[4]),
+            "snippet": _render_snippet(row[5], literal),
+            "rank": row[6],
+        }
+        for row in rows
+    ]
+
+
+def _render_snippet(snippet, literal=None):
+    """Escape ``snippet`` and turn highlight sentinels into ``<mark>`` tags.
+
+    The LIKE fallback has no highlighter; pass its ``literal`` query to mark
+    case-insensitive occurrences instead.
+    """
+    if not snippet:
+        return ""
+    if literal:
+        snippet = re.sub(
+            re.escape(literal), lambda m: f"{_MARK_START}{m.group(0)}{_MARK_END}",
+            snippet, flags=re.IGNORECASE,
+        )
+    escaped = html.escape(snippet)
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def _iso(value):
+    # Raw SQLite rows return DATETIME columns as "YYYY-MM-DD HH:MM:SS.ffffff".
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value.replace(" ", "T", 1) if value else None
+
+
+def matching_session_ids(user_id, query):
+    """Return ids of the user's sessions with at least one matching message."""
+    terms = _terms(query)
+    if not terms:
+        return []
+    backend = search_backend()
+    if backend == "sqlite_fts5":
+        sql = f"""
+            SELECT DISTINCT m.chat_session_id
+            FROM {FTS_TABLE} JOIN chat_messages m ON m.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH :match
+        """
+        params = {"match": _fts5_match(user_id, terms)}
+    elif backend == "postgres":
+        sql = """
+            SELECT DISTINCT m.chat_session_id
+            FROM chat_messages m JOIN chat_sessions s ON s.id = m.chat_session_id
+            WHERE s.user_id = :user_id
+              AND to_tsvector('simple', m.content) @@ to_tsquery('simple', :tsquery)
+        """
+        params = {"user_id": user_id, "tsquery": " & ".join(f"{term}:*" for term in terms)}
+    else:
+        sql = """
+            SELECT DISTINCT m.chat_session_id
+            FROM chat_messages m JOIN chat_sessions s ON s.id = m.chat_session_id
+            WHERE s.user_id = :user_id AND m.content LIKE :pattern ESCAPE '\\'
+        """
+        params = {"user_id": user_id, "pattern": like_pattern(query)}
+    return [row[0] for row in db.session.execute(text(sql), params)]
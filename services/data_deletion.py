@@ -0,0 +1,236 @@
+"""Resumable, set-based deletion of all data owned by a user or session.
+
+``start_deletion`` records a ``DataDeletionJob`` row and runs it on the
+shared job runner. The job walks ``DELETION_STEPS`` in order; each step
+deletes ``id IN (SELECT id ... LIMIT n)`` batches and commits the batch
+together with the job's progress, so locks are held for one batch at a time
+and an interrupted job resumes at ``current_step`` with exact counts.
+
+A ``running`` job whose row has not been touched for
+``DELETION_STALE_SECONDS`` is treated as orphaned (its worker died) and is
+picked up again at startup, on the next DELETE, or when it is polled.
+"""
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, delete, or_, select, update
+
+from db import db
+from models import (
+    ChatMessage,
+    ChatProfile,
+    ChatSession,
+    ChatSessionSummary,
+    ContactMessage,
+    DataDeletionJob,
+    ExerciseCompletion,
+    ExerciseDailyCount,
+    ExerciseProgress,
+    ExerciseSlugCount,
+    JournalEntry,
+    MoodEntry,
+    MoodEntryTag,
+    MoodRollup,
+    MoodRollupBucket,
+    TherapyPlan,
+    TherapyProfile,
+)
+from services.jobs import job_runner
+from services.profile_context import invalidate_profile_prefix
+
+logger = logging.getLogger(__name__)
+
+DELETION_BATCH_SIZE = int(os.getenv("DELETION_BATCH_SIZE", "1000"))
+DELETION_STALE_SECONDS = int(os.getenv("DELETION_STALE_SECONDS", "120"))
+
+UNFINISHED = ("queued", "running", "failed")
+
+
+def _owned_by(model, user_id, session_id):
+    if user_id is not None:
+        return model.user_id == user_id
+    return model.session_id == session_id
+
+
+def _owned_chat_sessions(user_id, session_id):
+    return select(ChatSession.id).where(_owned_by(ChatSession, user_id, session_id))
+
+
+# (step name, model, owner filter). Children come before their parents.
+# A filter returning None means the step does not apply to this owner.
+DELETION_STEPS = [
+    ("chat_messages", ChatMessage,
+     lambda uid, sid: ChatMessage.chat_session_id.in_(_owned_chat_sessions(uid, sid))),
+    ("chat_session_summaries", ChatSessionSummary,
+     lambda uid, sid: ChatSessionSummary.chat_session_id.in_(_owned_chat_sessions(uid, sid))),
+    ("chat_sessions", ChatSession, lambda uid, sid: _owned_by(ChatSession, uid, sid)),
+    ("mood_entry_tags", MoodEntryTag,
+     lambda uid, sid: MoodEntryTag.mood_entry_id.in_(
+         select(MoodEntry.id).where(_owned_by(MoodEntry, uid, sid))
+     )),
+    ("mood_entries", MoodEntry, lambda uid, sid: _owned_by(MoodEntry, uid, sid)),
+    ("contact_messages", ContactMessage, lambda uid, sid: _owned_by(ContactMessage, uid, sid)),
+    ("therapy_profile", TherapyProfile, lambda uid, sid: _owned_by(TherapyProfile, uid, sid)),
+    ("therapy_plans", TherapyPlan, lambda uid, sid: _owned_by(TherapyPlan, uid, sid)),
+    ("exercise_completions", ExerciseCompletion,
+     lambda uid, sid: _owned_by(ExerciseCompletion, uid, sid)),
+    # The rest only exists for signed-in users.
+    ("journal_entries", JournalEntry,
+     lambda uid, sid: JournalEntry.user_id == uid if uid is not None else None),
+    ("chat_profile", ChatProfile,
+     lambda uid, sid: ChatProfile.user_id == uid if uid is not None else None),
+    ("mood_rollups", MoodRollup,
+     lambda uid, sid: MoodRollup.user_id == uid if uid is not None else None),
+    ("mood_rollup_buckets", MoodRollupBucket,
+     lambda uid, sid: MoodRollupBucket.user_id == uid if uid is not None else None),
+    ("exercise_daily_counts", ExerciseDailyCount,
+     lambda uid, sid: ExerciseDailyCount.user_id == uid if uid is not None else None),
+    ("exercise_slug_counts", ExerciseSlugCount,
+     lambda uid, sid: ExerciseSlugCount.user_id == uid if uid is not None else None),
+    ("exercise_progress", ExerciseProgress,
+     lambda uid, sid: ExerciseProgress.user_id == uid if uid is not None else None),
+]
+
+
+def _delete_batch(model, condition):
+    batch = select(model.id).where(condition).limit(DELETION_BATCH_SIZE)
+    result = db.session.execute(
+        delete(model).where(model.id.in_(batch)),
+        execution_options={"synchronize_session": False},
+    )
+    return result.rowcount
+
+
+def _stale_cutoff():
+    return datetime.utcnow() - timedelta(seconds=DELETION_STALE_SECONDS)
+
+
+def _is_stale(job):
+    return job.status == "running" and job.updated_at and job.updated_at < _stale_cutoff()
+
+
+def _claim(job_id):
+    """Mark the job running unless another worker holds a fresh claim."""
+    result = db.session.execute(
+        update(DataDeletionJob)
+        .where(
+            DataDeletionJob.id == job_id,
+            or_(
+                DataDeletionJob.status.in_(("queued", "failed")),
+                and_(
+                    DataDeletionJob.status == "running",
+                    DataDeletionJob.updated_at < _stale_cutoff(),
+                ),
+            ),
+        )
+        .values(status="running", error=None, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def run_deletion(job_id):
+    """Run (or resume) deletion job ``job_id``; return its final state."""
+    if not _claim(job_id):
+        job = db.session.get(DataDeletionJob, job_id)
+        return job.to_dict() if job else None
+
+    job = db.session.get(DataDeletionJob, job_id)
+    db.session.refresh(job)
+    counts = json.loads(job.counts_json or "{}")
+    names = [name for name, _, _ in DELETION_STEPS]
+    start = names.index(job.current_step) if job.current_step in names else 0
+
+    try:
+        for name, model, owner_filter in DELETION_STEPS[start:]:
+            condition = owner_filter(job.user_id, job.session_id)
+            job.current_step = name
+            db.session.commit()
+            if condition is None:
+                continue
+            while True:
+                deleted = _delete_batch(model, condition)
+                counts[name] = counts.get(name, 0) + deleted
+                job.counts_json = json.dumps(counts)
+                job.updated_at = datetime.utcnow()
+                db.session.commit()
+                if deleted < DELETION_BATCH_SIZE:
+                    break
+        job.status = "succeeded"
+        job.current_step = None
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        logger.exception("Data deletion job %s failed at %s", job_id, job.current_step)
+        job.status = "failed"
+        job.error = str(exc)
+        db.session.commit()
+        raise
+    finally:
+        # Core deletes bypass the ORM events that normally invalidate this.
+        invalidate_profile_prefix(job.user_id)
+    return job.to_dict()
+
+
+def _submit(job):
+    job_runner.submit("data_deletion", run_deletion, job.id, owner_id=job.user_id)
+
+
+def start_deletion(user_id=None, session_id=None):
+    """Start (or rejoin) the owner's deletion job; return the job row.
+
+    Raises ``JobQueueFull`` when no worker slot is free; the row is kept and
+    reused by the next attempt.
+    """
+    job = (
+        DataDeletionJob.query.filter(
+            _owned_by(DataDeletionJob, user_id, session_id),
+            DataDeletionJob.status.in_(UNFINISHED),
+        )
+        .order_by(DataDeletionJob.id.desc())
+        .first()
+    )
+    if job is None:
+        job = DataDeletionJob(user_id=user_id, session_id=session_id, status="queued")
+        db.session.add(job)
+        db.session.commit()
+    elif job.status == "running" and not _is_stale(job):
+        return job
+    _submit(job)
+    return job
+
+
+def get_deletion_job(job_id, user_id=None, session_id=None):
+    """Return the owner's job, resubmitting it if its worker has died."""
+    job = DataDeletionJob.query.filter(
+        DataDeletionJob.id == job_id, _owned_by(DataDeletionJob, user_id, session_id)
+    ).first()
+    if job is not None and _is_stale(job):
+        try:
+            _submit(job)
+        except Exception:
+            logger.warning("Could not resume stale data deletion job %s", job_id)
+    return job
+
+
+def resume_pending_deletions():
+    """Resubmit queued and orphaned jobs (call once at startup)."""
+    jobs = DataDeletionJob.query.filter(
+        or_(
+            DataDeletionJob.status == "queued",
+            and_(
+                DataDeletionJob.status == "running",
+                DataDeletionJob.updated_at < _stale_cutoff(),
+            ),
+        )
+    ).all()
+    for job in jobs:
+        try:
+            _submit(job)
+        except Exception:
+            logger.warning("Could not resume data deletion job %s; will retry later", job.id)
+    return [job.id for job in jobs]
@@ -0,0 +1,180 @@
+"""Streaming user-data export.
+
+Rows are read in ``EXPORT_BATCH_SIZE`` batches (``yield_per``) and written
+out as they arrive, so peak memory does not grow with account size. All of
+an owner's chat messages come from one query ordered by session and merged
+with the (id-ordered) session stream, instead of one query per session.
+
+Two encodings share the same row iterators:
+
+* ``iter_export_json`` - the legacy ``/api/export`` document, streamed.
+* ``iter_export_ndjson`` - one ``{"type": ..., "data": ...}`` record per line.
+"""
+import json
+import os
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from db import db
+from models import (
+    ChatMessage,
+    ChatSession,
+    ContactMessage,
+    ExerciseCompletion,
+    MoodEntry,
+    TherapyPlan,
+    TherapyProfile,
+)
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def _owned_by(model, user_id, session_id):
+    if user_id is not None:
+        return model.user_id == user_id
+    return model.session_id == session_id
+
+
+def _stream(statement):
+    return db.session.execute(
+        statement.execution_options(yield_per=EXPORT_BATCH_SIZE)
+    ).scalars()
+
+
+def _rows(model, user_id, session_id):
+    return _stream(
+        select(model).where(_owned_by(model, user_id, session_id)).order_by(model.id)
+    )
+
+
+def _first(model, user_id, session_id, order_by):
+    return db.session.execute(
+        select(model).where(_owned_by(model, user_id, session_id)).order_by(order_by).limit(1)
+    ).scalar()
+
+
+def _chat_sessions(user_id, session_id):
+    """Yield ``(session_dict, message_dicts)`` with messages lazily streamed."""
+    owned = select(ChatSession.id).where(_owned_by(ChatSession, user_id, session_id))
+    counts = dict(
+        db.session.execute(
+            select(ChatMessage.chat_session_id, func.count(ChatMessage.id))
+            .where(ChatMessage.chat_session_id.in_(owned))
+            .group_by(ChatMessage.chat_session_id)
+        ).all()
+    )
+    messages = iter(
+        _stream(
+            select(ChatMessage)
+            .where(ChatMessage.chat_session_id.in_(owned))
+            .order_by(ChatMessage.chat_session_id, ChatMessage.id)
+        )
+    )
+    pending = next(messages, None)
+
+    def session_messages(chat_session_id):
+        nonlocal pending
+        while pending is not None and pending.chat_session_id == chat_session_id:
+            yield pending.to_dict()
+            pending = next(messages, None)
+
+    for chat_session in _rows(ChatSession, user_id, session_id):
+        # Skip messages of sessions the consumer did not drain.
+        while pending is not None and pending.chat_session_id < chat_session.id:
+            pending = next(messages, None)
+        yield (
+            chat_session.to_dict(message_count=counts.get(chat_session.id, 0)),
+            session_messages(chat_session.id),
+        )
+
+
+def _header(user_id, session_id):
+    return {
+        "exported_at": datetime.utcnow().isoformat(),
+        "user_id": user_id,
+        "session_id": session_id,
+    }
+
+
+def _json_array(items):
+    yield "["
+    for index, item in enumerate(items):
+        yield ", " if index else ""
+        yield json.dumps(item)
+    yield "]"
+
+
+def _chunked(pieces, size=EXPORT_CHUNK_BYTES):
+    """Coalesce small string pieces into chunks of roughly ``size`` bytes."""
+    buffer, buffered = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        buffered += len(piece)
+        if buffered >= size:
+            yield "".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _json_pieces(user_id, session_id):
+    header = json.dumps(_header(user_id, session_id))
+    yield header[:-1]
+
+    yield ', "mood_entries": '
+    yield from _json_array(row.to_dict() for row in _rows(MoodEntry, user_id, session_id))
+
+    yield ', "chat_data": ['
+    for index, (session_data, messages) in enumerate(_chat_sessions(user_id, session_id)):
+        yield ", " if index else ""
+        yield '{"session": ' + json.dumps(session_data) + ', "messages": '
+        yield from _json_array(messages)
+        yield "}"
+    yield "]"
+
+    yield ', "contact_messages": '
+    yield from _json_array(row.to_dict() for row in _rows(ContactMessage, user_id, session_id))
+
+    profile = _first(TherapyProfile, user_id, session_id, TherapyProfile.id)
+    yield ', "therapy_profile": ' + json.dumps(profile.to_dict() if profile else None)
+    plan = _first(TherapyPlan, user_id, session_id, TherapyPlan.created_at.desc())
+    yield ', "latest_plan": ' + json.dumps(plan.to_dict() if plan else None)
+
+    yield ', "exercise_completions": '
+    yield from _json_array(
+        row.to_dict() for row in _rows(ExerciseCompletion, user_id, session_id)
+    )
+    yield "}"
+
+
+def _ndjson_records(user_id, session_id):
+    yield {"type": "export", "data": _header(user_id, session_id)}
+    for row in _rows(MoodEntry, user_id, session_id):
+        yield {"type": "mood_entry", "data": row.to_dict()}
+    for session_data, messages in _chat_sessions(user_id, session_id):
+        yield {"type": "chat_session", "data": session_data}
+        for message in messages:
+            message["chat_session_id"] = session_data["id"]
+            yield {"type": "chat_message", "data": message}
+    for row in _rows(ContactMessage, user_id, session_id):
+        yield {"type": "contact_message", "data": row.to_dict()}
+    profile = _first(TherapyProfile, user_id, session_id, TherapyProfile.id)
+    if profile:
+        yield {"type": "therapy_profile", "data": profile.to_dict()}
+    plan = _first(TherapyPlan, user_id, session_id, TherapyPlan.created_at.desc())
+    if plan:
+        yield {"type": "therapy_plan", "data": plan.to_dict()}
+    for row in _rows(ExerciseCompletion, user_id, session_id):
+        yield {"type": "exercise_completion", "data": row.to_dict()}
+
+
+def iter_export_json(user_id=None, session_id=None):
+    """Yield the legacy export document as text chunks."""
+    return _chunked(_json_pieces(user_id, session_id))
+
+
+def iter_export_ndjson(user_id=None, session_id=None):
+    """Yield the export as newline-delimited JSON records, in text chunks."""
+    return _chunked(json.dumps(record) + "\n" for record in _ndjson_records(user_id, session_id))
@@ -0,0 +1,204 @@
+"""Per-user exercise progress rollups.
+
+``record_completion`` folds each new completion into the user's
+``ExerciseProgress`` row and its ``ExerciseSlugCount`` and
+``ExerciseDailyCount`` rows in the same transaction, so the progress summary
+never scans ``exercise_completions``. Counters are changed with
+``UPDATE ... SET count = count + 1`` and rows are created with
+insert-on-conflict, so concurrent completions neither lose updates nor fail
+on the unique keys.
+
+Missing or dropped rollups are rebuilt on the next completion; until then
+summaries are computed from the raw rows without writing.
+
+A streak counts consecutive days with at least one completion. The current
+streak stays alive through today if the last completion was yesterday.
+"""
+from datetime import date, timedelta
+
+from sqlalchemy import case, delete, func, select, update
+
+from db import db
+from models import ExerciseCompletion, ExerciseDailyCount, ExerciseProgress, ExerciseSlugCount
+from utils.sql import insert_ignore
+
+
+def _longest_and_current(days):
+    """``(longest, current, last_day)`` for ascending distinct ``days``."""
+    longest = run = 0
+    previous = None
+    for day in days:
+        run = run + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+    return longest, run, previous
+
+
+def _compute_progress(user_id):
+    """``(values, slug_counts, day_counts)`` from the raw rows, unsaved."""
+    total, last_completed_at = db.session.execute(
+        select(func.count(ExerciseCompletion.id), func.max(ExerciseCompletion.completed_at))
+        .where(ExerciseCompletion.user_id == user_id)
+    ).one()
+    slug_counts = dict(
+        db.session.execute(
+            select(ExerciseCompletion.exercise_slug, func.count(ExerciseCompletion.id))
+            .where(ExerciseCompletion.user_id == user_id)
+            .group_by(ExerciseCompletion.exercise_slug)
+        ).all()
+    )
+    day_counts = db.session.execute(
+        select(ExerciseCompletion.completion_date, func.count(ExerciseCompletion.id))
+        .where(
+            ExerciseCompletion.user_id == user_id,
+            ExerciseCompletion.completion_date.isnot(None),
+        )
+        .group_by(ExerciseCompletion.completion_date)
+        .order_by(ExerciseCompletion.completion_date)
+    ).all()
+
+    longest, current, last_day = _longest_and_current(day for day, _ in day_counts)
+    values = {
+        "total_completions": total,
+        "current_streak": current,
+        "longest_streak": longest,
+        "streak_last_date": last_day,
+        "last_completed_at": last_completed_at,
+    }
+    return values, slug_counts, dict(day_counts)
+
+
+def _write_counts(user_id, slug_counts, day_counts):
+    db.session.execute(delete(ExerciseSlugCount).where(ExerciseSlugCount.user_id == user_id))
+    db.session.execute(delete(ExerciseDailyCount).where(ExerciseDailyCount.user_id == user_id))
+    db.session.add_all(
+        ExerciseSlugCount(user_id=user_id, slug=slug, count=count) for slug, count in slug_counts.items()
+    )
+    db.session.add_all(
+        ExerciseDailyCount(user_id=user_id, day=day, count=count) for day, count in day_counts.items()
+    )
+
+
+def rebuild_progress(user_id):
+    """Recompute the user's rollup, slug counts and daily buckets (caller commits)."""
+    values, slug_counts, day_counts = _compute_progress(user_id)
+    if not insert_ignore(ExerciseProgress, ["user_id"], user_id=user_id, **values):
+        db.session.execute(
+            update(ExerciseProgress).where(ExerciseProgress.user_id == user_id).values(**values)
+        )
+    _write_counts(user_id, slug_counts, day_counts)
+    return db.session.execute(
+        select(ExerciseProgress)
+        .where(ExerciseProgress.user_id == user_id)
+        .execution_options(populate_existing=True)
+    ).scalar_one()
+
+
+def _increment(model, index_elements, **key):
+    insert_ignore(model, index_elements, count=0, **key)
+    db.session.execute(
+        update(model)
+        .where(*(getattr(model, column) == value for column, value in key.items()))
+        .values(count=model.count + 1)
+    )
+
+
+def record_completion(completion):
+    """Fold a new ``ExerciseCompletion`` into the rollup (call before commit)."""
+    user_id = completion.user_id
+    db.session.flush()
+    if not db.session.execute(
+        select(ExerciseProgress.id).where(ExerciseProgress.user_id == user_id)
+    ).first():
+        values, slug_counts, day_counts = _compute_progress(user_id)
+        if insert_ignore(ExerciseProgress, ["user_id"], user_id=user_id, **values):
+            _write_counts(user_id, slug_counts, day_counts)
+            return
+        # A concurrent completion created the row first; apply ours on top.
+
+    day = completion.completion_date
+    completed_at = completion.completed_at
+    last_day = ExerciseProgress.streak_last_date
+    advances = last_day.is_(None) | (last_day < day)
+    current = case(
+        (last_day == day - timedelta(days=1), ExerciseProgress.current_streak + 1),
+        else_=1,
+    )
+    db.session.execute(
+        update(ExerciseProgress)
+        .where(ExerciseProgress.user_id == user_id)
+        .values(
+            total_completions=ExerciseProgress.total_completions + 1,
+            last_completed_at=case(
+                (
+                    ExerciseProgress.last_completed_at.is_(None)
+                    | (ExerciseProgress.last_completed_at < completed_at),
+                    completed_at,
+                ),
+                else_=ExerciseProgress.last_completed_at,
+            ),
+            current_streak=case((advances, current), else_=ExerciseProgress.current_streak),
+            longest_streak=case(
+                (advances & (current > ExerciseProgress.longest_streak), current),
+                else_=ExerciseProgress.longest_streak,
+            ),
+            streak_last_date=case((advances, day), else_=last_day),
+        )
+    )
+    _increment(ExerciseSlugCount, ["user_id", "slug"], user_id=user_id, slug=completion.exercise_slug)
+    _increment(ExerciseDailyCount, ["user_id", "day"], user_id=user_id, day=day)
+
+
+def drop_progress(user_id):
+    """Forget the user's rollup and counts; rebuilt on next completion (caller commits)."""
+    ExerciseSlugCount.query.filter_by(user_id=user_id).delete()
+    ExerciseDailyCount.query.filter_by(user_id=user_id).delete()
+    ExerciseProgress.query.filter_by(user_id=user_id).delete()
+
+
+def progress_summary(user_id, days=30):
+    """Aggregated progress plus per-day counts for the last ``days`` days; never writes."""
+    today = date.today()
+    first_day = today - timedelta(days=days)
+    progress = ExerciseProgress.query.filter_by(user_id=user_id).first()
+    if progress is None:
+        values, slug_counts, day_counts = _compute_progress(user_id)
+        daily = sorted((day, count) for day, count in day_counts.items() if first_day < day <= today)
+    else:
+        values = {
+            "total_completions": progress.total_completions,
+            "current_streak": progress.current_streak,
+            "longest_streak": progress.longest_streak,
+            "streak_last_date": progress.streak_last_date,
+            "last_completed_at": progress.last_completed_at,
+        }
+        slug_counts = dict(
+            db.session.execute(
+                select(ExerciseSlugCount.slug, ExerciseSlugCount.count)
+                .where(ExerciseSlugCount.user_id == user_id)
+            ).all()
+        )
+        daily = db.session.execute(
+            select(ExerciseDailyCount.day, ExerciseDailyCount.count)
+            .where(
+                ExerciseDailyCount.user_id == user_id,
+                ExerciseDailyCount.day > first_day,
+                ExerciseDailyCount.day <= today,
+            )
+            .order_by(ExerciseDailyCount.day.asc())
+        ).all()
+
+    last_day = values["streak_last_date"]
+    alive = last_day is not None and last_day >= today - timedelta(days=1)
+    last_completed_at = values["last_completed_at"]
+    return {
+        "total_completions": values["total_completions"],
+        "by_slug": [
+            {"slug": slug, "count": count}
+            for slug, count in sorted(slug_counts.items(), key=lambda item: (-item[1], item[0]))
+        ],
+        "current_streak": values["current_streak"] if alive else 0,
+        "longest_streak": values["longest_streak"],
+        "last_completed_at": last_completed_at.isoformat() if last_completed_at else None,
+        "daily": [{"date": day.isoformat(), "count": count} for day, count in daily],
+    }
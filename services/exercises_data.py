@@ -207,9 +207,9 @@ def get_all_exercises():
     ]
 
 
+EXERCISES_BY_SLUG = {exercise['slug']: exercise for exercise in EXERCISES}
+
+
 def get_exercise_by_slug(slug):
     """Return full exercise details by slug."""
-    for exercise in EXERCISES:
-        if exercise['slug'] == slug:
-            return exercise
-    return None
+    return EXERCISES_BY_SLUG.get(slug)
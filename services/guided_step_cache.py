@@ -0,0 +1,142 @@
+"""Shared cache for AI-guided exercise steps.
+
+An AI step depends only on (slug, step_index, language) and the prompt, so
+one LLM answer can serve every user. Lookups go to an in-process LRU with a
+TTL, then to the ``guided_step_responses`` table, which survives restarts
+and is shared by workers. Concurrent misses for the same key in a process
+are coalesced: one request calls the LLM and the others wait for its
+result. Failed generations are not cached.
+
+Bump ``GUIDED_STEP_PROMPT_VERSION`` whenever the prompt changes; older
+rows are then ignored and expire.
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+
+from db import db
+from models import GuidedStepResponse
+from utils.cache import LRUCache, register_stats
+
+GUIDED_STEP_PROMPT_VERSION = 1
+GUIDED_STEP_CACHE_SIZE = int(os.getenv("GUIDED_STEP_CACHE_SIZE", "512"))
+GUIDED_STEP_CACHE_TTL_SECONDS = int(os.getenv("GUIDED_STEP_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Followers give up waiting on the leader's LLM call after this long.
+GUIDED_STEP_WAIT_SECONDS = float(os.getenv("GUIDED_STEP_WAIT_SECONDS", "60"))
+PRUNE_EVERY = 100
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class GuidedStepCache:
+    """Memory, then database, then a single-flight call to ``generate``."""
+
+    def __init__(self, maxsize=GUIDED_STEP_CACHE_SIZE, ttl=GUIDED_STEP_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl, name="guided_steps")
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.db_hits = 0
+        self.generated = 0
+        self.coalesced = 0
+        self._writes = 0
+        register_stats("guided_steps_store", self)
+
+    def get_or_generate(self, slug, step_index, language, generate):
+        """Cached step dict for the key, calling ``generate()`` on a miss.
+
+        ``generate`` returns a step dict, or None when the LLM is
+        unavailable; None is passed through and never cached.
+        """
+        key = (slug, step_index, language, GUIDED_STEP_PROMPT_VERSION)
+        step = self.memory.get(key)
+        if step is not None:
+            return dict(step)
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight.done.wait(GUIDED_STEP_WAIT_SECONDS)
+            return dict(flight.result) if flight.result else None
+
+        try:
+            step, ttl = self._load(key)
+            if step is None:
+                step, ttl = generate(), self.ttl
+                with self._lock:
+                    self.generated += 1
+                if step:
+                    self._store(key, step)
+            if step:
+                self.memory.set(key, step, ttl=ttl)
+            flight.result = step
+            return dict(step) if step else None
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _filter(self, key):
+        slug, step_index, language, version = key
+        return GuidedStepResponse.query.filter_by(
+            slug=slug, step_index=step_index, language=language, prompt_version=version
+        )
+
+    def _load(self, key):
+        """``(step, seconds_left)`` from the database, or ``(None, None)``."""
+        now = datetime.utcnow()
+        row = self._filter(key).filter(GuidedStepResponse.expires_at > now).first()
+        if row is None:
+            return None, None
+        with self._lock:
+            self.db_hits += 1
+        return json.loads(row.response_json), (row.expires_at - now).total_seconds()
+
+    def _store(self, key, step):
+        slug, step_index, language, version = key
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl)
+        row = self._filter(key).first()
+        if row is None:
+            row = GuidedStepResponse(
+                slug=slug, step_index=step_index, language=language, prompt_version=version
+            )
+            db.session.add(row)
+        row.response_json = json.dumps(step)
+        row.created_at = now
+        row.expires_at = expires_at
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % PRUNE_EVERY == 0
+        if prune:
+            GuidedStepResponse.query.filter(GuidedStepResponse.expires_at <= now).delete()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another worker stored the same key first; theirs is as good.
+            db.session.rollback()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "db_hits": self.db_hits,
+                "generated": self.generated,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights),
+            }
+
+
+guided_step_cache = GuidedStepCache()
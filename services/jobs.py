@@ -0,0 +1,229 @@
+"""Bounded background job executor for slow LLM calls.
+
+Request handlers submit work here instead of calling the model inline, so a
+few slow upstream calls cannot tie up every Flask worker. The pool has a fixed
+number of threads and a fixed number of pending slots; once those are used,
+``submit`` raises ``JobQueueFull`` and the route answers 503 with Retry-After.
+
+The pool size and pending limit apply per process: with N worker processes
+up to N * ``JOB_MAX_WORKERS`` LLM calls can run at once. Job state and
+results are stored in the ``background_jobs`` table, so a poll can land on
+any worker.
+"""
+import json
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app, jsonify
+from sqlalchemy import and_, delete, insert, or_, select, update
+
+from db import db
+from models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+JOB_MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", "4"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "32"))
+JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", "600"))
+# Jobs older than the TTL are deleted once every this many submits.
+PRUNE_EVERY = 100
+
+_jobs = BackgroundJob.__table__
+
+
+class JobQueueFull(Exception):
+    """Raised when the executor has no free slot for a new job."""
+
+    def __init__(self, retry_after):
+        super().__init__("Job queue is full")
+        self.retry_after = retry_after
+
+
+class JobRunner:
+    """Thread-pool executor that records job state in the database."""
+
+    def __init__(self, max_workers=JOB_MAX_WORKERS, max_pending=JOB_MAX_PENDING,
+                 result_ttl=JOB_RESULT_TTL_SECONDS):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._created = 0
+        self._avg_duration = 1.0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="job"
+                )
+            return self._executor
+
+    def _write(self, statement):
+        # A separate connection, so job bookkeeping never commits or rolls
+        # back the caller's session.
+        with db.engine.begin() as conn:
+            conn.execute(statement)
+
+    def _new_job(self, kind, owner_id, **values):
+        job_id = uuid.uuid4().hex
+        now = datetime.utcnow()
+        with self._lock:
+            self._created += 1
+            prune = self._created % PRUNE_EVERY == 0
+        if prune:
+            cutoff = now - timedelta(seconds=self.result_ttl)
+            # Unfinished rows past the TTL belonged to a worker that exited.
+            self._write(delete(_jobs).where(or_(
+                _jobs.c.finished_at < cutoff,
+                and_(_jobs.c.finished_at.is_(None), _jobs.c.created_at < cutoff),
+            )))
+        values.setdefault("status", "queued")
+        self._write(insert(_jobs).values(
+            id=job_id, kind=kind, owner_id=owner_id, created_at=now, **values
+        ))
+        return job_id
+
+    def _finish(self, job_id, status, result=None, error=None):
+        self._write(update(_jobs).where(_jobs.c.id == job_id).values(
+            status=status,
+            result_json=json.dumps(result) if result is not None else None,
+            error=error,
+            finished_at=datetime.utcnow(),
+        ))
+
+    def retry_after(self):
+        """Estimate seconds until a slot frees up."""
+        waves = max(1, self._in_flight) / max(1, self.max_workers)
+        return max(1, math.ceil(waves * self._avg_duration))
+
+    def submit(self, kind, func, *args, owner_id=None, **kwargs):
+        """Queue ``func`` to run inside an app context; return the job id.
+
+        ``func`` must return a JSON-serializable result.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise JobQueueFull(self.retry_after())
+
+        app = current_app._get_current_object()
+        try:
+            job_id = self._new_job(kind, owner_id)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_flight += 1
+
+        def run():
+            started = time.perf_counter()
+            with app.app_context():
+                try:
+                    self._write(update(_jobs).where(_jobs.c.id == job_id).values(
+                        status="running", started_at=datetime.utcnow()
+                    ))
+                    result = func(*args, **kwargs)
+                    self._finish(job_id, "succeeded", result=result)
+                except Exception as exc:
+                    logger.exception("Job %s (%s) failed: %s", job_id, kind, exc)
+                    db.session.rollback()
+                    try:
+                        self._finish(job_id, "failed", error=str(exc))
+                    except Exception:
+                        logger.exception("Could not record failure of job %s", job_id)
+                finally:
+                    duration = time.perf_counter() - started
+                    with self._lock:
+                        self._in_flight -= 1
+                        self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+                    self._slots.release()
+
+        try:
+            self._get_executor().submit(run)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+            self._write(delete(_jobs).where(_jobs.c.id == job_id))
+            raise
+        return job_id
+
+    def record_result(self, kind, result, owner_id=None):
+        """Register an already-finished job (no executor slot used)."""
+        now = datetime.utcnow()
+        return self._new_job(
+            kind,
+            owner_id,
+            status="succeeded",
+            result_json=json.dumps(result),
+            started_at=now,
+            finished_at=now,
+        )
+
+    def get(self, job_id, owner_id=None):
+        """The job as a dict, or None if unknown or owned by someone else.
+
+        A job still queued or running after the result TTL belonged to a
+        worker that exited mid-run; it is reported as failed.
+        """
+        with db.engine.connect() as conn:
+            row = conn.execute(select(_jobs).where(_jobs.c.id == job_id)).mappings().first()
+        if not row or row["owner_id"] != owner_id:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job.pop("result_json")) if row["result_json"] else None
+        lost_before = datetime.utcnow() - timedelta(seconds=self.result_ttl)
+        if job["status"] in ("queued", "running") and job["created_at"] < lost_before:
+            job.update(status="failed", error="Job was interrupted")
+        return job
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": self._in_flight,
+                "avg_duration_seconds": round(self._avg_duration, 3),
+            }
+
+
+def job_to_dict(job):
+    def _iso(value):
+        return value.isoformat() if value else None
+
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "result": job["result"],
+        "error": job["error"],
+        "created_at": _iso(job["created_at"]),
+        "started_at": _iso(job["started_at"]),
+        "finished_at": _iso(job["finished_at"]),
+    }
+
+
+def queue_full_response(exc):
+    """Build the 503 response for a full job queue."""
+    response = jsonify({"error": "Server busy. Try again shortly.", "retry_after": exc.retry_after})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(exc.retry_after)
+    return response
+
+
+def mark_deprecated(response, successor):
+    """Flag a blocking endpoint as deprecated in favour of ``successor``."""
+    response.headers["Deprecation"] = "true"
+    response.headers["Link"] = f'<{successor}>; rel="successor-version"'
+    return response
+
+
+job_runner = JobRunner()
@@ -0,0 +1,156 @@
+"""Lazily built LLM and RAG chain with background warm-up.
+
+Importing this module is cheap. langchain, the OpenAI client, the embedding
+model and the vector store are imported and built only when a component
+starts. That happens either through ``warm_up()`` (app.py calls it at boot,
+on daemon threads) or on the first request that needs the component.
+Requests wait up to ``LLM_READY_WAIT_SECONDS`` for a component that is
+still loading, then fall back as if it were unavailable. Each component
+reports its state for ``/api/health``.
+"""
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o")
+LLM_READY_WAIT_SECONDS = float(os.getenv("LLM_READY_WAIT_SECONDS", "10"))
+# A failed component is retried on demand, at most this often.
+COMPONENT_RETRY_SECONDS = float(os.getenv("COMPONENT_RETRY_SECONDS", "30"))
+
+_MISSING = object()
+
+
+class ComponentDisabled(Exception):
+    """Raised by a builder when configuration turns the component off."""
+
+
+class Component:
+    """A value built once on a background thread, with readiness state.
+
+    States: ``pending`` (not started), ``loading``, ``ready``, ``disabled``
+    (configured off) and ``failed`` (retried after ``COMPONENT_RETRY_SECONDS``).
+    """
+
+    def __init__(self, name, build):
+        self.name = name
+        self._build = build
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self.state = "pending"
+        self.value = None
+        self.error = None
+        self.seconds = None
+        self._finished_at = None
+
+    def start(self):
+        with self._lock:
+            retry = (
+                self.state == "failed"
+                and time.monotonic() - self._finished_at >= COMPONENT_RETRY_SECONDS
+            )
+            if self.state != "pending" and not retry:
+                return
+            self.state = "loading"
+            self._done.clear()
+        threading.Thread(target=self._run, name=f"warmup-{self.name}", daemon=True).start()
+
+    def _run(self):
+        started = time.monotonic()
+        value, error = None, None
+        try:
+            value = self._build()
+            state = "ready"
+        except ComponentDisabled as exc:
+            state, error = "disabled", str(exc)
+            logger.info("%s disabled: %s", self.name, exc)
+        except Exception as exc:
+            state, error = "failed", str(exc)
+            logger.exception("%s warm-up failed", self.name)
+        with self._lock:
+            self.value, self.state, self.error = value, state, error
+            self._finished_at = time.monotonic()
+            self.seconds = round(self._finished_at - started, 3)
+        self._done.set()
+
+    def set(self, value):
+        """Install a ready value directly (e.g. a stub in scripts)."""
+        with self._lock:
+            self.value, self.state, self.error = value, "ready", None
+            self._finished_at = time.monotonic()
+        self._done.set()
+
+    def get(self, wait=LLM_READY_WAIT_SECONDS):
+        """The value if ready (waiting up to ``wait`` seconds, None = forever)."""
+        self.start()
+        self._done.wait(wait)
+        return self.value if self.state == "ready" else None
+
+    def status(self):
+        with self._lock:
+            return {"state": self.state, "error": self.error, "seconds": self.seconds}
+
+
+def _build_chat_model():
+    if not os.getenv("OPENAI_API_KEY"):
+        raise ComponentDisabled("OPENAI_API_KEY is not set")
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(model=LLM_MODEL)
+
+
+def _build_rag_chain():
+    if os.environ.get("RAG_ENABLED", "false").lower() not in ("1", "true", "yes"):
+        raise ComponentDisabled("RAG disabled (set RAG_ENABLED=true to enable)")
+    openai_api_key = os.environ.get("OPENAI_API_KEY")
+    pinecone_api_key = os.environ.get("PINECONE_API_KEY")
+    backend = os.environ.get("VECTOR_STORE_BACKEND", "pinecone").lower()
+    if not openai_api_key or not (pinecone_api_key or backend == "local"):
+        raise ComponentDisabled("RAG keys missing")
+
+    from langchain.chains import create_retrieval_chain
+    from langchain.chains.combine_documents import create_stuff_documents_chain
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_openai import ChatOpenAI
+
+    from src.helper import download_hugging_face_embeddings
+    from src.prompt import system_prompt
+    from src.vector_store import load_vector_store
+
+    embeddings = download_hugging_face_embeddings()
+    docsearch = load_vector_store(embeddings, backend)
+    retriever = docsearch.as_retriever(search_type="similarity", search_kwargs={"k": 3})
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", system_prompt),
+        ("human", "{input}"),
+    ])
+    question_answer_chain = create_stuff_documents_chain(ChatOpenAI(model=LLM_MODEL), prompt)
+    chain = create_retrieval_chain(retriever, question_answer_chain)
+    logger.info("RAG chain initialized with %s vector store", backend)
+    return chain
+
+
+class LLMProvider:
+    """Direct chat model (``llm``) and RAG chain (``retriever``)."""
+
+    def __init__(self):
+        self.llm = Component("llm", _build_chat_model)
+        self.retriever = Component("retriever", _build_rag_chain)
+
+    def warm_up(self):
+        self.llm.start()
+        self.retriever.start()
+
+    def chat_model(self, wait=LLM_READY_WAIT_SECONDS):
+        return self.llm.get(wait)
+
+    def rag_chain(self, wait=LLM_READY_WAIT_SECONDS):
+        return self.retriever.get(wait)
+
+    def status(self):
+        return {"llm": self.llm.status(), "retriever": self.retriever.status()}
+
+
+llm_provider = LLMProvider()
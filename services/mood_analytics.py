@@ -0,0 +1,237 @@
+"""Vectorized mood analytics over a user's full check-in history.
+
+The history is loaded once into NumPy arrays (one row per entry) and folded
+into a calendar-day series from the first entry to today. Every metric is
+computed with array operations (cumulative sums for the rolling windows,
+``bincount`` for the groupings). Missing days are NaN in the daily series
+and are skipped by the windowed means rather than counted as zero.
+"""
+import math
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import String, cast, select
+
+from db import db
+from models import MoodEntry, MoodEntryTag
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+DEFAULT_EWMA_SPAN = 14
+MIN_TAG_COUNT = 2
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def load_history(user_id):
+    """Return ``(ordinals, scores, tag_entry_index, tag_names)`` arrays."""
+    # Core rows (no ORM loading) with dates as ISO text, parsed by NumPy in
+    # one call instead of one date object per row.
+    conn = db.session.connection()
+    rows = conn.execute(
+        select(MoodEntry.id, cast(MoodEntry.entry_date, String), MoodEntry.mood_score)
+        .where(MoodEntry.user_id == user_id, MoodEntry.entry_date.isnot(None))
+        .order_by(MoodEntry.id)
+    ).all()
+    if rows:
+        ids, dates, scores = zip(*rows)
+    else:
+        ids, dates, scores = (), (), ()
+    ids = np.array(ids, dtype=np.int64)
+    days = np.array(dates, dtype="datetime64[D]").astype(np.int64)
+    ordinals = days + EPOCH_ORDINAL
+    scores = np.array(scores, dtype=np.float64)
+
+    tag_rows = conn.execute(
+        select(MoodEntryTag.mood_entry_id, MoodEntryTag.tag).where(MoodEntryTag.user_id == user_id)
+    ).all()
+    if tag_rows:
+        tag_ids, tag_names = zip(*tag_rows)
+    else:
+        tag_ids, tag_names = (), ()
+    tag_ids = np.array(tag_ids, dtype=np.int64)
+    tag_names = np.array(tag_names, dtype=object)
+    # ``ids`` is sorted, so each tag row maps to its entry by binary search.
+    positions = np.searchsorted(ids, tag_ids)
+    found = positions < ids.size
+    found[found] = ids[positions[found]] == tag_ids[found]
+    return ordinals, scores, positions[found], tag_names[found]
+
+
+def daily_series(ordinals, scores, first, last):
+    """Per-day (sum, count) arrays covering ``first``..``last`` ordinals."""
+    length = last - first + 1
+    offsets = ordinals - first
+    sums = np.bincount(offsets, weights=scores, minlength=length)[:length]
+    counts = np.bincount(offsets, minlength=length)[:length].astype(np.float64)
+    return sums, counts
+
+
+def rolling_mean(sums, counts, window):
+    """Mean over the trailing ``window`` calendar days (NaN if none logged)."""
+    csum = np.concatenate(([0.0], np.cumsum(sums)))
+    ccount = np.concatenate(([0.0], np.cumsum(counts)))
+    end = np.arange(1, len(sums) + 1)
+    start = np.maximum(end - window, 0)
+    window_sums = csum[end] - csum[start]
+    window_counts = ccount[end] - ccount[start]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(window_counts > 0, window_sums / window_counts, np.nan)
+
+
+def rolling_std(sums, squares, counts, window):
+    """Population std over the trailing ``window`` days (NaN below 2 entries)."""
+    mean = rolling_mean(sums, counts, window)
+    mean_square = rolling_mean(squares, counts, window)
+    csum = np.concatenate(([0.0], np.cumsum(counts)))
+    end = np.arange(1, len(counts) + 1)
+    window_counts = csum[end] - csum[np.maximum(end - window, 0)]
+    variance = np.clip(mean_square - mean * mean, 0.0, None)
+    return np.where(window_counts >= 2, np.sqrt(variance), np.nan)
+
+
+def ewma(values, span=DEFAULT_EWMA_SPAN):
+    """Exponentially weighted mean (``y0 = x0``, ``y = a*x + (1-a)*y_prev``).
+
+    Evaluated in closed form block by block: within a block,
+    ``y_j = d^(j+1) * carry + a * d^j * cumsum(x_k / d^k)`` with ``d = 1 - a``.
+    Blocks are sized so ``d^-k`` stays well inside float range.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return values
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+    block = max(1, min(512, int(math.log(1e12) / -math.log(decay))))
+    powers = decay ** np.arange(block, dtype=np.float64)
+    out = np.empty_like(values)
+    carry = values[0]
+    for start in range(0, values.size, block):
+        chunk = values[start:start + block]
+        size = chunk.size
+        scaled = np.cumsum(chunk / powers[:size])
+        out[start:start + size] = decay * powers[:size] * carry + alpha * powers[:size] * scaled
+        carry = out[start + size - 1]
+    return out
+
+
+def _ewma_daily(daily_means, span):
+    """EWMA over logged days only, carried forward across gaps."""
+    logged = ~np.isnan(daily_means)
+    result = np.full(daily_means.shape, np.nan)
+    if not logged.any():
+        return result
+    smoothed = ewma(daily_means[logged], span)
+    index = np.cumsum(logged) - 1
+    started = index >= 0
+    result[started] = smoothed[index[started]]
+    return result
+
+
+def _as_list(values, digits=3):
+    return [None if np.isnan(value) else round(float(value), digits) for value in values]
+
+
+def _round(value, digits=3):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return round(float(value), digits)
+
+
+def compute_analytics(ordinals, scores, tag_entry_index, tag_names, today=None,
+                      series_days=90, ewma_span=DEFAULT_EWMA_SPAN):
+    """Analytics dict for pre-loaded history arrays (see ``load_history``)."""
+    today = today or date.today()
+    if ordinals.size == 0:
+        return {
+            "count": 0,
+            "first_date": None,
+            "last_date": None,
+            "average_mood": None,
+            "ewma_span": ewma_span,
+            "series": {"dates": [], "daily": [], "rolling_7d": [], "rolling_30d": [],
+                       "ewma": [], "rolling_30d_std": []},
+            "weekday": [],
+            "tags": [],
+            "volatility": {"std": None, "mean_abs_change": None, "recent_30d_std": None},
+        }
+
+    first = int(ordinals.min())
+    last = max(int(ordinals.max()), today.toordinal())
+    sums, counts = daily_series(ordinals, scores, first, last)
+    squares, _ = daily_series(ordinals, scores * scores, first, last)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        daily = np.where(counts > 0, sums / counts, np.nan)
+
+    rolling_7d = rolling_mean(sums, counts, 7)
+    rolling_30d = rolling_mean(sums, counts, 30)
+    rolling_30d_std = rolling_std(sums, squares, counts, 30)
+    trend = _ewma_daily(daily, ewma_span)
+
+    overall = float(scores.mean())
+
+    weekdays = (ordinals + 6) % 7  # date.weekday(): Monday == 0
+    weekday_counts = np.bincount(weekdays, minlength=7)
+    weekday_sums = np.bincount(weekdays, weights=scores, minlength=7)
+    weekday = [
+        {
+            "day": WEEKDAYS[day],
+            "count": int(weekday_counts[day]),
+            "average": _round(weekday_sums[day] / weekday_counts[day]) if weekday_counts[day] else None,
+            "delta": _round(weekday_sums[day] / weekday_counts[day] - overall)
+            if weekday_counts[day] else None,
+        }
+        for day in range(7)
+    ]
+
+    tags = []
+    if tag_names.size:
+        names, codes = np.unique(tag_names.astype(str), return_inverse=True)
+        tag_counts = np.bincount(codes, minlength=names.size)
+        tag_sums = np.bincount(codes, weights=scores[tag_entry_index], minlength=names.size)
+        keep = np.flatnonzero(tag_counts >= MIN_TAG_COUNT)
+        keep = keep[np.argsort(-tag_counts[keep], kind="stable")]
+        tags = [
+            {
+                "tag": str(names[code]),
+                "count": int(tag_counts[code]),
+                "average": _round(tag_sums[code] / tag_counts[code]),
+                "delta": _round(tag_sums[code] / tag_counts[code] - overall),
+            }
+            for code in keep
+        ]
+
+    logged_daily = daily[~np.isnan(daily)]
+    changes = np.abs(np.diff(logged_daily))
+    volatility = {
+        "std": _round(scores.std()) if scores.size >= 2 else None,
+        "mean_abs_change": _round(changes.mean()) if changes.size else None,
+        "recent_30d_std": _round(rolling_30d_std[-1]),
+    }
+
+    window = slice(max(0, len(daily) - series_days), len(daily))
+    start_date = date.fromordinal(first + window.start)
+    return {
+        "count": int(scores.size),
+        "first_date": date.fromordinal(first).isoformat(),
+        "last_date": date.fromordinal(int(ordinals.max())).isoformat(),
+        "average_mood": _round(overall),
+        "ewma_span": ewma_span,
+        "series": {
+            "dates": [(start_date + timedelta(days=i)).isoformat()
+                      for i in range(window.stop - window.start)],
+            "daily": _as_list(daily[window]),
+            "rolling_7d": _as_list(rolling_7d[window]),
+            "rolling_30d": _as_list(rolling_30d[window]),
+            "ewma": _as_list(trend[window]),
+            "rolling_30d_std": _as_list(rolling_30d_std[window]),
+        },
+        "weekday": weekday,
+        "tags": tags,
+        "volatility": volatility,
+    }
+
+
+def mood_analytics(user_id, series_days=90, ewma_span=DEFAULT_EWMA_SPAN):
+    """Load ``user_id``'s history and compute all analytics."""
+    return compute_analytics(
+        *load_history(user_id), series_days=series_days, ewma_span=ewma_span
+    )
@@ -0,0 +1,302 @@
+"""Per-user mood rollups for constant-time summaries.
+
+``record_check_in`` updates the user's ``MoodRollup`` row and its daily and
+weekly ``MoodRollupBucket`` rows in the same transaction as the mood entry
+write, so the unfiltered summary is a handful of indexed row reads. Counters
+are changed with ``UPDATE ... SET x = x + :delta`` and rows are created with
+insert-on-conflict, so concurrent check-ins neither lose updates nor fail on
+the unique keys.
+
+Rollups missing or dropped (e.g. after attaching anonymous entries) are
+rebuilt on the next write; until then summaries are computed from
+``mood_entries`` without writing. ``scripts/rebuild_mood_rollups.py``
+rebuilds them in bulk.
+"""
+from datetime import date, timedelta
+
+from sqlalchemy import case, delete, func, select, update
+
+from db import db
+from models import MoodEntry, MoodRollup, MoodRollupBucket
+from utils.sql import insert_ignore
+
+TREND_WINDOW_DAYS = 7
+# Two back-to-back trend windows of daily buckets.
+DAILY_BUCKET_DAYS = 2 * TREND_WINDOW_DAYS
+WEEKLY_BUCKET_WEEKS = 12
+
+DAY = "day"
+WEEK = "week"
+
+
+def trend_from_averages(current_avg, previous_avg, window_days=TREND_WINDOW_DAYS):
+    """Week-over-week trend dict from the two window averages."""
+    if current_avg is None or previous_avg is None:
+        return {"direction": "flat", "delta": 0, "window_days": window_days}
+    delta = float(current_avg) - float(previous_avg)
+    if delta > 0.25:
+        direction = "up"
+    elif delta < -0.25:
+        direction = "down"
+    else:
+        direction = "flat"
+    return {"direction": direction, "delta": round(delta, 2), "window_days": window_days}
+
+
+def _week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def _oldest_buckets(today):
+    return {
+        DAY: today - timedelta(days=DAILY_BUCKET_DAYS - 1),
+        WEEK: _week_start(today) - timedelta(weeks=WEEKLY_BUCKET_WEEKS - 1),
+    }
+
+
+def _streak_ending(user_id, last_date):
+    streak = 0
+    day = last_date
+    dates = db.session.execute(
+        select(MoodEntry.entry_date)
+        .where(MoodEntry.user_id == user_id, MoodEntry.entry_date <= last_date)
+        .distinct()
+        .order_by(MoodEntry.entry_date.desc())
+        .execution_options(yield_per=100)
+    ).scalars()
+    for entry_date in dates:
+        if entry_date != day:
+            break
+        streak += 1
+        day = day - timedelta(days=1)
+    return streak
+
+
+def _compute_rollup(user_id):
+    """Rollup values and ``{(period, start): [count, sum]}`` buckets, unsaved."""
+    today = date.today()
+    count, score_sum, min_score, max_score, last_date = db.session.execute(
+        select(
+            func.count(MoodEntry.id),
+            func.coalesce(func.sum(MoodEntry.mood_score), 0),
+            func.min(MoodEntry.mood_score),
+            func.max(MoodEntry.mood_score),
+            func.max(MoodEntry.entry_date),
+        ).where(MoodEntry.user_id == user_id)
+    ).one()
+    values = {
+        "entry_count": count,
+        "score_sum": int(score_sum),
+        "min_score": min_score,
+        "max_score": max_score,
+        "streak_last_date": last_date,
+        "streak_days": _streak_ending(user_id, last_date) if last_date else 0,
+    }
+
+    oldest = _oldest_buckets(today)
+    buckets = {}
+    for day, day_count, day_sum in db.session.execute(
+        select(MoodEntry.entry_date, func.count(MoodEntry.id), func.sum(MoodEntry.mood_score))
+        .where(
+            MoodEntry.user_id == user_id,
+            MoodEntry.entry_date >= oldest[WEEK],
+            MoodEntry.entry_date <= today,
+        )
+        .group_by(MoodEntry.entry_date)
+    ):
+        keys = [(WEEK, _week_start(day))]
+        if day >= oldest[DAY]:
+            keys.append((DAY, day))
+        for key in keys:
+            bucket = buckets.setdefault(key, [0, 0])
+            bucket[0] += day_count
+            bucket[1] += int(day_sum)
+    return values, buckets
+
+
+def _write_buckets(user_id, buckets):
+    db.session.execute(delete(MoodRollupBucket).where(MoodRollupBucket.user_id == user_id))
+    db.session.add_all(
+        MoodRollupBucket(
+            user_id=user_id, period=period, bucket_start=start,
+            entry_count=bucket_count, score_sum=bucket_sum,
+        )
+        for (period, start), (bucket_count, bucket_sum) in buckets.items()
+    )
+
+
+def rebuild_rollup(user_id):
+    """Recompute the user's rollup and buckets from ``mood_entries`` (caller commits)."""
+    values, buckets = _compute_rollup(user_id)
+    if not insert_ignore(MoodRollup, ["user_id"], user_id=user_id, **values):
+        db.session.execute(update(MoodRollup).where(MoodRollup.user_id == user_id).values(**values))
+    _write_buckets(user_id, buckets)
+    return db.session.execute(
+        select(MoodRollup).where(MoodRollup.user_id == user_id).execution_options(populate_existing=True)
+    ).scalar_one()
+
+
+def _bump_bucket(user_id, period, start, count_delta, score_delta):
+    insert_ignore(
+        MoodRollupBucket, ["user_id", "period", "bucket_start"],
+        user_id=user_id, period=period, bucket_start=start, entry_count=0, score_sum=0,
+    )
+    db.session.execute(
+        update(MoodRollupBucket)
+        .where(
+            MoodRollupBucket.user_id == user_id,
+            MoodRollupBucket.period == period,
+            MoodRollupBucket.bucket_start == start,
+        )
+        .values(
+            entry_count=MoodRollupBucket.entry_count + count_delta,
+            score_sum=MoodRollupBucket.score_sum + score_delta,
+        )
+    )
+
+
+def _trim_buckets(user_id, today):
+    for period, oldest in _oldest_buckets(today).items():
+        db.session.execute(
+            delete(MoodRollupBucket).where(
+                MoodRollupBucket.user_id == user_id,
+                MoodRollupBucket.period == period,
+                MoodRollupBucket.bucket_start < oldest,
+            )
+        )
+
+
+def record_check_in(entry, previous_score=None):
+    """Fold a created (``previous_score`` None) or re-scored entry into the rollup.
+
+    Call after the entry is added to the session and before commit.
+    """
+    user_id = entry.user_id
+    db.session.flush()
+    if not db.session.execute(
+        select(MoodRollup.id).where(MoodRollup.user_id == user_id)
+    ).first():
+        values, buckets = _compute_rollup(user_id)
+        if insert_ignore(MoodRollup, ["user_id"], user_id=user_id, **values):
+            _write_buckets(user_id, buckets)
+            return
+        # A concurrent check-in created the row first; apply ours on top.
+
+    day = entry.entry_date
+    score = entry.mood_score
+    rollups = update(MoodRollup).where(MoodRollup.user_id == user_id)
+
+    if previous_score is None:
+        yesterday = day - timedelta(days=1)
+        db.session.execute(rollups.values(
+            entry_count=MoodRollup.entry_count + 1,
+            score_sum=MoodRollup.score_sum + score,
+            min_score=case(
+                (MoodRollup.min_score.is_(None) | (MoodRollup.min_score > score), score),
+                else_=MoodRollup.min_score,
+            ),
+            max_score=case(
+                (MoodRollup.max_score.is_(None) | (MoodRollup.max_score < score), score),
+                else_=MoodRollup.max_score,
+            ),
+            streak_days=case(
+                (MoodRollup.streak_last_date >= day, MoodRollup.streak_days),
+                (MoodRollup.streak_last_date == yesterday, MoodRollup.streak_days + 1),
+                else_=1,
+            ),
+            streak_last_date=case(
+                (MoodRollup.streak_last_date > day, MoodRollup.streak_last_date),
+                else_=day,
+            ),
+        ))
+        count_delta, score_delta = 1, score
+    elif previous_score != score:
+        # The old score may have been the only extreme, so take min/max from
+        # the (flushed) entries instead of the rollup row.
+        scores = select(MoodEntry.mood_score).where(MoodEntry.user_id == user_id).subquery()
+        db.session.execute(rollups.values(
+            score_sum=MoodRollup.score_sum + (score - previous_score),
+            min_score=select(func.min(scores.c.mood_score)).scalar_subquery(),
+            max_score=select(func.max(scores.c.mood_score)).scalar_subquery(),
+        ))
+        count_delta, score_delta = 0, score - previous_score
+    else:
+        return
+
+    today = date.today()
+    oldest = _oldest_buckets(today)
+    if oldest[DAY] <= day <= today:
+        _bump_bucket(user_id, DAY, day, count_delta, score_delta)
+    if oldest[WEEK] <= day <= today:
+        _bump_bucket(user_id, WEEK, _week_start(day), count_delta, score_delta)
+    _trim_buckets(user_id, today)
+
+
+def drop_rollup(user_id):
+    """Forget the user's rollup and buckets; rebuilt on next write (caller commits)."""
+    MoodRollup.query.filter_by(user_id=user_id).delete()
+    MoodRollupBucket.query.filter_by(user_id=user_id).delete()
+
+
+def rollup_summary(user_id):
+    """Unfiltered mood summary for ``user_id``; never writes."""
+    today = date.today()
+    oldest = _oldest_buckets(today)
+    rollup = MoodRollup.query.filter_by(user_id=user_id).first()
+    if rollup is None:
+        values, buckets = _compute_rollup(user_id)
+    else:
+        values = {
+            "entry_count": rollup.entry_count,
+            "score_sum": rollup.score_sum,
+            "min_score": rollup.min_score,
+            "max_score": rollup.max_score,
+            "streak_days": rollup.streak_days,
+            "streak_last_date": rollup.streak_last_date,
+        }
+        buckets = {
+            (period, start): [bucket_count, bucket_sum]
+            for period, start, bucket_count, bucket_sum in db.session.execute(
+                select(
+                    MoodRollupBucket.period,
+                    MoodRollupBucket.bucket_start,
+                    MoodRollupBucket.entry_count,
+                    MoodRollupBucket.score_sum,
+                ).where(
+                    MoodRollupBucket.user_id == user_id,
+                    MoodRollupBucket.bucket_start >= oldest[WEEK],
+                )
+            )
+        }
+
+    def window_average(first_day, last_day):
+        count = total = 0
+        for offset in range(first_day, last_day + 1):
+            day_count, day_sum = buckets.get((DAY, today - timedelta(days=offset)), (0, 0))
+            count += day_count
+            total += day_sum
+        return total / count if count else None
+
+    weekly = []
+    for weeks_ago in range(WEEKLY_BUCKET_WEEKS - 1, -1, -1):
+        start = _week_start(today) - timedelta(weeks=weeks_ago)
+        week_count, week_sum = buckets.get((WEEK, start), (0, 0))
+        if week_count:
+            weekly.append({
+                "week_start": start.isoformat(),
+                "count": week_count,
+                "average_mood": week_sum / week_count,
+            })
+
+    current_avg = window_average(0, TREND_WINDOW_DAYS - 1)
+    previous_avg = window_average(TREND_WINDOW_DAYS, 2 * TREND_WINDOW_DAYS - 1)
+    count = values["entry_count"]
+    return {
+        "count": count,
+        "average_mood": values["score_sum"] / count if count else None,
+        "min_mood": values["min_score"],
+        "max_mood": values["max_score"],
+        "streak_days": values["streak_days"] if values["streak_last_date"] == today else 0,
+        "trend": trend_from_averages(current_avg, previous_avg),
+        "weekly": weekly,
+    }
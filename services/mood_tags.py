@@ -0,0 +1,94 @@
+"""Keep ``mood_entry_tags`` in sync with ``MoodEntry.tags_json``.
+
+``tags_json`` stays the source returned to clients; ``mood_entry_tags`` is
+the indexed copy used for tag filters. Every write path that changes an
+entry's tags, owner or existence goes through the helpers here.
+"""
+import json
+
+from sqlalchemy import select, update
+
+from db import db
+from models import MoodEntry, MoodEntryTag
+
+MAX_TAG_LENGTH = 255
+
+
+def tag_values(tags):
+    """Distinct, indexable tag strings from a client-supplied tag list."""
+    if not isinstance(tags, list):
+        return []
+    values = []
+    for tag in tags:
+        if isinstance(tag, str) and tag and len(tag) <= MAX_TAG_LENGTH and tag not in values:
+            values.append(tag)
+    return values
+
+
+def set_entry_tags(entry, tags):
+    """Store ``tags`` on ``entry`` and replace its tag rows (caller commits)."""
+    entry.tags_json = json.dumps(tags)
+    wanted = tag_values(tags)
+    entry.tag_rows = [row for row in entry.tag_rows if row.tag in wanted]
+    existing = {row.tag for row in entry.tag_rows}
+    for tag in wanted:
+        if tag not in existing:
+            entry.tag_rows.append(
+                MoodEntryTag(tag=tag, user_id=entry.user_id, entry_date=entry.entry_date)
+            )
+
+
+def delete_entry_tags(*entry_filters):
+    """Delete tag rows of the entries matching ``entry_filters`` (bulk path)."""
+    entry_ids = select(MoodEntry.id).where(*entry_filters)
+    db.session.execute(
+        MoodEntryTag.__table__.delete().where(MoodEntryTag.mood_entry_id.in_(entry_ids))
+    )
+
+
+def attach_entry_tags(session_id, user_id):
+    """Re-own the tag rows of anonymous entries about to be attached."""
+    entry_ids = select(MoodEntry.id).where(
+        MoodEntry.session_id == session_id, MoodEntry.user_id.is_(None)
+    )
+    db.session.execute(
+        update(MoodEntryTag)
+        .where(MoodEntryTag.mood_entry_id.in_(entry_ids))
+        .values(user_id=user_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def backfill_tag_rows(conn, batch_size=1000):
+    """Create tag rows for entries that have tags but no rows yet."""
+    entries = MoodEntry.__table__
+    tag_rows = MoodEntryTag.__table__
+    has_rows = select(tag_rows.c.mood_entry_id).where(tag_rows.c.mood_entry_id == entries.c.id)
+    last_id = 0
+    while True:
+        batch = conn.execute(
+            select(entries.c.id, entries.c.user_id, entries.c.entry_date, entries.c.tags_json)
+            .where(
+                entries.c.id > last_id,
+                entries.c.tags_json.isnot(None),
+                entries.c.tags_json.notin_(["", "[]"]),
+                ~has_rows.exists(),
+            )
+            .order_by(entries.c.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            return
+        rows = []
+        for entry_id, user_id, entry_date, tags_json in batch:
+            try:
+                tags = json.loads(tags_json)
+            except ValueError:
+                continue
+            rows.extend(
+                {"mood_entry_id": entry_id, "user_id": user_id, "tag": tag, "entry_date": entry_date}
+                for tag in tag_values(tags)
+            )
+        if rows:
+            conn.execute(tag_rows.insert(), rows)
+        last_id = batch[-1][0]
@@ -0,0 +1,95 @@
+"""Per-day plan completion stored as a bitmask on ``TherapyPlan``.
+
+Bit ``i`` of ``completed_days_mask`` marks ``weekly_plan[i]`` as done, so a
+toggle is one ``UPDATE`` of an integer column instead of rewriting the
+``plan_json`` text.
+"""
+import json
+
+from sqlalchemy import select, update
+
+from db import db
+from models import TherapyPlan
+from services.plan_generator import DAYS
+
+PLAN_DAY_COUNT = len(DAYS)
+ALL_DAYS_MASK = (1 << PLAN_DAY_COUNT) - 1
+
+
+def completion_mask(weekly_plan):
+    """Bitmask of the ``completed`` flags in a ``weekly_plan`` list."""
+    mask = 0
+    for index, item in enumerate(weekly_plan[:PLAN_DAY_COUNT]):
+        if item.get("completed"):
+            mask |= 1 << index
+    return mask
+
+
+def completion_percent(mask):
+    """Share of plan days marked done, as a whole percentage."""
+    return round(100 * bin((mask or 0) & ALL_DAYS_MASK).count("1") / PLAN_DAY_COUNT)
+
+
+def set_day_completed(plan_id, user_id, day_index, completed):
+    """Set or clear one day's bit; return the number of plans updated."""
+    bit = 1 << day_index
+    mask = TherapyPlan.completed_days_mask
+    value = mask.op("|")(bit) if completed else mask.op("&")(ALL_DAYS_MASK & ~bit)
+    result = db.session.execute(
+        update(TherapyPlan)
+        .where(TherapyPlan.id == plan_id, TherapyPlan.user_id == user_id)
+        .values(completed_days_mask=value)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def backfill_completion_masks(conn, batch_size=1000):
+    """Copy ``completed`` flags from ``plan_json`` into ``completed_days_mask``."""
+    plans = TherapyPlan.__table__
+    last_id = 0
+    while True:
+        batch = conn.execute(
+            select(plans.c.id, plans.c.plan_json)
+            .where(plans.c.id > last_id, plans.c.plan_json.like('%"completed": true%'))
+            .order_by(plans.c.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            return
+        for plan_id, plan_json in batch:
+            try:
+                weekly_plan = json.loads(plan_json).get("weekly_plan", [])
+            except (ValueError, AttributeError):
+                continue
+            conn.execute(
+                plans.update()
+                .where(plans.c.id == plan_id)
+                .values(completed_days_mask=completion_mask(weekly_plan))
+            )
+        last_id = batch[-1][0]
+
+
+def backfill_plan_themes(conn, batch_size=1000):
+    """Copy each plan's theme out of ``plan_json`` into ``therapy_plan.theme``."""
+    plans = TherapyPlan.__table__
+    last_id = 0
+    while True:
+        batch = conn.execute(
+            select(plans.c.id, plans.c.plan_json)
+            .where(plans.c.id > last_id, plans.c.theme.is_(None))
+            .order_by(plans.c.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            return
+        for plan_id, plan_json in batch:
+            try:
+                theme = json.loads(plan_json).get("theme")
+            except (ValueError, AttributeError):
+                continue
+            if theme:
+                conn.execute(
+                    plans.update().where(plans.c.id == plan_id).values(theme=theme[:255])
+                )
+        last_id = batch[-1][0]
@@ -1,4 +1,7 @@
 """Deterministic therapy plan generator."""
+import copy
+
+from utils.cache import LRUCache
 
 PLAN_TEMPLATES = {
     "anxiety": {
@@ -53,6 +56,11 @@ DAILY_EXERCISES = {
     "journaling": "Reflective Journaling",
 }
 
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Plans are a pure function of (concern, approach, minutes); keep built ones.
+_plan_cache = LRUCache(maxsize=256, name="plan_templates")
+
 REFLECTION_QUESTIONS = {
     "anxiety": [
         "What was one moment today where you felt slightly less anxious?",
@@ -86,6 +94,16 @@ def generate_weekly_plan(profile):
     approach = profile.get("approach", "cbt").lower()
     minutes = profile.get("minutes_per_day", 10)
 
+    key = (concern, approach, minutes)
+    plan = _plan_cache.get(key)
+    if plan is None:
+        plan = _build_plan(concern, approach, minutes)
+        _plan_cache.set(key, plan)
+    # Callers mutate the result; never hand out the cached dict.
+    return copy.deepcopy(plan)
+
+
+def _build_plan(concern, approach, minutes):
     template = PLAN_TEMPLATES.get(concern, {}).get(approach)
     if not template:
         template = PLAN_TEMPLATES.get(concern, {}).get(
@@ -100,10 +118,9 @@ def generate_weekly_plan(profile):
     exercises = template.get("exercises", ["breathing", "grounding"])
     reflections = REFLECTION_QUESTIONS.get(concern, ["How are you feeling today?"] * 7)
 
-    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
     weekly_plan = []
 
-    for i, day in enumerate(days):
+    for i, day in enumerate(DAYS):
         exercise_key = exercises[i % len(exercises)]
         reflection = reflections[i % len(reflections)]
 
@@ -0,0 +1,84 @@
+"""Cached chat-profile prompt prefix.
+
+The rendered ``[Language: ..] [Chat Profile: ..]`` prefix is cached per user,
+with one rendering per request language. Writes to ``ChatProfile``
+invalidate that user's entry through ORM events, so a chat turn normally
+does no profile query. The TTL bounds staleness for entries cached by other worker processes.
+"""
+import os
+
+from sqlalchemy import event, inspect
+
+from db import db
+from models import ChatProfile
+from utils.cache import LRUCache
+
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "2048"))
+PROFILE_CACHE_TTL_SECONDS = int(os.getenv("PROFILE_CACHE_TTL_SECONDS", "300"))
+
+_PENDING_KEY = "profile_cache_invalidations"
+
+profile_cache = LRUCache(
+    maxsize=PROFILE_CACHE_SIZE, ttl=PROFILE_CACHE_TTL_SECONDS, name="chat_profile_prefix"
+)
+
+
+def _render_profile_context(profile):
+    if not profile or not profile.onboarding_completed:
+        return ""
+    display_name = profile.display_name or ""
+    tone = profile.tone or ""
+    goal = profile.goal or ""
+    focus_area = profile.focus_area or ""
+    response_length = profile.response_length or ""
+    boundaries = profile.boundaries or ""
+    return (
+        "User preferred tone: "
+        f"{tone}. Goal: {goal}. Focus: {focus_area}. "
+        f"Response length: {response_length}. "
+        f"Boundaries: {boundaries}. "
+        f"Address them as {display_name} if provided."
+    )
+
+
+def get_profile_prompt_prefix(user_id, language):
+    """Return the prompt prefix for ``user_id`` in ``language``."""
+    entry = profile_cache.get(user_id)
+    if entry is None:
+        profile = ChatProfile.query.filter_by(user_id=user_id).first()
+        entry = {"profile_context": _render_profile_context(profile), "prefixes": {}}
+        profile_cache.set(user_id, entry)
+
+    prefix = entry["prefixes"].get(language)
+    if prefix is None:
+        prefix = f"[Language: {language}]"
+        if entry["profile_context"]:
+            prefix = f"{prefix} [Chat Profile: {entry['profile_context']}]"
+        entry["prefixes"][language] = prefix
+    return prefix
+
+
+def invalidate_profile_prefix(user_id):
+    if user_id is not None:
+        profile_cache.delete(user_id)
+
+
+def _queue_invalidation(target, user_id):
+    """Invalidate now and again after commit (covers concurrent refills)."""
+    invalidate_profile_prefix(user_id)
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(user_id)
+
+
+@event.listens_for(ChatProfile, "after_insert")
+@event.listens_for(ChatProfile, "after_update")
+@event.listens_for(ChatProfile, "after_delete")
+def _on_chat_profile_write(mapper, connection, target):
+    _queue_invalidation(target, target.user_id)
+
+
+@event.listens_for(db.session, "after_commit")
+def _flush_pending_invalidations(session):
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_profile_prefix(user_id)
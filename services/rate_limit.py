@@ -0,0 +1,206 @@
+"""Sliding-window-counter rate limiting with pluggable backends.
+
+Each key stores three numbers: the current window index, that window's count
+and the previous window's count. A request is allowed when
+``previous * (1 - elapsed_fraction) + current < limit``, so memory per key
+is constant. Keys idle for two windows are evicted.
+
+Backends (``RATE_LIMIT_BACKEND``):
+    auto    redis when ``REDIS_URL`` is set and redis-py is installed,
+            otherwise sqlite (default)
+    sqlite  shared file at ``RATE_LIMIT_SQLITE_PATH``; limits hold across
+            worker processes on one host
+    redis   ``REDIS_URL``; limits hold across hosts
+    memory  in-process dict; limits are per worker process (tests, single
+            process only)
+
+``python scripts/check_rate_limit.py`` exercises every backend, the Redis one
+against an in-process fake.
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "auto").lower()
+RATE_LIMIT_SQLITE_PATH = os.getenv(
+    "RATE_LIMIT_SQLITE_PATH",
+    str(Path(__file__).resolve().parents[1] / "instance" / "rate_limits.db"),
+)
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+EVICT_EVERY = 1000
+
+
+def _roll_window(stored_window, current, previous, window):
+    """Shift stored counters forward to ``window``; return (current, previous)."""
+    if stored_window == window:
+        return current, previous
+    if stored_window == window - 1:
+        return 0, current
+    return 0, 0
+
+
+def _estimate(current, previous, now, period):
+    elapsed_fraction = (now % period) / period
+    return previous * (1 - elapsed_fraction) + current
+
+
+class MemoryBackend:
+    """Per-process counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = {}
+        self._hits = 0
+
+    def hit(self, key, limit, period, now):
+        window = int(now // period)
+        with self._lock:
+            self._hits += 1
+            if self._hits % EVICT_EVERY == 0:
+                self._evict(now)
+            stored_window, current, previous, _ = self._state.get(key, (window, 0, 0, 0))
+            current, previous = _roll_window(stored_window, current, previous, window)
+            allowed = _estimate(current, previous, now, period) < limit
+            if allowed:
+                current += 1
+            self._state[key] = (window, current, previous, (window + 2) * period)
+            return allowed
+
+    def _evict(self, now):
+        expired = [key for key, state in self._state.items() if state[3] <= now]
+        for key in expired:
+            del self._state[key]
+
+    def __len__(self):
+        return len(self._state)
+
+
+class SQLiteBackend:
+    """Counters in a shared SQLite file, updated under ``BEGIN IMMEDIATE``."""
+
+    def __init__(self, path=RATE_LIMIT_SQLITE_PATH):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hits = 0
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            "key TEXT PRIMARY KEY, window INTEGER NOT NULL, "
+            "current INTEGER NOT NULL, previous INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_rate_limits_expires_at ON rate_limits (expires_at)"
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key, limit, period, now):
+        window = int(now // period)
+        conn = self._connect()
+        with self._lock:
+            self._hits += 1
+            evict = self._hits % EVICT_EVERY == 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if evict:
+                conn.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+            row = conn.execute(
+                "SELECT window, current, previous FROM rate_limits WHERE key = ?", (key,)
+            ).fetchone()
+            stored_window, current, previous = row or (window, 0, 0)
+            current, previous = _roll_window(stored_window, current, previous, window)
+            allowed = _estimate(current, previous, now, period) < limit
+            if allowed:
+                current += 1
+            conn.execute(
+                "INSERT INTO rate_limits (key, window, current, previous, expires_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET window = excluded.window, "
+                "current = excluded.current, previous = excluded.previous, "
+                "expires_at = excluded.expires_at",
+                (key, window, current, previous, (window + 2) * period),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed
+
+
+class RedisBackend:
+    """One counter key per window; Redis expiry evicts idle keys.
+
+    Works with any client exposing ``pipeline``/``incr``/``expire``/``get``/
+    ``decr`` (redis-py, fakeredis, or another Redis-compatible server).
+    """
+
+    def __init__(self, client=None, url=REDIS_URL, prefix="rl"):
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def hit(self, key, limit, period, now):
+        window = int(now // period)
+        current_key = f"{self.prefix}:{key}:{window}"
+        previous_key = f"{self.prefix}:{key}:{window - 1}"
+        pipe = self.client.pipeline()
+        pipe.incr(current_key)
+        pipe.expire(current_key, int(math.ceil(period * 2)))
+        pipe.get(previous_key)
+        current, _, previous = pipe.execute()
+        previous = int(previous or 0)
+        if _estimate(current - 1, previous, now, period) < limit:
+            return True
+        self.client.decr(current_key)
+        return False
+
+
+class RateLimiter:
+    """Front end used by routes: ``rate_limiter.hit(scope, key, limit, period)``."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def hit(self, scope, key, limit, period_seconds):
+        """Record one request for ``key``; return False when over ``limit``."""
+        return self.backend.hit(f"{scope}:{key}", limit, period_seconds, time.time())
+
+
+def _redis_available():
+    if not os.getenv("REDIS_URL"):
+        return False
+    try:
+        import redis  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_backend(name=RATE_LIMIT_BACKEND):
+    if name == "auto":
+        name = "redis" if _redis_available() else "sqlite"
+    if name == "sqlite":
+        return SQLiteBackend()
+    if name == "redis":
+        return RedisBackend()
+    if name == "memory":
+        return MemoryBackend()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {name}")
+
+
+rate_limiter = RateLimiter(create_backend())
@@ -33,6 +33,25 @@ CRISIS_KEYWORDS = {
 }
 
 
+def _compile_keyword_matcher(keywords):
+    """Compile one word-bounded alternation over every keyword.
+
+    The pattern is wrapped in a lookahead so ``finditer`` reports a hit at
+    every start position, which keeps overlapping keywords detectable in a
+    single pass. Longer keywords come first so the longest one wins at a
+    shared start position.
+    """
+    alternation = "|".join(
+        re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True)
+    )
+    return re.compile(r"(?=\b(" + alternation + r")\b)")
+
+
+_KEYWORD_MATCHER = _compile_keyword_matcher(
+    CRISIS_KEYWORDS["self_harm"] + CRISIS_KEYWORDS["crisis"]
+)
+
+
 def check_safety(text):
     """
     Check if text contains crisis or self-harm indicators.
@@ -43,30 +62,23 @@ def check_safety(text):
             'reasons': [list of detected keywords]
         }
     """
-    text_lower = text.lower()
-    detected_keywords = []
-
-    for keyword in CRISIS_KEYWORDS["self_harm"]:
-        if re.search(r"\b" + re.escape(keyword) + r"\b", text_lower):
-            detected_keywords.append(keyword)
-
-    if not detected_keywords:
-        for keyword in CRISIS_KEYWORDS["crisis"]:
-            if re.search(r"\b" + re.escape(keyword) + r"\b", text_lower):
-                detected_keywords.append(keyword)
+    hits = {match.group(1) for match in _KEYWORD_MATCHER.finditer(text.lower())}
 
-    if detected_keywords and any(
-        kw in CRISIS_KEYWORDS["self_harm"] for kw in detected_keywords
-    ):
+    detected_keywords = [kw for kw in CRISIS_KEYWORDS["self_harm"] if kw in hits]
+    if detected_keywords:
         risk_level = "high"
-    elif detected_keywords:
-        risk_level = "medium"
     else:
-        risk_level = "low"
+        detected_keywords = [kw for kw in CRISIS_KEYWORDS["crisis"] if kw in hits]
+        risk_level = "medium" if detected_keywords else "low"
 
     return {"risk_level": risk_level, "reasons": detected_keywords}
 
 
+def check_safety_batch(texts):
+    """Run ``check_safety`` over a list of texts, preserving order."""
+    return [check_safety(text) for text in texts]
+
+
 def get_crisis_response():
     """Return supportive response when crisis is detected."""
     return (
@@ -0,0 +1,178 @@
+"""Two-tier cache in front of an embeddings model.
+
+Vectors are keyed by a hash of (model name, kind, text), where ``kind``
+separates query from document embeddings. Lookups go to the in-process LRU
+first, then to an optional SQLite file at ``EMBEDDING_CACHE_PATH``, which
+worker processes, ingestion runs and restarts all share. Only misses reach
+the model, de-duplicated and in one batch. Counters for both tiers, summed
+over every live ``CachedEmbeddings``, appear in ``cache_stats()`` (and so in
+``/api/health``) as ``embeddings`` and ``embeddings_disk``.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import weakref
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from utils.cache import LRUCache, register_stats
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+# Empty disables the disk tier.
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+SQLITE_MAX_PARAMS = 500
+
+_instances = weakref.WeakSet()
+
+
+class DiskEmbeddingStore:
+    """float32 vectors in a shared SQLite file (WAL, one connection per thread)."""
+
+    def __init__(self, path):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys):
+        found = {}
+        conn = self._connect()
+        for start in range(0, len(keys), SQLITE_MAX_PARAMS):
+            batch = keys[start:start + SQLITE_MAX_PARAMS]
+            rows = conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                batch,
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, items):
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, vector.astype(np.float32).tobytes()) for key, vector in items],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self.writes += len(items)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+class _TierStats:
+    """Sums one tier's counters across live ``CachedEmbeddings`` instances."""
+
+    COUNTERS = ("size", "maxsize", "hits", "misses", "evictions", "writes")
+
+    def __init__(self, tier):
+        self.tier = tier
+
+    def stats(self):
+        caches = [getattr(instance, self.tier) for instance in list(_instances)]
+        caches = [cache for cache in caches if cache is not None]
+        totals = {"instances": len(caches)}
+        paths = []
+        for stats in (cache.stats() for cache in caches):
+            for counter in self.COUNTERS:
+                if counter in stats:
+                    totals[counter] = totals.get(counter, 0) + stats[counter]
+            if "path" in stats and stats["path"] not in paths:
+                paths.append(stats["path"])
+        if paths:
+            totals["paths"] = paths
+        lookups = totals.get("hits", 0) + totals.get("misses", 0)
+        totals["hit_rate"] = round(totals["hits"] / lookups, 3) if lookups else None
+        return totals
+
+
+register_stats("embeddings", _TierStats("memory"))
+register_stats("embeddings_disk", _TierStats("disk"))
+
+
+class CachedEmbeddings(Embeddings):
+    """``Embeddings`` wrapper that only sends unseen texts to ``inner``."""
+
+    def __init__(self, inner, model_name, maxsize=EMBEDDING_CACHE_SIZE,
+                 disk_path=EMBEDDING_CACHE_PATH):
+        self.inner = inner
+        self.model_name = model_name
+        self.memory = LRUCache(maxsize=maxsize)
+        self.disk = DiskEmbeddingStore(disk_path) if disk_path else None
+        _instances.add(self)
+
+    def _key(self, kind, text):
+        raw = f"{self.model_name}\0{kind}\0{text}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    def _lookup(self, kind, texts, compute):
+        keys = [self._key(kind, text) for text in texts]
+        vectors = {}
+        for key in set(keys):
+            vector = self.memory.get(key)
+            if vector is not None:
+                vectors[key] = vector
+
+        missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if missing and self.disk:
+            for key, vector in self.disk.get_many(missing).items():
+                self.memory.set(key, vector)
+                vectors[key] = vector
+            missing = [key for key in missing if key not in vectors]
+
+        if missing:
+            text_by_key = dict(zip(keys, texts))
+            computed = compute([text_by_key[key] for key in missing])
+            fresh = [
+                (key, np.asarray(vector, dtype=np.float32))
+                for key, vector in zip(missing, computed)
+            ]
+            for key, vector in fresh:
+                self.memory.set(key, vector)
+                vectors[key] = vector
+            if self.disk:
+                self.disk.set_many(fresh)
+
+        return [vectors[key].tolist() for key in keys]
+
+    def embed_documents(self, texts):
+        return self._lookup("document", list(texts), self.inner.embed_documents)
+
+    def embed_query(self, text):
+        return self._lookup(
+            "query", [text], lambda texts: [self.inner.embed_query(texts[0])]
+        )[0]
@@ -40,7 +40,18 @@ def text_split(extracted_data):
     texts_chunks = text_splitter.split_documents(extracted_data)
     return texts_chunks
 
-def download_hugging_face_embeddings():
+def download_hugging_face_embeddings(backend=None, cached=True):
+    """all-MiniLM-L6-v2 embeddings; ``EMBEDDING_BACKEND`` is huggingface or onnx."""
+    from src.embedding_cache import CachedEmbeddings
+
+    backend = (backend or os.getenv("EMBEDDING_BACKEND", "huggingface")).lower()
+    if backend == "onnx":
+        # CPU-only ONNX Runtime; never imports torch.
+        from src.onnx_embeddings import OnnxMiniLMEmbeddings
+
+        embeddings = OnnxMiniLMEmbeddings()
+        return CachedEmbeddings(embeddings, embeddings.model_name) if cached else embeddings
+
     from langchain_huggingface import HuggingFaceEmbeddings
 
     # Temporarily disable SSL verification for HuggingFace downloads
@@ -52,8 +63,5 @@ def download_hugging_face_embeddings():
     ssl._create_default_https_context = ssl._create_unverified_context
 
     model_name="sentence-transformers/all-MiniLM-L6-v2"
-    embeddings = HuggingFaceEmbeddings(
-        model_name='sentence-transformers/all-MiniLM-L6-v2',
-        model_kwargs={'trust_remote_code': True}
-    )
-    return embeddings
+    embeddings = HuggingFaceEmbeddings(model_name=model_name)
+    return CachedEmbeddings(embeddings, model_name) if cached else embeddings
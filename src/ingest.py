@@ -0,0 +1,257 @@
+"""Incremental RAG ingestion from the PDFs under ``data/``.
+
+A JSON manifest records each indexed file's content hash and the id and hash
+of every chunk it produced. On each run:
+
+1. Files whose hash is unchanged are skipped without being opened by the
+   PDF parser.
+2. New or changed files are parsed and split in a process pool.
+3. Only chunks whose ids are not already indexed are embedded and upserted,
+   in batches.
+4. Then chunks that disappeared from a changed file, and every chunk of a
+   removed file, are deleted from the store.
+
+A chunk's id is derived from its source path, text and metadata, so an
+unchanged chunk inside an edited file keeps its id and its vector, while a
+chunk whose metadata changed is re-upserted under a new id. Without a
+usable manifest (or with ``full``) every chunk is re-embedded and upserted,
+and only afterwards are ids this run did not write deleted: the live index
+keeps serving the old chunks until their replacements are in. The manifest
+is written only after the store has been updated; a crash just redoes work.
+"""
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from src.vector_store import PINECONE_INDEX_NAME, VECTOR_INDEX_TYPE, VECTOR_STORE_PATH
+
+MANIFEST_VERSION = 2  # 2: chunk hashes cover metadata
+INGEST_EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "64"))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+
+def default_manifest_path(backend):
+    if backend == "local":
+        # Lives with the index so the two are always deleted together.
+        return os.path.join(VECTOR_STORE_PATH, "manifest.json")
+    return os.path.join("data", f".ingest_manifest.{backend}.json")
+
+
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_ids(source, chunks):
+    """Stable ``(id, hash)`` per ``(text, metadata)``; repeats get distinct ids."""
+    seen = {}
+    result = []
+    for text, metadata in chunks:
+        digest = hashlib.sha256(text.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(json.dumps(metadata, sort_keys=True, default=str).encode("utf-8"))
+        chunk_hash = digest.hexdigest()
+        occurrence = seen.get(chunk_hash, 0)
+        seen[chunk_hash] = occurrence + 1
+        chunk_id = hashlib.sha256(f"{source}\0{chunk_hash}\0{occurrence}".encode("utf-8")).hexdigest()
+        result.append((chunk_id[:32], chunk_hash))
+    return result
+
+
+def split_pdf(path):
+    """Parse and split one PDF into ``(text, metadata)`` pairs (pool worker)."""
+    from langchain_community.document_loaders import PyPDFLoader
+
+    from src.helper import filter_to_minimal_docs, text_split
+
+    chunks = text_split(filter_to_minimal_docs(PyPDFLoader(path).load()))
+    return [(chunk.page_content, chunk.metadata) for chunk in chunks]
+
+
+def load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except FileNotFoundError:
+        return {"version": MANIFEST_VERSION, "files": {}}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "files": {}}
+    return manifest
+
+
+def save_manifest(path, manifest):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+class LocalTarget:
+    """Ingestion target backed by ``LocalVectorStore`` on disk.
+
+    Added batches are buffered and merged into the store once in
+    ``commit``, so each run copies the index arrays once, not per batch.
+    """
+
+    def __init__(self, embeddings, path=VECTOR_STORE_PATH, index_type=VECTOR_INDEX_TYPE):
+        from src.vector_store import LocalVectorStore
+
+        self.path = path
+        self.index_type = index_type
+        self.embeddings = embeddings
+        if os.path.exists(os.path.join(path, "meta.json")):
+            self.store = LocalVectorStore.load(embeddings, path, mmap=False)
+        else:
+            self.store = LocalVectorStore(embeddings)
+        self._pending = []
+
+    def ids(self):
+        return self.store.ids
+
+    def delete(self, ids):
+        self.store.delete(ids)
+
+    def add(self, vectors, documents, ids):
+        self._pending.append((np.asarray(vectors, dtype=np.float32), list(documents), list(ids)))
+
+    def commit(self):
+        if self._pending:
+            vectors = np.concatenate([batch[0] for batch in self._pending])
+            documents = [doc for batch in self._pending for doc in batch[1]]
+            ids = [chunk_id for batch in self._pending for chunk_id in batch[2]]
+            self._pending = []
+            # Upsert, like Pinecone: a re-added id replaces its old row.
+            self.store.delete(ids)
+            self.store.add_vectors(vectors, documents, ids)
+        if self.index_type == "ivf" and self.store.index_type == "flat":
+            self.store.build_ivf()
+        self.store.save(self.path)
+
+
+class PineconeTarget:
+    """Ingestion target that upserts to the hosted Pinecone index."""
+
+    TEXT_KEY = "text"  # where PineconeVectorStore reads page_content from
+    UPSERT_BATCH_SIZE = 100
+
+    def __init__(self, index_name=PINECONE_INDEX_NAME, dimension=384):
+        from pinecone import Pinecone, ServerlessSpec
+
+        client = Pinecone(api_key=os.environ.get("PINECONE_API_KEY"))
+        if not client.has_index(index_name):
+            client.create_index(
+                name=index_name,
+                dimension=dimension,
+                metric="cosine",
+                spec=ServerlessSpec(cloud="aws", region="us-east-1"),
+            )
+        self.index = client.Index(index_name)
+
+    def ids(self):
+        # ``list`` pages through the ids of a serverless index.
+        return [chunk_id for page in self.index.list() for chunk_id in page]
+
+    def delete(self, ids):
+        ids = list(ids)
+        for start in range(0, len(ids), self.UPSERT_BATCH_SIZE):
+            self.index.delete(ids=ids[start:start + self.UPSERT_BATCH_SIZE])
+
+    def add(self, vectors, documents, ids):
+        records = [
+            (chunk_id, list(map(float, vector)), {**metadata, self.TEXT_KEY: text})
+            for chunk_id, vector, (text, metadata) in zip(ids, vectors, documents)
+        ]
+        for start in range(0, len(records), self.UPSERT_BATCH_SIZE):
+            self.index.upsert(vectors=records[start:start + self.UPSERT_BATCH_SIZE])
+
+    def commit(self):
+        pass
+
+
+def ingest(data_dir, target, embeddings, manifest_path, workers=INGEST_WORKERS,
+           batch_size=INGEST_EMBED_BATCH_SIZE, full=False, split_file=split_pdf, log=print):
+    """Bring ``target`` in line with the PDFs under ``data_dir``; return stats."""
+    started = time.perf_counter()
+    manifest = load_manifest(manifest_path)
+    unknown_ids = set()
+    if full or not manifest["files"]:
+        # Without a manifest the store's contents are unknown: re-index into
+        # it and delete whatever this run did not write once it is done.
+        log("No usable manifest; re-indexing everything." if not full else "Full re-index.")
+        unknown_ids = set(target.ids())
+        manifest = {"version": MANIFEST_VERSION, "files": {}}
+    known = manifest["files"]
+
+    data_dir = Path(data_dir)
+    current = {
+        path.relative_to(data_dir).as_posix(): path
+        for path in sorted(data_dir.glob("**/*.pdf"))
+    }
+    hashes = {name: file_hash(path) for name, path in current.items()}
+    changed = [name for name in current if known.get(name, {}).get("sha256") != hashes[name]]
+    removed = [name for name in known if name not in current]
+
+    stale_ids = [chunk["id"] for name in removed for chunk in known[name]["chunks"]]
+    pending = []  # (id, text, metadata) to embed
+    if changed:
+        paths = [str(current[name]) for name in changed]
+        if workers > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+                splits = list(pool.map(split_file, paths))
+        else:
+            splits = [split_file(path) for path in paths]
+
+        for name, chunks in zip(changed, splits):
+            old_ids = {chunk["id"] for chunk in known.get(name, {}).get("chunks", [])}
+            ids = chunk_ids(name, chunks)
+            new_ids = {chunk_id for chunk_id, _ in ids}
+            stale_ids.extend(old_ids - new_ids)
+            pending.extend(
+                (chunk_id, text, metadata)
+                for (chunk_id, _), (text, metadata) in zip(ids, chunks)
+                if chunk_id not in old_ids
+            )
+            known[name] = {
+                "sha256": hashes[name],
+                "chunks": [{"id": chunk_id, "hash": chunk_hash} for chunk_id, chunk_hash in ids],
+            }
+    for name in removed:
+        del known[name]
+    if unknown_ids:
+        indexed = {chunk["id"] for entry in known.values() for chunk in entry["chunks"]}
+        stale_ids.extend(unknown_ids - indexed)
+
+    # Upsert before deleting so readers never see a chunk missing.
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        vectors = embeddings.embed_documents([text for _, text, _ in batch])
+        target.add(vectors, [(text, metadata) for _, text, metadata in batch],
+                   [chunk_id for chunk_id, _, _ in batch])
+    if stale_ids:
+        target.delete(stale_ids)
+    target.commit()
+    save_manifest(manifest_path, manifest)
+
+    stats = {
+        "files": len(current),
+        "changed_files": len(changed),
+        "removed_files": len(removed),
+        "embedded_chunks": len(pending),
+        "deleted_chunks": len(stale_ids),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    log(
+        f"{stats['files']} files: {stats['changed_files']} new/changed, "
+        f"{stats['removed_files']} removed; embedded {stats['embedded_chunks']} chunks, "
+        f"deleted {stats['deleted_chunks']} in {stats['seconds']}s"
+    )
+    return stats
@@ -0,0 +1,99 @@
+"""all-MiniLM-L6-v2 embeddings on ONNX Runtime (CPU, no torch).
+
+Loads a model exported by ``scripts/export_onnx_embeddings.py``. The
+directory holds ``tokenizer.json``, ``model.onnx`` and, optionally, the
+int8-quantized ``model_int8.onnx``, which is preferred when present. The
+output matches the sentence-transformers pipeline for this model: mean
+pooling over the attention mask, then L2 normalization.
+
+Batches are formed dynamically: texts are sorted by token count and cut
+into batches of ``EMBEDDING_BATCH_SIZE`` padded only to the longest text in
+the batch, so short queries never pay for long chunks' padding.
+"""
+import os
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_ONNX_PATH = os.getenv("EMBEDDING_ONNX_PATH", "models/all-MiniLM-L6-v2-onnx")
+# Empty picks model_int8.onnx if it exists, else model.onnx.
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "")
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))  # 0 = all cores
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+MAX_SEQ_LENGTH = 256  # the sentence-transformers limit for this model
+
+
+def model_file(model_dir=EMBEDDING_ONNX_PATH, filename=EMBEDDING_ONNX_FILE):
+    if filename:
+        return os.path.join(model_dir, filename)
+    quantized = os.path.join(model_dir, "model_int8.onnx")
+    return quantized if os.path.exists(quantized) else os.path.join(model_dir, "model.onnx")
+
+
+class OnnxMiniLMEmbeddings(Embeddings):
+    """Sentence embeddings from an ONNX export of all-MiniLM-L6-v2."""
+
+    def __init__(self, model_dir=EMBEDDING_ONNX_PATH, filename=EMBEDDING_ONNX_FILE,
+                 threads=EMBEDDING_THREADS, batch_size=EMBEDDING_BATCH_SIZE,
+                 max_length=MAX_SEQ_LENGTH):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.path = model_file(model_dir, filename)
+        self.batch_size = batch_size
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.no_padding()  # padding is done per batch below
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            self.path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {item.name for item in self.session.get_inputs()}
+
+    @property
+    def model_name(self):
+        """Cache namespace: vectors differ slightly between exports."""
+        return f"sentence-transformers/all-MiniLM-L6-v2:onnx:{os.path.basename(self.path)}"
+
+    def _run(self, encodings):
+        length = max(len(encoding.ids) for encoding in encodings)
+        input_ids = np.zeros((len(encodings), length), dtype=np.int64)
+        attention_mask = np.zeros((len(encodings), length), dtype=np.int64)
+        for row, encoding in enumerate(encodings):
+            size = len(encoding.ids)
+            input_ids[row, :size] = encoding.ids
+            attention_mask[row, :size] = encoding.attention_mask
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        hidden = self.session.run(None, feeds)[0]  # (batch, seq, dim)
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+    def encode(self, texts):
+        """``(len(texts), 384)`` float32 array of normalized embeddings."""
+        if not texts:
+            return np.zeros((0, 384), dtype=np.float32)
+        encodings = self.tokenizer.encode_batch(list(texts))
+        order = np.argsort([len(encoding.ids) for encoding in encodings], kind="stable")
+        out = None
+        for start in range(0, len(order), self.batch_size):
+            rows = order[start:start + self.batch_size]
+            vectors = self._run([encodings[i] for i in rows])
+            if out is None:
+                out = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            out[rows] = vectors
+        return out
+
+    def embed_documents(self, texts):
+        return self.encode(texts).tolist()
+
+    def embed_query(self, text):
+        return self.encode([text])[0].tolist()
@@ -0,0 +1,312 @@
+"""Vector store backends for the RAG retriever.
+
+``VECTOR_STORE_BACKEND`` selects where chunks live:
+
+- ``pinecone`` (default): the hosted ``therapy-chatbot`` index.
+- ``local``: ``LocalVectorStore``, a NumPy index on disk under
+  ``VECTOR_STORE_PATH``. Vectors are L2-normalized float32 rows (cosine
+  similarity is a dot product) and are memory-mapped at load time, so
+  startup cost does not grow with the corpus. ``VECTOR_INDEX_TYPE=ivf`` adds
+  k-means coarse clustering; each search then scores only the
+  ``VECTOR_NPROBE`` closest lists instead of every row.
+"""
+import json
+import os
+import uuid
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "pinecone").lower()
+VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH", "data/vector_store")
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "flat").lower()
+VECTOR_NPROBE = int(os.getenv("VECTOR_NPROBE", "8"))
+PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "therapy-chatbot")
+
+FORMAT_VERSION = 1
+KMEANS_ITERATIONS = 12
+KMEANS_SAMPLE_PER_LIST = 256
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores, k):
+    """Indices of the ``k`` highest scores, best first."""
+    k = min(k, scores.size)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.size:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.size)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def _assign(vectors, centroids, block=8192):
+    """Nearest centroid for each row, in blocks to bound memory."""
+    out = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), block):
+        out[start:start + block] = np.argmax(vectors[start:start + block] @ centroids.T, axis=1)
+    return out
+
+
+def train_centroids(vectors, nlist, seed=0):
+    """Spherical k-means over (a sample of) ``vectors``."""
+    rng = np.random.default_rng(seed)
+    nlist = max(1, min(nlist, len(vectors)))
+    sample_size = min(len(vectors), nlist * KMEANS_SAMPLE_PER_LIST)
+    sample = np.asarray(vectors[rng.choice(len(vectors), sample_size, replace=False)])
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        labels = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        counts = np.bincount(labels, minlength=nlist)
+        empty = counts == 0
+        # Re-seed empty lists with random points so every list stays usable.
+        sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class LocalVectorStore(VectorStore):
+    """In-process cosine-similarity index, flat or IVF, persisted as ``.npy``."""
+
+    def __init__(self, embedding, vectors=None, documents=None, ids=None,
+                 centroids=None, offsets=None, nprobe=VECTOR_NPROBE):
+        self._embedding = embedding
+        self._vectors = vectors
+        # (page_content, metadata) pairs; Documents are built only for results.
+        self._documents = list(documents or [])
+        self._ids = list(ids or [])
+        # IVF only: rows are grouped by list, list i is rows offsets[i]:offsets[i + 1].
+        self._centroids = centroids
+        self._offsets = offsets
+        self.nprobe = nprobe
+
+    @property
+    def embeddings(self):
+        return self._embedding
+
+    @property
+    def index_type(self):
+        return "ivf" if self._centroids is not None else "flat"
+
+    @property
+    def ids(self):
+        return list(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    # -- building ---------------------------------------------------------
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, ids=None,
+                   index_type=VECTOR_INDEX_TYPE, nlist=None, **kwargs):
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        if index_type == "ivf":
+            store.build_ivf(nlist)
+        return store
+
+    def add_texts(self, texts, metadatas=None, ids=None, **kwargs):
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = list(ids) if ids else [uuid.uuid4().hex for _ in texts]
+        return self.add_vectors(
+            self._embedding.embed_documents(texts),
+            [(text, dict(meta)) for text, meta in zip(texts, metadatas)],
+            ids,
+        )
+
+    def add_vectors(self, vectors, documents, ids):
+        """Add pre-computed embeddings for ``documents``.
+
+        ``documents`` are ``Document`` objects or ``(text, metadata)`` pairs.
+        """
+        vectors = _normalize(vectors)
+        documents = [
+            (doc.page_content, doc.metadata) if isinstance(doc, Document) else tuple(doc)
+            for doc in documents
+        ]
+        if self._vectors is None or len(self._vectors) == 0:
+            combined = vectors
+        else:
+            combined = np.concatenate([np.asarray(self._vectors), vectors])
+        documents = self._documents + list(documents)
+        all_ids = self._ids + list(ids)
+        if self._centroids is not None:
+            labels = np.concatenate([
+                np.repeat(np.arange(len(self._centroids)), np.diff(self._offsets)),
+                _assign(vectors, self._centroids),
+            ])
+            combined, documents, all_ids = self._group(combined, documents, all_ids, labels)
+        self._vectors, self._documents, self._ids = combined, documents, all_ids
+        return list(ids)
+
+    def delete(self, ids=None, **kwargs):
+        """Drop rows by id; return True if any were removed."""
+        if not ids or not self._ids:
+            return False
+        doomed = set(ids)
+        keep = np.array([doc_id not in doomed for doc_id in self._ids], dtype=bool)
+        if keep.all():
+            return False
+        if self._centroids is not None:
+            labels = np.repeat(np.arange(len(self._centroids)), np.diff(self._offsets))[keep]
+            counts = np.bincount(labels, minlength=len(self._centroids))
+            self._offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        # Filtering keeps list grouping intact, so offsets just shrink.
+        self._vectors = np.asarray(self._vectors)[keep]
+        self._documents = [doc for doc, kept in zip(self._documents, keep) if kept]
+        self._ids = [doc_id for doc_id, kept in zip(self._ids, keep) if kept]
+        return True
+
+    def build_ivf(self, nlist=None):
+        """Cluster the rows into ``nlist`` lists (default ~sqrt(n))."""
+        if not self._ids:
+            return
+        vectors = np.asarray(self._vectors)
+        nlist = nlist or max(1, int(np.sqrt(len(vectors))))
+        self._centroids = train_centroids(vectors, nlist)
+        labels = _assign(vectors, self._centroids)
+        self._vectors, self._documents, self._ids = self._group(
+            vectors, self._documents, self._ids, labels
+        )
+
+    def _group(self, vectors, documents, ids, labels):
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=len(self._centroids))
+        self._offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        return (
+            vectors[order],
+            [documents[i] for i in order],
+            [ids[i] for i in order],
+        )
+
+    # -- search -----------------------------------------------------------
+
+    def _candidate_scores(self, query):
+        if self._centroids is None:
+            return np.arange(len(self._vectors)), self._vectors @ query
+        lists = _top_k(self._centroids @ query, self.nprobe)
+        rows, scores = [], []
+        for index in lists:
+            start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+            if start < end:
+                rows.append(np.arange(start, end))
+                scores.append(self._vectors[start:end] @ query)
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return np.concatenate(rows), np.concatenate(scores)
+
+    def similarity_search_by_vector_with_score(self, embedding, k=4):
+        if not self._ids:
+            return []
+        query = _normalize(embedding)[0]
+        rows, scores = self._candidate_scores(query)
+        best = _top_k(scores, k)
+        results = []
+        for i in best:
+            text, metadata = self._documents[rows[i]]
+            results.append((Document(page_content=text, metadata=dict(metadata)), float(scores[i])))
+        return results
+
+    def similarity_search_with_score(self, query, k=4, **kwargs):
+        return self.similarity_search_by_vector_with_score(
+            self._embedding.embed_query(query), k
+        )
+
+    def similarity_search_by_vector(self, embedding, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def similarity_search(self, query, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def _select_relevance_score_fn(self):
+        # Cosine similarity in [-1, 1] -> relevance in [0, 1].
+        return lambda score: (score + 1.0) / 2.0
+
+    # -- persistence ------------------------------------------------------
+
+    def save(self, path=VECTOR_STORE_PATH):
+        """Write the index to ``path``; ``meta.json`` is replaced last."""
+        os.makedirs(path, exist_ok=True)
+        dim = int(self._vectors.shape[1]) if self._ids else 0
+        vectors = np.asarray(self._vectors) if self._ids else np.zeros((0, dim), np.float32)
+        arrays = {"vectors.npy": vectors}
+        if self._centroids is not None:
+            arrays["centroids.npy"] = self._centroids
+            arrays["offsets.npy"] = self._offsets
+        for name, array in arrays.items():
+            with open(os.path.join(path, name + ".tmp"), "wb") as handle:
+                np.save(handle, array)
+            os.replace(os.path.join(path, name + ".tmp"), os.path.join(path, name))
+
+        docs_tmp = os.path.join(path, "documents.jsonl.tmp")
+        with open(docs_tmp, "w", encoding="utf-8") as handle:
+            for doc_id, (text, metadata) in zip(self._ids, self._documents):
+                handle.write(json.dumps(
+                    {"id": doc_id, "page_content": text, "metadata": metadata}
+                ) + "\n")
+        os.replace(docs_tmp, os.path.join(path, "documents.jsonl"))
+
+        meta = {
+            "version": FORMAT_VERSION,
+            "metric": "cosine",
+            "index_type": self.index_type,
+            "dim": dim,
+            "count": len(self._ids),
+            "nlist": len(self._centroids) if self._centroids is not None else 0,
+        }
+        meta_tmp = os.path.join(path, "meta.json.tmp")
+        with open(meta_tmp, "w", encoding="utf-8") as handle:
+            json.dump(meta, handle)
+        os.replace(meta_tmp, os.path.join(path, "meta.json"))
+
+    @classmethod
+    def load(cls, embedding, path=VECTOR_STORE_PATH, mmap=True, nprobe=VECTOR_NPROBE):
+        """Open an index written by ``save``; vectors are memory-mapped."""
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as handle:
+            meta = json.load(handle)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported vector store format: {meta.get('version')}")
+        mmap_mode = "r" if mmap else None
+        vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode=mmap_mode)
+        centroids = offsets = None
+        if meta["index_type"] == "ivf":
+            centroids = np.load(os.path.join(path, "centroids.npy"))
+            offsets = np.load(os.path.join(path, "offsets.npy"))
+
+        documents, ids = [], []
+        with open(os.path.join(path, "documents.jsonl"), encoding="utf-8") as handle:
+            for line in handle:
+                record = json.loads(line)
+                ids.append(record["id"])
+                documents.append((record["page_content"], record["metadata"]))
+        if len(ids) != len(vectors):
+            raise ValueError(f"Vector store at {path} is inconsistent; rebuild it")
+        return cls(embedding, vectors, documents, ids, centroids, offsets, nprobe=nprobe)
+
+
+def load_vector_store(embeddings, backend=VECTOR_STORE_BACKEND):
+    """Open the configured existing index for retrieval."""
+    if backend == "local":
+        return LocalVectorStore.load(embeddings)
+    if backend == "pinecone":
+        from langchain_pinecone import PineconeVectorStore
+
+        return PineconeVectorStore.from_existing_index(
+            index_name=PINECONE_INDEX_NAME, embedding=embeddings
+        )
+    raise ValueError(f"Unknown VECTOR_STORE_BACKEND: {backend}")
@@ -1,90 +1,60 @@
-# from dotenv import load_dotenv
-# import os
-# from src.helper import load_pdf_file, filter_to_minimal_docs, text_split, download_hugging_face_embeddings
-# from pinecone import Pinecone
-# from pinecone import ServerlessSpec 
-# from langchain_pinecone import PineconeVectorStore
+"""Index the PDFs under data/ into the configured vector store.
 
-# load_dotenv()
+Incremental by default: only new or changed files are parsed and only new
+chunks are embedded (see src/ingest.py). Pass --full to re-index everything.
 
-# PINECONE_API_KEY= os.environ.get("PINECONE_API_KEY")
-# OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY")
-
-# os.environ[PINECONE_API_KEY] = PINECONE_API_KEY
-# os.environ[OPENAI_API_KEY] = OPENAI_API_KEY
-
-# extracted_data=load_pdf_file(data='data/')
-# filter_data=filter_to_minimal_docs(extracted_data)
-# text_chunks=text_split(filter_data)
-
-# embeddings = download_hugging_face_embeddings()
-
-# pinecone_api_key = PINECONE_API_KEY
-# pc = Pinecone(api_key=pinecone_api_key)
-
-
-# index_name = 'therapy-bot' 
-
-# if not pc.has_index(index_name):
-#     pc.create_index(
-#         name=index_name,
-#         dimension=384,
-#         metric='cosine',
-#         spec=ServerlessSpec(cloud="aws", region="us-east-1")
-#     )
-
-# index = pc.Index(index_name)
-
-
-# docsearch = PineconeVectorStore.from_documents(
-#     documents=text_chunks,
-#     index_name = index_name,
-#     embedding = embeddings,
-# )
+Usage: python store_index.py [--data DIR] [--backend local|pinecone] [--workers N] [--full]
+"""
+import argparse
+import os
+import sys
 
 from dotenv import load_dotenv
-import os
-from src.helper import load_pdf_file, filter_to_minimal_docs, text_split, download_hugging_face_embeddings
-from pinecone import Pinecone
-from pinecone import ServerlessSpec 
-from langchain_pinecone import PineconeVectorStore
 
 load_dotenv()
 
-
-PINECONE_API_KEY=os.environ.get('PINECONE_API_KEY')
-OPENAI_API_KEY=os.environ.get('OPENAI_API_KEY')
-
-os.environ["PINECONE_API_KEY"] = PINECONE_API_KEY
-os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
-
-
-extracted_data=load_pdf_file(data='data/')
-filter_data = filter_to_minimal_docs(extracted_data)
-text_chunks=text_split(filter_data)
-
-embeddings = download_hugging_face_embeddings()
-
-pinecone_api_key = PINECONE_API_KEY
-pc = Pinecone(api_key=pinecone_api_key)
-
-
-
-index_name = "therapy-chatbot"  # change if desired
-
-if not pc.has_index(index_name):
-    pc.create_index(
-        name=index_name,
-        dimension=384,
-        metric="cosine",
-        spec=ServerlessSpec(cloud="aws", region="us-east-1"),
+from src.helper import download_hugging_face_embeddings  # noqa: E402
+from src.ingest import (  # noqa: E402
+    INGEST_EMBED_BATCH_SIZE,
+    INGEST_WORKERS,
+    LocalTarget,
+    PineconeTarget,
+    default_manifest_path,
+    ingest,
+)
+from src.vector_store import VECTOR_STORE_BACKEND  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data", default="data/")
+    parser.add_argument("--backend", default=VECTOR_STORE_BACKEND, choices=["local", "pinecone"])
+    parser.add_argument("--manifest", help="manifest path (default depends on backend)")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=INGEST_EMBED_BATCH_SIZE)
+    parser.add_argument("--full", action="store_true", help="ignore the manifest and re-index all")
+    args = parser.parse_args()
+
+    embeddings = download_hugging_face_embeddings()
+    if args.backend == "local":
+        target = LocalTarget(embeddings)
+    else:
+        if not os.environ.get("PINECONE_API_KEY"):
+            print("PINECONE_API_KEY is not set.")
+            return 1
+        target = PineconeTarget()
+
+    ingest(
+        args.data,
+        target,
+        embeddings,
+        args.manifest or default_manifest_path(args.backend),
+        workers=args.workers,
+        batch_size=args.batch_size,
+        full=args.full,
     )
-
-index = pc.Index(index_name)
+    return 0
 
 
-docsearch = PineconeVectorStore.from_documents(
-    documents=text_chunks,
-    index_name=index_name,
-    embedding=embeddings, 
-)
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
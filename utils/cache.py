@@ -0,0 +1,89 @@
+"""Thread-safe, size-bounded LRU cache with optional TTL and hit/miss stats."""
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+class LRUCache:
+    """Bounded LRU mapping.
+
+    Entries expire after ``ttl`` seconds (``None`` keeps them until evicted);
+    ``set`` may pass a per-entry ``ttl``. Named caches are registered so their
+    counters show up in ``cache_stats()``.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, name=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if name:
+            register_stats(name, self)
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                value, expires_at = item
+                if expires_at is None or expires_at > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=_MISSING):
+        ttl = self.ttl if ttl is _MISSING else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+def register_stats(name, cache):
+    """Report ``cache.stats()`` under ``name`` in ``cache_stats()``."""
+    with _registry_lock:
+        _registry[name] = cache
+
+
+def cache_stats():
+    """Return stats for every named cache."""
+    with _registry_lock:
+        caches = dict(_registry)
+    return {name: cache.stats() for name, cache in sorted(caches.items())}
@@ -0,0 +1,58 @@
+"""Pre-encoded JSON responses with strong ETags for static payloads.
+
+``StaticJSON`` serializes a payload once, keeping the raw and gzip-encoded
+bytes and an ETag derived from the content. ``respond`` then only compares
+headers and picks a representation per request, answering ``304 Not
+Modified`` when the client (or a CDN) already holds the current version.
+"""
+import gzip
+import hashlib
+import json
+import os
+
+from flask import Response, request
+
+STATIC_CACHE_MAX_AGE = int(os.getenv("STATIC_CACHE_MAX_AGE", "3600"))
+# Below this size gzip framing costs more than it saves.
+GZIP_MIN_BYTES = 512
+
+
+class StaticJSON:
+    """Immutable JSON payload with its encoded bytes and ETags."""
+
+    __slots__ = ("body", "gzip_body", "etag", "gzip_etag")
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        # Strong ETags must differ per content-coding.
+        self.etag = digest
+        self.gzip_etag = f"{digest}-gz"
+        self.gzip_body = None
+        if len(self.body) >= GZIP_MIN_BYTES:
+            compressed = gzip.compress(self.body, compresslevel=9, mtime=0)
+            if len(compressed) < len(self.body):
+                self.gzip_body = compressed
+
+    def respond(self, max_age=STATIC_CACHE_MAX_AGE):
+        """Build the 200 or 304 response for the current request."""
+        use_gzip = self.gzip_body is not None and request.accept_encodings["gzip"] > 0
+        etag = self.gzip_etag if use_gzip else self.etag
+        headers = {
+            "ETag": f'"{etag}"',
+            "Cache-Control": f"public, max-age={max_age}",
+            "Vary": "Accept-Encoding",
+        }
+        # Either representation is current; the client revalidates both.
+        if request.if_none_match.contains(self.etag) or request.if_none_match.contains(self.gzip_etag):
+            return Response(status=304, headers=headers)
+
+        response = Response(
+            self.gzip_body if use_gzip else self.body,
+            status=200,
+            mimetype="application/json",
+            headers=headers,
+        )
+        if use_gzip:
+            response.headers["Content-Encoding"] = "gzip"
+        return response
@@ -0,0 +1,19 @@
+"""Opaque keyset-pagination cursors."""
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(timestamp, row_id):
+    """Encode the (timestamp, id) sort key of the last row on a page."""
+    raw = json.dumps([timestamp.isoformat(), row_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """Return ``(timestamp, id)`` or None if the cursor is malformed."""
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError):
+        return None
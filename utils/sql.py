@@ -0,0 +1,31 @@
+"""Dialect-aware SQL helpers for concurrent writers."""
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from db import db
+
+
+def insert_ignore(model, index_elements, **values):
+    """``INSERT ... ON CONFLICT DO NOTHING`` for ``model`` in the session.
+
+    Lets two requests race to create the same row: the loser's insert is a
+    no-op instead of an IntegrityError that would poison its transaction.
+    Runs inside the caller's transaction; re-select the row afterwards.
+    Returns True if this call inserted the row.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(model).values(**values))
+        except IntegrityError:
+            return False
+        return True
+    result = db.session.execute(
+        dialect_insert(model).values(**values).on_conflict_do_nothing(index_elements=index_elements)
+    )
+    return result.rowcount == 1